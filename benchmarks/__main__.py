@@ -0,0 +1,105 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from typing import Dict
+from benchmarks.cases import CASES
+
+
+# Baseline is kept in repository, results of usual runs are not
+BASELINE_PATH: str = os.path.join("benchmarks", "baseline.json")
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], threshold: float) -> bool:
+    """
+    Function compares results with baseline and prints regressions.
+    :param results: results of benchmarks;
+    :param baseline: baseline results;
+    :param threshold: allowed relative increase of median time.
+    :return: True if there are no regressions.
+    """
+
+    success = True
+    for name, result in results.items():
+        if name not in baseline:
+            print(f"{name:<36} no baseline")
+            continue
+        ratio = result["median_ns"] / baseline[name]["median_ns"]
+        status = "ok"
+        if ratio > 1 + threshold:
+            status = "REGRESSION"
+            success = False
+        elif ratio < 1 - threshold:
+            status = "improvement"
+        print(f"{name:<36} {baseline[name]['median_ns']:>12.1f} -> {result['median_ns']:>12.1f} ns "
+              f"({ratio:.2f}x) {status}")
+    return success
+
+
+def read_results(path: str) -> Dict[str, Dict[str, float]]:
+    """
+    :param path: path to JSON file with results.
+    :return: results of benchmarks.
+    """
+
+    with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)["benchmarks"]
+
+
+def run_benchmarks(pattern: str, repeat: int) -> Dict[str, Dict[str, float]]:
+    """
+    :param pattern: only benchmarks with this substring in name are run;
+    :param repeat: number of measurements of every benchmark.
+    :return: times of one operation for every benchmark.
+    """
+
+    results = {}
+    for name, create_case in CASES.items():
+        if pattern not in name:
+            continue
+        run, operations = create_case()
+        run()
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            times.append((time.perf_counter() - start) / operations * 1e9)
+        results[name] = {"median_ns": statistics.median(times), "min_ns": min(times), "max_ns": max(times),
+                         "operations": operations, "repeat": repeat}
+        print(f"{name:<36} median {results[name]['median_ns']:>12.1f} ns, min {results[name]['min_ns']:>12.1f} ns")
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmarks of game loop")
+    parser.add_argument("--output", default="benchmark_results.json",
+                        help=f"path to save results in JSON, use {BASELINE_PATH} to update baseline")
+    parser.add_argument("--compare", nargs="?", const=BASELINE_PATH, default=None,
+                        help=f"path to baseline results to compare with, {BASELINE_PATH} by default")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="relative slowdown that is considered as regression")
+    parser.add_argument("--filter", default="", help="run only benchmarks with this substring in name")
+    parser.add_argument("--repeat", type=int, default=7, help="number of measurements of every benchmark")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        # Baseline is read before results are written, writing results over it would make comparison pointless
+        if os.path.abspath(args.compare) == os.path.abspath(args.output):
+            parser.error("results should not be written to file with baseline, choose other --output")
+        try:
+            baseline = read_results(args.compare)
+        except (OSError, ValueError, KeyError) as exc:
+            parser.error(f"failed to read baseline '{args.compare}': {exc}")
+    results = run_benchmarks(args.filter, args.repeat)
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump({"python": sys.version, "platform": platform.platform(), "benchmarks": results}, file, indent=4)
+    if baseline is not None and not compare(results, baseline, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
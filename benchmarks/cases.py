@@ -0,0 +1,316 @@
+import importlib.util
+import random
+from typing import Callable, Dict, List, Tuple
+from pong.loop import FixedStepLoop
+from pong.simulation import AIController, BallState, FieldState, PaddleState, play_match, Side, Simulation
+
+
+# Benchmark case creates function that runs some operations and returns number of operations in it
+Case = Callable[[], Tuple[Callable[[], None], int]]
+DEMO_AI_ERROR: float = 0.3
+DT: float = 1 / 120
+HEIGHT: float = 800
+OPERATIONS: int = 1000
+SEED: int = 2024
+WIDTH: float = 1000
+CASES: Dict[str, Case] = {}
+
+
+def case(name: str) -> Callable[[Case], Case]:
+    """
+    :param name: name of benchmark case.
+    :return: decorator that registers benchmark case.
+    """
+
+    def register(function: Case) -> Case:
+        CASES[name] = function
+        return function
+
+    return register
+
+
+def create_trajectories(number: int = OPERATIONS) -> List[Tuple[float, float, float, float]]:
+    """
+    :param number: number of trajectories.
+    :return: scripted positions and velocities of ball. Half of them are near the right racket.
+    """
+
+    rng = random.Random(SEED)
+    max_velocity = (WIDTH ** 2 + HEIGHT ** 2) ** 0.5
+    trajectories = []
+    for index in range(number):
+        x = WIDTH - 60 if index % 2 else rng.uniform(100, WIDTH - 100)
+        y = rng.uniform(0, HEIGHT - 50)
+        velocity_x = rng.uniform(max_velocity / 8, max_velocity / 2) * rng.choice((-1, 1))
+        velocity_y = rng.uniform(-max_velocity / 2, max_velocity / 2)
+        trajectories.append((x, y, velocity_x, velocity_y))
+    return trajectories
+
+
+def create_demo_controller() -> AIController:
+    """
+    :return: AI controller of AI-vs-AI game, with default error two AI players hardly ever miss the ball.
+    """
+
+    return AIController(error_magnitude=DEMO_AI_ERROR, error_scale=1, match_point_error=True)
+
+
+def create_simulation(left_ai: bool = False) -> Simulation:
+    """
+    :param left_ai: if True, left racket is controlled by AI.
+    :return: simulation with started match.
+    """
+
+    simulation = Simulation(FieldState(WIDTH, HEIGHT), left_controller=AIController() if left_ai else None,
+                            right_controller=AIController(), rng=random.Random(SEED))
+    simulation.start_match()
+    return simulation
+
+
+def place_ball(ball: BallState, trajectory: Tuple[float, float, float, float]) -> None:
+    ball.x, ball.y, ball.velocity_x, ball.velocity_y = trajectory
+
+
+def place_right_paddle(paddle: PaddleState) -> None:
+    paddle.x = WIDTH - paddle.width
+    paddle.center_y = HEIGHT / 2
+
+
+@case("ball_move")
+def ball_move() -> Tuple[Callable[[], None], int]:
+    ball = BallState()
+    trajectories = create_trajectories()
+
+    def run() -> None:
+        for trajectory in trajectories:
+            place_ball(ball, trajectory)
+            ball.move(DT)
+
+    return run, len(trajectories)
+
+
+@case("player_hit_ball")
+def player_hit_ball() -> Tuple[Callable[[], None], int]:
+    ball = BallState()
+    ball.max_velocity = (WIDTH ** 2 + HEIGHT ** 2) ** 0.5
+    paddle = PaddleState(Side.RIGHT)
+    place_right_paddle(paddle)
+    trajectories = create_trajectories()
+
+    def run() -> None:
+        for trajectory in trajectories:
+            place_ball(ball, trajectory)
+            paddle.hit_ball(ball)
+
+    return run, len(trajectories)
+
+
+@case("ai_calculate_ball_target_position")
+def ai_calculate_ball_target_position() -> Tuple[Callable[[], None], int]:
+    ball = BallState()
+    controller = AIController()
+    field = FieldState(WIDTH, HEIGHT)
+    paddle = PaddleState(Side.RIGHT)
+    place_right_paddle(paddle)
+    trajectories = create_trajectories()
+
+    def run() -> None:
+        for trajectory in trajectories:
+            place_ball(ball, trajectory)
+            controller.calculate_ball_target_position(ball, paddle, field)
+
+    return run, len(trajectories)
+
+
+@case("ai_change_position")
+def ai_change_position() -> Tuple[Callable[[], None], int]:
+    ball = BallState()
+    controller = AIController()
+    field = FieldState(WIDTH, HEIGHT)
+    paddle = PaddleState(Side.RIGHT)
+    place_right_paddle(paddle)
+    trajectories = create_trajectories()
+
+    def run() -> None:
+        for index, trajectory in enumerate(trajectories):
+            # Velocity of ball changes approximately once in a hundred ticks
+            if index % 100 == 0:
+                place_ball(ball, trajectory)
+                controller.invalidate()
+            controller.change_position(DT, ball, paddle, field)
+            ball.move(DT)
+
+    return run, len(trajectories)
+
+
+@case("simulation_step")
+def simulation_step() -> Tuple[Callable[[], None], int]:
+    simulation = create_simulation()
+
+    def run() -> None:
+        for _ in range(OPERATIONS):
+            simulation.step(DT)
+            if simulation.round_over:
+                simulation.start_round()
+
+    return run, OPERATIONS
+
+
+@case("pong_game_update")
+def pong_game_update() -> Tuple[Callable[[], None], int]:
+    """
+    Physics part of PongGame.update for 60 frames per second: fixed ticks and interpolation of positions.
+    """
+
+    simulation = create_simulation()
+    loop = FixedStepLoop(int(1 / DT))
+    loop.reset(simulation)
+
+    def run() -> None:
+        for _ in range(OPERATIONS):
+            loop.advance(1 / 60, simulation)
+            loop.interpolate(simulation)
+            if simulation.round_over:
+                simulation.start_round()
+                loop.reset(simulation)
+
+    return run, OPERATIONS
+
+
+@case("ai_vs_ai_match")
+def ai_vs_ai_match() -> Tuple[Callable[[], None], int]:
+    """
+    Full match of two AI players that make random errors also on match point, as in AI-vs-AI game. Cost is reported
+    per tick.
+    """
+
+    simulation = Simulation(FieldState(WIDTH, HEIGHT), left_controller=create_demo_controller(),
+                            right_controller=create_demo_controller(), rng=random.Random(SEED))
+
+    def run() -> None:
+        simulation.rng.seed(SEED)
+        play_match(simulation, DT)
+
+    # Match is seeded, so every run plays the same number of ticks
+    run()
+    if not simulation.score.is_game_over():
+        raise RuntimeError("Match of AI players has not finished")
+    return run, simulation.tick
+
+
+@case("multiball_step_300_balls")
+def multiball_step() -> Tuple[Callable[[], None], int]:
+    """
+    Step of multi-ball simulation with collisions of balls, cost is reported per ball.
+    """
+
+    from pong.multiball import MultiBallSimulation
+
+    balls = 300
+    simulation = MultiBallSimulation(FieldState(WIDTH, HEIGHT), balls, 10, left_controller=AIController(),
+                                     right_controller=AIController(), rng=random.Random(SEED), max_score=10 ** 9)
+    simulation.start_match()
+
+    def run() -> None:
+        for _ in range(10):
+            simulation.step(DT)
+
+    return run, 10 * balls
+
+
+@case("server_match_tick")
+def server_match_tick() -> Tuple[Callable[[], None], int]:
+    """
+    Tick of match hosted by headless server.
+    """
+
+    from pong.server import Match
+
+    match = Match(0, SEED, int(1 / DT))
+
+    def run() -> None:
+        for _ in range(OPERATIONS):
+            match.tick()
+
+    return run, OPERATIONS
+
+
+if importlib.util.find_spec("numpy"):
+    @case("batch_step_1000_matches")
+    def batch_step() -> Tuple[Callable[[], None], int]:
+        from pong.batch import BatchSimulation
+
+        batch = BatchSimulation(1000, WIDTH, HEIGHT, seed=SEED)
+        batch.start_matches()
+
+        def run() -> None:
+            for _ in range(10):
+                batch.step(DT)
+
+        return run, 10
+
+    @case("policy_change_position")
+    def policy_change_position() -> Tuple[Callable[[], None], int]:
+        """
+        Inference of MLP policy for one racket per tick as in the game, budget is 50 us.
+        """
+
+        import numpy as np
+        from pong.policy import FEATURES, MLPPolicy, PolicyController
+
+        ball = BallState()
+        ball.max_velocity = (WIDTH ** 2 + HEIGHT ** 2) ** 0.5
+        controller = PolicyController(MLPPolicy.create([FEATURES, 16, 1], np.random.default_rng(SEED)))
+        field = FieldState(WIDTH, HEIGHT)
+        paddle = PaddleState(Side.RIGHT)
+        place_right_paddle(paddle)
+        trajectories = create_trajectories()
+
+        def run() -> None:
+            for trajectory in trajectories:
+                place_ball(ball, trajectory)
+                controller.change_position(DT, ball, paddle, field)
+
+        return run, len(trajectories)
+
+    @case("policy_batch_step_1000_matches")
+    def policy_batch_step() -> Tuple[Callable[[], None], int]:
+        """
+        Step of 1000 matches in which both rackets are moved by MLP policy.
+        """
+
+        import numpy as np
+        from pong.batch import BatchSimulation
+        from pong.policy import FEATURES, MLPPolicy
+
+        batch = BatchSimulation(1000, WIDTH, HEIGHT, seed=SEED)
+        policy = MLPPolicy.create([FEATURES, 16, 1], np.random.default_rng(SEED))
+        batch.policies = [policy, policy]
+        batch.start_matches()
+
+        def run() -> None:
+            for _ in range(10):
+                batch.step(DT)
+
+        return run, 10
+
+
+if importlib.util.find_spec("kivy"):
+    @case("ball_widget_move")
+    def ball_widget_move() -> Tuple[Callable[[], None], int]:
+        """
+        Ball.move with copying of state to kivy properties.
+        """
+
+        from pong.ball import Ball
+
+        ball = Ball()
+        ball.max_velocity = (WIDTH ** 2 + HEIGHT ** 2) ** 0.5
+        trajectories = create_trajectories()
+
+        def run() -> None:
+            for trajectory in trajectories:
+                place_ball(ball.state, trajectory)
+                ball.move(DT)
+
+        return run, len(trajectories)
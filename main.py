@@ -1,6 +1,7 @@
 import importlib
 import os
 import sys
+from pong.startup import mark
 from kivy.config import Config
 from kivy.resources import resource_add_path
 from kivy.utils import platform
@@ -11,22 +12,43 @@ if "_PYIBoot_SPLASH" in os.environ and importlib.util.find_spec("pyi_splash"):
     pyi_splash.close()
 
 
+def set_config(section: str, option: str, value) -> bool:
+    """
+    :param section: section of config;
+    :param option: option in section;
+    :param value: value of option.
+    :return: True if value of option was changed.
+    """
+
+    if Config.has_option(section, option) and Config.get(section, option) == str(value):
+        return False
+    Config.set(section, option, value)
+    return True
+
+
 def check_platform() -> None:
     if platform.lower() in ("linux", "macosx", "win"):
-        Config.set("graphics", "resizable", False)
-        Config.set("graphics", "height", "800")
-        Config.set("graphics", "width", "1000")
-        Config.set("graphics", "maxfps", "60")
-        Config.set("input", "mouse", "mouse,multitouch_on_demand")
-        Config.write()
+        changed = False
+        # Frame rate is limited by vertical synchronization (maxfps 0, vsync 1), so the game uses refresh rate of
+        # display
+        for section, option, value in (("graphics", "resizable", False), ("graphics", "height", "800"),
+                                       ("graphics", "width", "1000"), ("graphics", "maxfps", "0"),
+                                       ("graphics", "vsync", "1"), ("input", "mouse", "mouse,multitouch_on_demand")):
+            changed = set_config(section, option, value) or changed
+        # Config file is written only when it is changed, so usual launch does not write to disk
+        if changed:
+            Config.write()
 
 
 if __name__ == "__main__":
     if hasattr(sys, "_MEIPASS"):
         resource_add_path(os.path.join(sys._MEIPASS))
+    mark("kivy_config")
     check_platform()
+    mark("config")
 
     from pong.game import PongApp
     from pong.logger import set_logger
     set_logger()
+    mark("imports")
     PongApp().run()
@@ -7,7 +7,7 @@ block_cipher = None
 a = Analysis(['main.py'],
              pathex=[],
              binaries=[],
-             datas=[('media\\*', 'media')],
+             datas=[('media.bundle', '.')],
              hiddenimports=[],
              hookspath=[],
              hooksconfig={},
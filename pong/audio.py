@@ -0,0 +1,128 @@
+import logging
+from typing import Dict, List, Optional, TYPE_CHECKING
+from kivy.clock import Clock
+from pong.media import get_media_loader
+
+if TYPE_CHECKING:
+    from kivy.core.audio import Sound
+
+
+class AudioManager:
+    """
+    Class loads sounds from media folder once and plays them from pools of voices, so overlapping sounds with the
+    same name do not interrupt each other. Only one voice of every sound is loaded in advance, other voices are loaded
+    when sound overlaps itself for the first time.
+    """
+
+    SOUND_EXTENSIONS = (".mp3", ".ogg", ".wav")
+    VOICES: int = 3
+
+    def __init__(self, voices: int = VOICES) -> None:
+        """
+        :param voices: maximum number of voices for every sound.
+        """
+
+        self._next_voice: Dict[str, int] = {}
+        self._paths: Dict[str, str] = {}
+        self._queue: List[str] = []
+        self._voices: Dict[str, List["Sound"]] = {}
+        self._voices_number: int = voices
+
+    def _get_sound_names(self) -> List[str]:
+        file_names = get_media_loader().get_names()
+        return sorted(name for name in file_names if name.lower().endswith(AudioManager.SOUND_EXTENSIONS))
+
+    def _add_voice(self, name: str) -> Optional["Sound"]:
+        """
+        Method loads one more voice for sound.
+        :param name: name of sound file in media folder.
+        :return: new voice.
+        """
+
+        # Audio providers of kivy are slow to initialize, so they are imported with the first sound
+        from kivy.core.audio import SoundLoader
+
+        voice = SoundLoader.load(self._paths[name])
+        if voice:
+            self._voices[name].append(voice)
+        return voice
+
+    def _load(self, name: str) -> List["Sound"]:
+        """
+        :param name: name of sound file in media folder.
+        :return: voices for sound.
+        """
+
+        voices = self._voices.get(name)
+        if voices is None:
+            voices = self._voices[name] = []
+            self._next_voice[name] = 0
+            # Audio providers open only files on disk, so sound from bundle is extracted once
+            path = get_media_loader().find(name)
+            if path:
+                self._paths[name] = path
+                self._add_voice(name)
+            if not voices:
+                logging.warning("Failed to load sound '%s'", name)
+        return voices
+
+    def _load_next(self, dt: float) -> None:
+        """
+        Method loads one sound from queue per frame, so that loading does not freeze the application.
+        :param dt: time elapsed since the previous call.
+        """
+
+        if self._queue:
+            self._load(self._queue.pop(0))
+        if self._queue:
+            Clock.schedule_once(self._load_next)
+
+    def play(self, name: str) -> Optional["Sound"]:
+        """
+        Method plays sound on free voice. If all voices are busy, new voice is loaded until there are maximum number
+        of voices, then the voice that started playing earlier is restarted.
+        :param name: name of sound file in media folder.
+        :return: voice that plays sound.
+        """
+
+        voices = self._voices.get(name)
+        if voices is None:
+            if name in self._queue:
+                self._queue.remove(name)
+            voices = self._load(name)
+        if not voices:
+            return None
+        for voice in voices:
+            if voice.state == "stop":
+                break
+        else:
+            voice = self._add_voice(name) if len(voices) < self._voices_number else None
+            if voice is None:
+                voice = voices[self._next_voice[name]]
+                self._next_voice[name] = (self._next_voice[name] + 1) % len(voices)
+                voice.stop()
+        voice.play()
+        return voice
+
+    def preload(self) -> None:
+        """
+        Method starts loading all sounds from media folder in idle time between frames.
+        """
+
+        self._queue = [name for name in self._get_sound_names() if name not in self._voices]
+        if self._queue:
+            Clock.schedule_once(self._load_next)
+
+
+_audio_manager: Optional[AudioManager] = None
+
+
+def get_audio_manager() -> AudioManager:
+    """
+    :return: audio manager of application.
+    """
+
+    global _audio_manager
+    if _audio_manager is None:
+        _audio_manager = AudioManager()
+    return _audio_manager
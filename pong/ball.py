@@ -1,37 +1,69 @@
 import math
+from typing import List, Tuple, TYPE_CHECKING
 from kivy.graphics import Color, Ellipse
 from kivy.properties import NumericProperty, ReferenceListProperty
 from kivy.uix.widget import Widget
-from kivy.vector import Vector
+from pong.simulation import BallState
+
+
+if TYPE_CHECKING:
+    from pong.multiball import BallPool
+
+
+def create_color_table(steps: int) -> List[Tuple[float, float, float, float]]:
+    """
+    :param steps: number of colors.
+    :return: colors of ball from slow (blue) to fast (red).
+    """
+
+    return [(i / (steps - 1), 0, 1 - i / (steps - 1), 1) for i in range(steps)]
 
 
 class Ball(Widget):
     """
-    Class for ball in game.
+    Class for ball in game. Widget only mirrors state of ball from simulation.
     """
 
+    # Number of colors in the table of ball colors for velocities from 0 to maximum
+    COLOR_STEPS: int = 64
+    COLORS: List[Tuple[float, float, float, float]] = create_color_table(COLOR_STEPS)
     velocity_x = NumericProperty()
     velocity_y = NumericProperty()
     velocity = ReferenceListProperty(velocity_x, velocity_y)
 
     def __init__(self) -> None:
         super().__init__()
-        self.init_velocity: float = None
-        self.max_velocity: float = None
-        self.size = [50, 50]
+        self.state: BallState = BallState()
+        self.size = [self.state.size, self.state.size]
         with self.canvas:
-            Color(1, 1, 1, 1)
+            self._color: Color = Color(1, 1, 1, 1)
             self._ellipse: Ellipse = Ellipse(size=self.size, pos=self.pos)
         self.bind(pos=self._move_ellipse)
         self.bind(velocity=self._change_color)
 
+    @property
+    def init_velocity(self) -> float:
+        return self.state.init_velocity
+
+    @init_velocity.setter
+    def init_velocity(self, value: float) -> None:
+        self.state.init_velocity = value
+
+    @property
+    def max_velocity(self) -> float:
+        return self.state.max_velocity
+
+    @max_velocity.setter
+    def max_velocity(self, value: float) -> None:
+        self.state.max_velocity = value
+
     @property
     def velocity_module(self) -> float:
         """
         :return: ball velocity module.
         """
 
-        return math.pow((self.velocity_x ** 2 + self.velocity_y ** 2), 0.5)
+        return self.state.velocity_module
 
     def _change_color(self, obj, velocity) -> None:
         """
@@ -40,11 +72,8 @@ class Ball(Widget):
         :param velocity: new velocity of ball.
         """
 
-        self.canvas.clear()
-        with self.canvas:
-            color = self.velocity_module / self.max_velocity
-            Color(color, 0, 1 - color, 1)
-            self._ellipse = Ellipse(size=self.size, pos=self.pos)
+        index = int(self.velocity_module / self.max_velocity * (Ball.COLOR_STEPS - 1))
+        self._color.rgba = Ball.COLORS[min(index, Ball.COLOR_STEPS - 1)]
 
     def _move_ellipse(self, obj, pos) -> None:
         self._ellipse.pos = pos
@@ -55,11 +84,57 @@ class Ball(Widget):
         :return: True if ball velocity can be changed to given.
         """
 
-        return new_velocity < self.max_velocity
+        return self.state.check_velocity_increasing(new_velocity)
 
     def move(self, dt: float) -> None:
         """
         :param dt: time elapsed since the previous moment.
         """
 
-        self.pos = Vector(*self.velocity) * dt + self.pos
+        self.state.move(dt)
+        self.sync()
+
+    def sync(self, pos: Tuple[float, float] = None, effects: bool = True) -> None:
+        """
+        Method copies state of ball from simulation to widget.
+        :param pos: position to render ball at, by default position from simulation is used;
+        :param effects: if False, velocity is not copied, so color of ball is not changed.
+        """
+
+        state = self.state
+        self.pos = pos if pos is not None else (state.x, state.y)
+        if effects:
+            self.velocity = state.velocity_x, state.velocity_y
+
+
+class BallGroup(Widget):
+    """
+    Class for balls of multi-ball game. All balls are drawn by one widget, instructions are created once and then only
+    moved and recolored.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._colors: List[Color] = []
+        self._ellipses: List[Ellipse] = []
+
+    def sync(self, pool: "BallPool", max_velocity: float) -> None:
+        """
+        Method copies state of balls from simulation to canvas.
+        :param pool: pool with balls;
+        :param max_velocity: maximum velocity of ball.
+        """
+
+        while len(self._ellipses) < pool.count:
+            with self.canvas:
+                self._colors.append(Color(1, 1, 1, 1))
+                self._ellipses.append(Ellipse(size=(pool.size, pool.size)))
+        steps = Ball.COLOR_STEPS - 1
+        for index, (color, ellipse) in enumerate(zip(self._colors, self._ellipses)):
+            if index >= pool.count:
+                ellipse.size = 0, 0
+                continue
+            velocity = math.hypot(pool.velocity_x[index], pool.velocity_y[index])
+            color.rgba = Ball.COLORS[min(int(velocity / max_velocity * steps), steps)]
+            ellipse.pos = pool.x[index], pool.y[index]
+            ellipse.size = pool.size, pool.size
@@ -0,0 +1,521 @@
+import argparse
+import math
+import random
+import time
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+from pong.policy import make_observations, Policy, PolicyController
+from pong.simulation import (AIController, BALL_SIZE, FieldState, INCREMENT_COEFFICIENT, MAX_COLLISIONS, MAX_RALLY,
+                             MAX_SCORE, PADDLE_SIZE, SERVE_ANGLES, Simulation)
+
+
+# Matches without limit of rally can last forever, so they are stopped after this number of ticks
+MAX_TICKS: int = 20000
+# Obstacles that ball can collide with, 0 and 1 are left and right rackets
+NO_OBSTACLE: int = -1
+WALL: int = 2
+
+
+class BatchResult:
+    """
+    Class with results of matches played by batch simulation.
+    """
+
+    __slots__ = ("elapsed", "finished", "score_left", "score_right", "ticks")
+
+    def __init__(self, score_left: np.ndarray, score_right: np.ndarray, ticks: int, elapsed: float,
+                 finished: int) -> None:
+        """
+        :param score_left: final scores of left players;
+        :param score_right: final scores of right players;
+        :param ticks: number of played ticks;
+        :param elapsed: time spent on playing in seconds;
+        :param finished: number of matches played to the end.
+        """
+
+        self.elapsed: float = elapsed
+        self.finished: int = finished
+        self.score_left: np.ndarray = score_left
+        self.score_right: np.ndarray = score_right
+        self.ticks: int = ticks
+
+    @property
+    def matches_per_second(self) -> float:
+        """
+        :return: number of finished matches per second. Matches stopped by limit of ticks are not counted.
+        """
+
+        return self.finished / self.elapsed if self.elapsed > 0 else float("inf")
+
+
+class BatchSimulation:
+    """
+    Class simulates many independent matches at once. State of every match is stored in NumPy arrays, one element
+    per match, and all matches are advanced with the same rules as in Simulation.step.
+    """
+
+    def __init__(self, n_matches: int, width: float, height: float, ai_left: bool = True, ai_right: bool = True,
+                 seed: Optional[int] = None, max_score: int = MAX_SCORE, max_rally: Optional[int] = None,
+                 rngs: Optional[Sequence[random.Random]] = None) -> None:
+        """
+        :param n_matches: number of matches;
+        :param width: width of field;
+        :param height: height of field;
+        :param ai_left: if True, left rackets are controlled by AI, otherwise they stay still;
+        :param ai_right: if True, right rackets are controlled by AI, otherwise they stay still;
+        :param seed: seed for random number generator;
+        :param max_score: score to win the match;
+        :param max_rally: maximum number of hits in rally, None if rally is not limited;
+        :param rngs: random number generators of scalar simulations, one per match. If given, serves and errors are
+        drawn from them in the same order as in Simulation, so that batch plays exactly the same matches.
+        """
+
+        self.n: int = n_matches
+        self.width: float = width
+        self.height: float = height
+        self.ball_size: float = BALL_SIZE
+        self.paddle_width: float = PADDLE_SIZE[0]
+        self.paddle_height: float = PADDLE_SIZE[1]
+        self.max_rally: Optional[int] = max_rally
+        self.max_score: int = max_score
+        self.max_velocity: float = float(np.hypot(width, height))
+        self.init_velocity: float = self.max_velocity / 4
+        self.rng: np.random.Generator = np.random.default_rng(seed)
+        self.rngs: Optional[Sequence[random.Random]] = rngs
+        self.serve_angles: np.ndarray = np.radians(np.array(SERVE_ANGLES, dtype=np.float64))
+
+        self.ball_x: np.ndarray = np.zeros(n_matches)
+        self.ball_y: np.ndarray = np.zeros(n_matches)
+        self.velocity_x: np.ndarray = np.zeros(n_matches)
+        self.velocity_y: np.ndarray = np.zeros(n_matches)
+        # Bottom coordinates of left and right rackets
+        self.paddle_y: np.ndarray = np.zeros((2, n_matches))
+        self.score: np.ndarray = np.zeros((2, n_matches), dtype=np.int64)
+        self.rally: np.ndarray = np.zeros(n_matches, dtype=np.int64)
+        self.round_over: np.ndarray = np.ones(n_matches, dtype=bool)
+        self.game_over: np.ndarray = np.zeros(n_matches, dtype=bool)
+
+        # Parameters of rules, they can differ from match to match
+        self.ai: np.ndarray = np.array([[ai_left], [ai_right]], dtype=bool).repeat(n_matches, axis=1)
+        self.ai_error: np.ndarray = np.zeros((2, n_matches))
+        self.ai_error_magnitude: np.ndarray = np.full((2, n_matches), AIController.ERROR)
+        self.ai_error_scale: np.ndarray = np.full((2, n_matches), AIController.ERROR_SCALE)
+        self.ai_match_point_error: np.ndarray = np.zeros((2, n_matches), dtype=bool)
+        self.ai_target_y: np.ndarray = np.zeros((2, n_matches))
+        self.ai_time_left: np.ndarray = np.zeros((2, n_matches))
+        self.ai_valid: np.ndarray = np.zeros((2, n_matches), dtype=bool)
+        self.ai_min_velocity: np.ndarray = np.full((2, n_matches), float(AIController.MIN_VELOCITY))
+        self.ai_velocity: np.ndarray = np.full((2, n_matches), float(AIController.VELOCITY))
+        self.increment_coefficient: np.ndarray = np.full(n_matches, INCREMENT_COEFFICIENT)
+        # Policies that move rackets instead of hand-written AI, None if side is played by AI
+        self.policies: List[Optional[Policy]] = [None, None]
+        self.policy_max_velocity: float = PolicyController.MAX_VELOCITY
+
+    def _calculate_ball_target_positions(self, side: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Method is vectorized version of AIController.calculate_ball_target_position.
+        :param side: 0 for left racket and 1 for right racket.
+        :return: vertical positions of ball center at racket and times.
+        """
+
+        scale = 1 + self.ai_error[side]
+        half_size = self.ball_size / 2
+        center_y = self.ball_y + half_size
+        velocity_x = scale * self.velocity_x
+        line = self.width - self.paddle_width - half_size if side == 1 else self.paddle_width + half_size
+        opposite_line = self.width - line
+        center_x = scale * (self.ball_x + half_size)
+        distance = np.where((line - center_x) * velocity_x >= 0, np.abs(line - center_x),
+                            np.abs(opposite_line - center_x) + abs(line - opposite_line))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            duration = np.where(velocity_x == 0, 0, distance / np.abs(velocity_x))
+        length = self.height - self.ball_size
+        if length <= 0:
+            return center_y, duration
+        y = np.mod(scale * center_y - half_size + scale * self.velocity_y * duration, 2 * length)
+        y = np.where(y > length, 2 * length - y, y)
+        return np.where(velocity_x == 0, center_y, y + half_size), duration
+
+    def _change_ai_errors(self, side: int, mask: np.ndarray) -> None:
+        """
+        Method is vectorized version of AIController.change_error.
+        :param side: 0 for left racket and 1 for right racket;
+        :param mask: mask of matches in which new error should be chosen.
+        """
+
+        if self.rngs is not None:
+            # Scalar simulation draws error only for AI controller
+            mask = mask & self.ai[side] if self.policies[side] is None else np.zeros(self.n, dtype=bool)
+        count = int(mask.sum())
+        if not count:
+            return
+        opponent_score = self.score[1 - side, mask]
+        error = np.where(self.ai_match_point_error[side, mask] | (self.max_score != opponent_score + 1),
+                         self.ai_error_magnitude[side, mask], 0)
+        if self.rngs is None:
+            error *= self.ai_error_scale[side, mask] * self.rng.random(count)
+        else:
+            error *= self.ai_error_scale[side, mask] * np.array([self.rngs[index].random()
+                                                                 for index in np.flatnonzero(mask)])
+        self.ai_error[side, mask] = np.where(self.ai[side, mask], error, self.ai_error[side, mask])
+
+    def _change_ai_positions(self, dt: float, active: np.ndarray) -> None:
+        """
+        Method is vectorized version of AIController.change_position for both sides.
+        :param dt: time elapsed since the previous moment;
+        :param active: mask of matches in which rackets should be moved.
+        """
+
+        half_height = self.paddle_height / 2
+        for side in (0, 1):
+            mask = active & self.ai[side]
+            if not mask.any():
+                continue
+            if self.policies[side] is not None:
+                self._change_policy_positions(side, dt, mask)
+                continue
+            stale = mask & ~self.ai_valid[side]
+            self.ai_time_left[side] = np.where(mask & ~stale, self.ai_time_left[side] - dt, self.ai_time_left[side])
+            if stale.any():
+                target_y, duration = self._calculate_ball_target_positions(side)
+                self.ai_target_y[side] = np.where(stale, target_y, self.ai_target_y[side])
+                self.ai_time_left[side] = np.where(stale, duration, self.ai_time_left[side])
+                self.ai_valid[side] |= stale
+
+            target_y = self.ai_target_y[side]
+            time_left = self.ai_time_left[side]
+            paddle_center = self.paddle_y[side] + half_height
+            with np.errstate(divide="ignore", invalid="ignore"):
+                required_velocity = np.maximum(np.abs(target_y - paddle_center) / time_left,
+                                               self.ai_min_velocity[side])
+            self.ai_velocity[side] = np.where(mask & (time_left > 0), required_velocity, self.ai_velocity[side])
+            up = target_y > paddle_center + half_height
+            down = ~up & (target_y < paddle_center - half_height)
+            new_y = paddle_center + np.where(up, 1, -1) * self.ai_velocity[side] * dt
+            new_y = np.clip(new_y - half_height, 0, self.height - self.paddle_height)
+            self.paddle_y[side] = np.where(mask & (up | down), new_y, self.paddle_y[side])
+
+    def _change_policy_positions(self, side: int, dt: float, mask: np.ndarray) -> None:
+        """
+        Method is vectorized version of PolicyController.change_position. Policy decides for all matches at once.
+        :param side: 0 for left racket and 1 for right racket;
+        :param dt: time elapsed since the previous moment;
+        :param mask: mask of matches in which rackets should be moved.
+        """
+
+        half_size = self.ball_size / 2
+        paddle_center = self.paddle_y[side] + self.paddle_height / 2
+        direction, face_x = (1, self.width - self.paddle_width) if side == 1 else (-1, self.paddle_width)
+        observations = make_observations(direction, face_x, self.ball_x + half_size, self.ball_y + half_size,
+                                         self.velocity_x, self.velocity_y, paddle_center, self.width, self.height,
+                                         self.paddle_height, self.max_velocity)
+        actions = self.policies[side].decide(observations)
+        new_y = np.clip(self.paddle_y[side] + actions * self.policy_max_velocity * dt, 0,
+                        self.height - self.paddle_height)
+        self.paddle_y[side] = np.where(mask, new_y, self.paddle_y[side])
+
+    def _draw_scalar_velocity(self, rng: random.Random) -> Tuple[float, float]:
+        """
+        Method draws serve exactly as Simulation.generate_random_velocity.
+        :param rng: random number generator of scalar simulation.
+        :return: velocity of ball.
+        """
+
+        angle = rng.choice(SERVE_ANGLES)
+        direction = 0 if rng.randint(0, 1) == 0 else 180
+        angle = math.radians(angle + direction)
+        return self.init_velocity * math.cos(angle), self.init_velocity * math.sin(angle)
+
+    def _move_balls(self, dt: float, active: np.ndarray) -> np.ndarray:
+        """
+        Method is vectorized version of Simulation._move_ball with continuous collision detection.
+        :param dt: time elapsed since the previous moment;
+        :param active: mask of matches in which balls should be moved.
+        :return: masks of matches in which ball hit the left and the right racket.
+        """
+
+        top = self.height - self.ball_size
+        paddles_x = 0, self.width - self.paddle_width
+        remaining = np.where(active, dt, 0.0)
+        pending = active.copy()
+        hits = np.zeros((2, self.n), dtype=bool)
+        for _ in range(MAX_COLLISIONS):
+            with np.errstate(divide="ignore", invalid="ignore"):
+                t_wall = np.where(self.velocity_y < 0, np.maximum(-self.ball_y / self.velocity_y, 0),
+                                  np.where(self.velocity_y > 0, np.maximum((top - self.ball_y) / self.velocity_y, 0),
+                                           np.inf))
+            wall = pending & (t_wall <= remaining)
+            t_impact = np.where(wall, t_wall, remaining)
+            obstacle = np.where(wall, WALL, NO_OBSTACLE)
+            for side in (0, 1):
+                t_paddle = self._time_of_impact(side, paddles_x[side], t_impact)
+                better = pending & np.isfinite(t_paddle) & ((t_paddle < t_impact) | (obstacle == NO_OBSTACLE))
+                t_impact = np.where(better, t_paddle, t_impact)
+                obstacle = np.where(better, side, obstacle)
+
+            self.ball_x = np.where(pending, self.ball_x + self.velocity_x * t_impact, self.ball_x)
+            self.ball_y = np.where(pending, self.ball_y + self.velocity_y * t_impact, self.ball_y)
+            remaining = np.where(pending, remaining - t_impact, remaining)
+            pending &= obstacle != NO_OBSTACLE
+            if not pending.any():
+                break
+
+            # Ball rebound from the horizontal borders of the field
+            wall = pending & (obstacle == WALL)
+            self.ball_y = np.where(wall, np.where(self.velocity_y < 0, 0, top), self.ball_y)
+            self.velocity_y = np.where(wall, -self.velocity_y, self.velocity_y)
+            hit = pending & ((obstacle == 0) | (obstacle == 1))
+            self.ai_valid[:, hit] = False
+            for side in (0, 1):
+                hits[side] |= pending & (obstacle == side)
+                self._reflect_balls(side, paddles_x[side], pending & (obstacle == side))
+        return hits
+
+    def _reflect_balls(self, side: int, paddle_x: float, hit: np.ndarray) -> None:
+        """
+        Method is vectorized version of PaddleState.reflect_ball.
+        :param side: 0 for left racket and 1 for right racket;
+        :param paddle_x: horizontal position of racket;
+        :param hit: mask of matches in which ball hits the racket.
+        """
+
+        if not hit.any():
+            return
+        new_velocity = self.increment_coefficient * np.hypot(self.velocity_x, self.velocity_y)
+        coefficient = np.where(new_velocity < self.max_velocity, self.increment_coefficient, 1)
+        coefficient = np.where(hit, coefficient, 1)
+        self.velocity_x = np.where(hit, -coefficient * self.velocity_x, self.velocity_x)
+        self.velocity_y *= coefficient
+        new_x = paddle_x + self.paddle_width if side == 0 else paddle_x - self.ball_size
+        self.ball_x = np.where(hit, new_x, self.ball_x)
+
+    def _time_of_impact(self, side: int, paddle_x: float, limit: np.ndarray) -> np.ndarray:
+        """
+        Method is vectorized version of PaddleState.time_of_impact.
+        :param side: 0 for left racket and 1 for right racket;
+        :param paddle_x: horizontal position of racket;
+        :param limit: durations of movement.
+        :return: times when balls touch the racket, infinity if there is no touch.
+        """
+
+        paddle_y = self.paddle_y[side]
+        possible = self.velocity_x < 0 if side == 0 else self.velocity_x > 0
+        t_enter = np.zeros(self.n)
+        t_exit = limit
+        for position, velocity, low, high in (
+                (self.ball_x, self.velocity_x, paddle_x - self.ball_size, paddle_x + self.paddle_width),
+                (self.ball_y, self.velocity_y, paddle_y - self.ball_size, paddle_y + self.paddle_height)):
+            still = velocity == 0
+            possible &= ~still | ((position >= low) & (position <= high))
+            with np.errstate(divide="ignore", invalid="ignore"):
+                t_1 = (low - position) / velocity
+                t_2 = (high - position) / velocity
+            t_enter = np.where(still, t_enter, np.maximum(t_enter, np.minimum(t_1, t_2)))
+            t_exit = np.where(still, t_exit, np.minimum(t_exit, np.maximum(t_1, t_2)))
+        return np.where(possible & (t_enter <= t_exit), t_enter, np.inf)
+
+    def load(self, index: int, simulation: Simulation) -> None:
+        """
+        Method copies state of scalar simulation to match with given index.
+        :param index: index of match;
+        :param simulation: scalar simulation.
+        """
+
+        ball = simulation.ball
+        self.ball_x[index] = ball.x
+        self.ball_y[index] = ball.y
+        self.velocity_x[index] = ball.velocity_x
+        self.velocity_y[index] = ball.velocity_y
+        for side, (paddle, controller) in enumerate(zip(simulation.paddles, simulation.controllers)):
+            self.paddle_y[side, index] = paddle.y
+            self.ai[side, index] = controller is not None
+            # State of policy controllers is kept by policies of batch
+            if isinstance(controller, AIController):
+                self.ai_error[side, index] = controller.error
+                self.ai_error_magnitude[side, index] = controller.error_magnitude
+                self.ai_error_scale[side, index] = controller.error_scale
+                self.ai_match_point_error[side, index] = controller.match_point_error
+                self.ai_min_velocity[side, index] = controller.min_velocity
+                self.ai_velocity[side, index] = controller.velocity
+                self.ai_target_y[side, index] = controller.target_y
+                self.ai_time_left[side, index] = controller.time_left
+                self.ai_valid[side, index] = controller.valid
+        self.score[:, index] = simulation.score.left, simulation.score.right
+        self.rally[index] = simulation.rally
+        self.round_over[index] = simulation.round_over
+        self.game_over[index] = simulation.score.is_game_over()
+        self.increment_coefficient[index] = simulation.increment_coefficient
+
+    def run(self, dt: float, max_ticks: int = MAX_TICKS) -> BatchResult:
+        """
+        Method plays all matches to the end.
+        :param dt: duration of one tick;
+        :param max_ticks: maximum number of ticks to play.
+        :return: results of matches.
+        """
+
+        start = time.perf_counter()
+        self.start_matches()
+        ticks = 0
+        while ticks < max_ticks and not self.game_over.all():
+            self.step(dt)
+            ticks += 1
+        return BatchResult(self.score[0].copy(), self.score[1].copy(), ticks, time.perf_counter() - start,
+                           int(self.game_over.sum()))
+
+    def start_matches(self) -> None:
+        self.score[:] = 0
+        self.game_over[:] = False
+        self.start_rounds(np.ones(self.n, dtype=bool))
+
+    def start_rounds(self, mask: np.ndarray) -> None:
+        """
+        Method is vectorized version of Simulation.start_round.
+        :param mask: mask of matches in which new round should be started.
+        """
+
+        count = int(mask.sum())
+        if not count:
+            return
+        if self.rngs is None:
+            angles = self.rng.choice(self.serve_angles, count) + np.pi * self.rng.integers(0, 2, count)
+            self.velocity_x[mask] = self.init_velocity * np.cos(angles)
+            self.velocity_y[mask] = self.init_velocity * np.sin(angles)
+        else:
+            for index in np.flatnonzero(mask):
+                self.velocity_x[index], self.velocity_y[index] = self._draw_scalar_velocity(self.rngs[index])
+        self.ball_x[mask] = (self.width - self.ball_size) / 2
+        self.ball_y[mask] = (self.height - self.ball_size) / 2
+        self.paddle_y[:, mask] = (self.height - self.paddle_height) / 2
+        for side in (0, 1):
+            self._change_ai_errors(side, mask)
+        self.ai_valid[:, mask] = False
+        self.rally[mask] = 0
+        self.round_over[mask] = False
+
+    def step(self, dt: float, auto_serve: bool = True) -> None:
+        """
+        Method advances all matches by given time.
+        :param dt: time elapsed since the previous moment;
+        :param auto_serve: if True, new round is started at once in matches where somebody scored.
+        """
+
+        active = ~self.round_over
+        self._change_ai_positions(dt, active)
+        hits = self._move_balls(dt, active)
+        # AI that has to return ball chooses new error after hit of opponent as in Simulation._change_errors
+        for side in (0, 1):
+            self._change_ai_errors(side, hits[1 - side] & self.ai[side])
+        self.rally += hits[0] | hits[1]
+        left_goal = active & (self.ball_x < 0)
+        right_goal = active & ~left_goal & (self.ball_x > self.width)
+        if self.max_rally is not None:
+            # Point of too long rally goes to the player who hit the ball last
+            long_rally = active & ~left_goal & ~right_goal & (self.rally >= self.max_rally)
+            left_goal |= long_rally & (self.velocity_x <= 0)
+            right_goal |= long_rally & (self.velocity_x > 0)
+        self.score[1] += left_goal
+        self.score[0] += right_goal
+        goal = left_goal | right_goal
+        self.round_over |= goal
+        self.game_over |= goal & ((self.score[0] >= self.max_score) | (self.score[1] >= self.max_score))
+        if auto_serve:
+            self.start_rounds(goal & ~self.game_over)
+
+
+def check_against_scalar(n_matches: int = 16, dt: float = 1 / 60, width: float = 1000, height: float = 800,
+                         seed: int = 0, error: float = 0.5, max_rally: int = MAX_RALLY,
+                         max_ticks: int = MAX_TICKS) -> float:
+    """
+    Function plays the same matches to the end with scalar and batch simulations and compares the results. Batch
+    draws serves and errors from copies of random number generators of scalar simulations, so matches are the same
+    if rules are the same. AI players make random errors, so that serving, scoring and errors of all rounds are
+    compared.
+    :param n_matches: number of matches;
+    :param dt: duration of one tick;
+    :param width: width of field;
+    :param height: height of field;
+    :param seed: seed for random number generators;
+    :param error: maximum relative error of AI players;
+    :param max_rally: maximum number of hits in rally;
+    :param max_ticks: maximum number of ticks to play.
+    :return: maximum difference between positions of balls and rackets, scores and lengths of matches.
+    """
+
+    def create_controller() -> AIController:
+        return AIController(error_magnitude=error, error_scale=1, match_point_error=True)
+
+    simulations: List[Simulation] = []
+    for index in range(n_matches):
+        simulation = Simulation(FieldState(width, height), left_controller=None if index % 4 == 3 else
+                                create_controller(), right_controller=create_controller(),
+                                rng=random.Random(seed + index), max_rally=max_rally)
+        simulation.start_match()
+        simulations.append(simulation)
+    rngs = []
+    for simulation in simulations:
+        rng = random.Random()
+        rng.setstate(simulation.rng.getstate())
+        rngs.append(rng)
+    batch = BatchSimulation(n_matches, width, height, max_rally=max_rally, rngs=rngs)
+    for index, simulation in enumerate(simulations):
+        batch.load(index, simulation)
+
+    lengths = np.zeros(n_matches, dtype=np.int64)
+    batch_lengths = np.zeros(n_matches, dtype=np.int64)
+    for tick in range(max_ticks):
+        if batch.game_over.all() and all(simulation.score.is_game_over() for simulation in simulations):
+            break
+        batch_lengths[~batch.game_over] = tick + 1
+        batch.step(dt)
+        for index, simulation in enumerate(simulations):
+            if simulation.score.is_game_over():
+                continue
+            lengths[index] = tick + 1
+            simulation.step(dt)
+            if simulation.round_over and not simulation.score.is_game_over():
+                simulation.start_round()
+
+    def collect(values: Sequence[float]) -> np.ndarray:
+        return np.array(values, dtype=np.float64)
+
+    differences = (collect([s.ball.x for s in simulations]) - batch.ball_x,
+                   collect([s.ball.y for s in simulations]) - batch.ball_y,
+                   collect([s.paddles[0].y for s in simulations]) - batch.paddle_y[0],
+                   collect([s.paddles[1].y for s in simulations]) - batch.paddle_y[1],
+                   collect([s.score.left for s in simulations]) - batch.score[0],
+                   collect([s.score.right for s in simulations]) - batch.score[1],
+                   lengths - batch_lengths)
+    return max(float(np.max(np.abs(difference))) for difference in differences)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Play many AI-vs-AI matches at once and report throughput")
+    parser.add_argument("--matches", type=int, default=10000, help="number of matches")
+    parser.add_argument("--dt", type=float, default=1 / 60, help="duration of one tick in seconds")
+    parser.add_argument("--width", type=float, default=1000, help="width of field")
+    parser.add_argument("--height", type=float, default=800, help="height of field")
+    parser.add_argument("--error", type=float, default=0.3, help="maximum relative error of AI players")
+    parser.add_argument("--max-rally", type=int, default=MAX_RALLY, help="maximum number of hits in rally")
+    parser.add_argument("--max-ticks", type=int, default=MAX_TICKS, help="maximum number of ticks to play")
+    parser.add_argument("--seed", type=int, default=None, help="seed for random number generator")
+    parser.add_argument("--check", action="store_true", help="compare results with scalar simulation")
+    args = parser.parse_args()
+
+    if args.check:
+        difference = check_against_scalar(dt=args.dt, error=args.error, max_rally=args.max_rally)
+        print(f"Maximum difference with scalar simulation in whole matches: {difference:.3g}")
+    batch = BatchSimulation(args.matches, args.width, args.height, seed=args.seed, max_rally=args.max_rally)
+    # Both AI players make random errors, also on match point, otherwise they could never finish match
+    batch.ai_error_magnitude[:] = args.error
+    batch.ai_error_scale[:] = 1
+    batch.ai_match_point_error[:] = True
+    result = batch.run(args.dt, args.max_ticks)
+    print(f"Matches: {batch.n}, finished: {result.finished}, ticks: {result.ticks}, time: {result.elapsed:.2f} s, "
+          f"finished matches per second: {result.matches_per_second:.1f}")
+    print(f"Left player won {int(np.sum(result.score_left >= batch.max_score))} matches, "
+          f"right player won {int(np.sum(result.score_right >= batch.max_score))} matches")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,694 @@
+import argparse
+import asyncio
+import errno
+import logging
+import math
+import random
+import resource
+import socket
+import struct
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Set, Tuple
+from pong.network import (FIELD_FORMATS, FULL_MASK, get_snapshot_values, interpolate_state, NetworkClient, NetworkPeer,
+                          NetworkStats, Phase)
+from pong.profiler import calculate_statistics, RollingHistogram
+from pong.simulation import AIController, FieldState, Simulation
+
+
+BROADCAST_VERSION: int = 1
+MAGIC: bytes = b"PONGTV"
+# Greeting sent to subscriber after connection: magic and version of protocol
+HELLO = struct.Struct("<6sB")
+# Header of every frame: size of frame, type, tick and mask of fields in frame
+FRAME_HEADER = struct.Struct("<HBIH")
+# Keyframe has size of field and tick rate after header and all fields
+KEYFRAME_FIELD = struct.Struct("<ffH")
+KEYFRAME_PACKET: int = 1
+DELTA_PACKET: int = 2
+# Time in seconds to wait for all subscribers of load test to connect
+CONNECT_TIMEOUT: float = 30
+# Time in seconds while subscribers of load test read the rest of frames after publishing
+DRAIN_TIME: float = 2
+# Time in seconds while slow subscriber of load test does not read. Kernel and transport buffers of stalled connection
+# hold about 6 seconds of frames at 60 frames per second, so stall should be longer to make server drop frames
+STALL_TIME: float = 8
+
+
+class FrameEncoder:
+    """
+    Class encodes states of match to frames for spectators. Frame is encoded once for all subscribers: keyframe
+    has all fields, delta has fields changed since the previous frame.
+    """
+
+    KEYFRAME_INTERVAL: int = 60
+
+    def __init__(self, keyframe_interval: int = KEYFRAME_INTERVAL) -> None:
+        """
+        :param keyframe_interval: every frame with this number is keyframe.
+        """
+
+        self._field: Tuple[float, float, int] = (0, 0, 0)
+        self._frames: int = 0
+        self._keyframe: Optional[bytes] = None
+        self._tick: int = 0
+        self._values: Optional[Tuple] = None
+        self.keyframe_interval: int = keyframe_interval
+
+    def _encode(self, packet: int, mask: int, payload: bytes) -> bytes:
+        return FRAME_HEADER.pack(FRAME_HEADER.size + len(payload), packet, self._tick, mask) + payload
+
+    def encode(self, values: Tuple, tick: int, width: float, height: float, tick_rate: int) -> bytes:
+        """
+        :param values: quantized values of snapshot fields;
+        :param tick: tick of simulation;
+        :param width: width of field;
+        :param height: height of field;
+        :param tick_rate: number of ticks per second.
+        :return: frame for subscribers that received the previous frame.
+        """
+
+        previous = self._values
+        field = width, height, tick_rate
+        self._tick = tick
+        self._values = values
+        self._keyframe = None
+        self._frames += 1
+        if previous is None or field != self._field or self._frames % self.keyframe_interval == 0:
+            self._field = field
+            return self.get_keyframe()
+        mask = 0
+        payload = []
+        for bit, (field_struct, value) in enumerate(zip(FIELD_FORMATS, values)):
+            if previous[bit] != value:
+                mask |= 1 << bit
+                payload.append(field_struct.pack(value))
+        return self._encode(DELTA_PACKET, mask, b"".join(payload))
+
+    def get_keyframe(self) -> bytes:
+        """
+        :return: keyframe with the last encoded state. Keyframe is encoded only once.
+        """
+
+        if self._keyframe is None:
+            payload = KEYFRAME_FIELD.pack(*self._field) + b"".join(field_struct.pack(value) for field_struct, value
+                                                                   in zip(FIELD_FORMATS, self._values))
+            self._keyframe = self._encode(KEYFRAME_PACKET, FULL_MASK, payload)
+        return self._keyframe
+
+
+class FrameDecoder:
+    """
+    Class restores states of match from stream of frames.
+    """
+
+    def __init__(self) -> None:
+        self._buffer: bytearray = bytearray()
+        self._has_hello: bool = False
+        self.field: Optional[FieldState] = None
+        self.keyframes: int = 0
+        self.tick_rate: int = 0
+        self.values: Optional[Tuple] = None
+
+    def feed(self, data: bytes) -> List[Tuple[int, Tuple]]:
+        """
+        :param data: bytes received from server.
+        :return: ticks and values of complete frames in data.
+        """
+
+        buffer = self._buffer
+        buffer += data
+        offset = 0
+        if not self._has_hello:
+            if len(buffer) < HELLO.size:
+                return []
+            magic, version = HELLO.unpack_from(buffer)
+            if magic != MAGIC or version != BROADCAST_VERSION:
+                raise ValueError("Server does not speak broadcast protocol of this version")
+            self._has_hello = True
+            offset = HELLO.size
+        states = []
+        while len(buffer) - offset >= FRAME_HEADER.size:
+            size, packet, tick, mask = FRAME_HEADER.unpack_from(buffer, offset)
+            if len(buffer) - offset < size:
+                break
+            position = offset + FRAME_HEADER.size
+            if packet == KEYFRAME_PACKET:
+                width, height, self.tick_rate = KEYFRAME_FIELD.unpack_from(buffer, position)
+                position += KEYFRAME_FIELD.size
+                self.field = FieldState(width, height)
+                self.keyframes += 1
+                baseline = None
+            elif self.values is None:
+                raise ValueError("Delta frame is received before keyframe")
+            else:
+                baseline = self.values
+            values = []
+            for bit, field_struct in enumerate(FIELD_FORMATS):
+                if mask & (1 << bit):
+                    values.append(field_struct.unpack_from(buffer, position)[0])
+                    position += field_struct.size
+                else:
+                    values.append(baseline[bit])
+            self.values = tuple(values)
+            states.append((tick, self.values))
+            offset += size
+        del buffer[:offset]
+        return states
+
+
+class _SubscriberProtocol(asyncio.Protocol):
+    """
+    Class of connection of one spectator. Transport reports when its buffer is full, then frames are not written
+    to it until the buffer drains.
+    """
+
+    def __init__(self, server: "BroadcastServer") -> None:
+        self._server: "BroadcastServer" = server
+        self.dropped_frames: int = 0
+        self.paused: bool = False
+        self.synced: bool = False
+        self.transport: Optional[asyncio.WriteTransport] = None
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        self._server.subscribers.discard(self)
+
+    def connection_made(self, transport: asyncio.WriteTransport) -> None:
+        if len(self._server.subscribers) >= self._server.max_subscribers:
+            transport.close()
+            return
+        self.transport = transport
+        sock = transport.get_extra_info("socket")
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, BroadcastServer.SOCKET_BUFFER)
+        transport.set_write_buffer_limits(high=BroadcastServer.MAX_BUFFER)
+        transport.write(HELLO.pack(MAGIC, BROADCAST_VERSION))
+        self._server.subscribers.add(self)
+
+    def pause_writing(self) -> None:
+        self.paused = True
+
+    def resume_writing(self) -> None:
+        self.paused = False
+
+
+class BroadcastServer:
+    """
+    Class sends states of match to spectators connected by TCP. Every state is encoded once and the same bytes are
+    written to all subscribers. Subscriber that does not read fast enough misses frames instead of slowing down the
+    game, after that it gets keyframe and continues with deltas.
+    """
+
+    BACKLOG: int = 1024
+    # Size of unsent data in bytes after which frames are dropped for subscriber
+    MAX_BUFFER: int = 2048
+    # Small socket buffers keep memory of thousands of subscribers low and let slow subscriber be found quickly
+    SOCKET_BUFFER: int = 4096
+    MAX_SUBSCRIBERS: int = 5000
+
+    def __init__(self, address: Tuple[str, int], keyframe_interval: int = FrameEncoder.KEYFRAME_INTERVAL,
+                 max_subscribers: int = MAX_SUBSCRIBERS) -> None:
+        """
+        :param address: address to listen to;
+        :param keyframe_interval: every frame with this number is keyframe;
+        :param max_subscribers: maximum number of subscribers, the next ones are disconnected.
+        """
+
+        self._encoder: FrameEncoder = FrameEncoder(keyframe_interval)
+        self._server: Optional[asyncio.AbstractServer] = None
+        self.address: Tuple[str, int] = address
+        self.bytes_sent: int = 0
+        self.dropped_frames: int = 0
+        self.durations: RollingHistogram = RollingHistogram()
+        self.frames: int = 0
+        self.max_subscribers: int = max_subscribers
+        self.subscribers: Set[_SubscriberProtocol] = set()
+
+    def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+        for subscriber in list(self.subscribers):
+            subscriber.transport.close()
+
+    def publish(self, values: Tuple, tick: int, width: float, height: float, tick_rate: int) -> None:
+        """
+        Method sends state to all subscribers. It should be called in thread of event loop.
+        :param values: quantized values of snapshot fields;
+        :param tick: tick of simulation;
+        :param width: width of field;
+        :param height: height of field;
+        :param tick_rate: number of ticks per second.
+        """
+
+        start = time.perf_counter()
+        frame = self._encoder.encode(values, tick, width, height, tick_rate)
+        sent = 0
+        for subscriber in self.subscribers:
+            if subscriber.paused:
+                subscriber.synced = False
+                subscriber.dropped_frames += 1
+                self.dropped_frames += 1
+                continue
+            if subscriber.synced:
+                data = frame
+            else:
+                data = self._encoder.get_keyframe()
+                subscriber.synced = True
+            subscriber.transport.write(data)
+            sent += len(data)
+        self.bytes_sent += sent
+        self.frames += 1
+        self.durations.add(time.perf_counter() - start)
+
+    async def start(self) -> None:
+        loop = asyncio.get_event_loop()
+        self._server = await loop.create_server(lambda: _SubscriberProtocol(self), *self.address,
+                                                backlog=BroadcastServer.BACKLOG, reuse_address=True)
+        self.address = self._server.sockets[0].getsockname()[:2]
+
+
+class BroadcastThread:
+    """
+    Class runs broadcast server in event loop of background thread, so that game thread only passes states to it.
+    Fan-out is Python code that holds GIL against thread of game, so number of subscribers is limited.
+    """
+
+    # Fan-out costs 7-15 us per subscriber on loopback (see load test), so 200 subscribers take 1.5-3 ms of 16.7 ms
+    # frame at 60 frames per second
+    MAX_SUBSCRIBERS: int = 200
+
+    def __init__(self, address: Tuple[str, int], max_subscribers: int = MAX_SUBSCRIBERS) -> None:
+        """
+        :param address: address to listen to;
+        :param max_subscribers: maximum number of subscribers, the next ones are disconnected.
+        """
+
+        self._error: Optional[OSError] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._ready: threading.Event = threading.Event()
+        self._thread: threading.Thread = threading.Thread(target=self._run, name="Broadcast", daemon=True)
+        self.server: BroadcastServer = BroadcastServer(address, max_subscribers=max_subscribers)
+
+    def _run(self) -> None:
+        loop = self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_until_complete(self.server.start())
+        except OSError as error:
+            self._error = error
+            self._ready.set()
+            loop.close()
+            return
+        self._ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            self.server.close()
+            # Transports of subscribers are closed in the next iteration of loop
+            loop.run_until_complete(asyncio.sleep(0))
+            loop.close()
+
+    def close(self) -> None:
+        if self._thread.is_alive():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+
+    def publish(self, values: Tuple, tick: int, width: float, height: float, tick_rate: int) -> None:
+        """
+        Method passes state to broadcast server. Encoding and sending are done in background thread.
+        :param values: quantized values of snapshot fields;
+        :param tick: tick of simulation;
+        :param width: width of field;
+        :param height: height of field;
+        :param tick_rate: number of ticks per second.
+        """
+
+        self._loop.call_soon_threadsafe(self.server.publish, values, tick, width, height, tick_rate)
+
+    def start(self) -> None:
+        """
+        Method starts server and waits until it listens.
+        """
+
+        self._thread.start()
+        self._ready.wait()
+        if self._error is not None:
+            raise self._error
+
+
+class SpectatorClient:
+    """
+    Class of spectator of broadcast match. It reads frames from non-blocking TCP socket once per rendered frame and
+    renders states with the same delay and interpolation as client of networked match.
+    """
+
+    READ_SIZE: int = 65536
+
+    def __init__(self, address: Tuple[str, int]) -> None:
+        """
+        :param address: address of broadcast server.
+        """
+
+        self._decoder: FrameDecoder = FrameDecoder()
+        self._socket: socket.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.setblocking(False)
+        self._socket.connect_ex(address)
+        # Received states with local time of receiving
+        self._timeline: List[Tuple[float, Tuple]] = []
+        self.closed: bool = False
+        self.last_received: float = 0
+        self.stats: NetworkStats = NetworkStats()
+
+    @property
+    def field(self) -> Optional[FieldState]:
+        return self._decoder.field
+
+    def close(self) -> None:
+        self._socket.close()
+
+    def get_state(self) -> Optional[Dict[str, float]]:
+        """
+        :return: state to render interpolated for moment INTERPOLATION_DELAY ago.
+        """
+
+        if not self._timeline:
+            return None
+        return interpolate_state(self._timeline, time.perf_counter() - NetworkClient.INTERPOLATION_DELAY,
+                                 self.field.width)
+
+    def is_timed_out(self) -> bool:
+        """
+        :return: True if server closed connection or nothing has been received for TIMEOUT seconds.
+        """
+
+        return self.closed or (bool(self.last_received) and
+                               time.perf_counter() - self.last_received > NetworkPeer.TIMEOUT)
+
+    def poll(self) -> None:
+        """
+        Method reads all received frames. It should be called once per frame.
+        """
+
+        while not self.closed:
+            try:
+                data = self._socket.recv(SpectatorClient.READ_SIZE)
+            except BlockingIOError:
+                break
+            except OSError as error:
+                if error.errno != errno.ENOTCONN:
+                    logging.warning("Connection with broadcast server failed: %s", error)
+                    self.closed = True
+                break
+            if not data:
+                self.closed = True
+                break
+            now = time.perf_counter()
+            self.last_received = now
+            self.stats.bytes_received += len(data)
+            try:
+                states = self._decoder.feed(data)
+            except ValueError as error:
+                logging.warning("Broken broadcast: %s", error)
+                self.closed = True
+                break
+            self.stats.packets_received += len(states)
+            self._timeline.extend((now, values) for _, values in states)
+        now = time.perf_counter()
+        while len(self._timeline) > 2 and self._timeline[1][0] < now - 2 * NetworkClient.INTERPOLATION_DELAY:
+            self._timeline.pop(0)
+
+
+class _LoadTestProtocol(asyncio.Protocol):
+    """
+    Class of subscriber of load test. Slow subscriber reads intermittently, like spectator with stalled connection:
+    it stops reading long enough for server to drop frames, then reads again and is resynchronized with keyframe.
+    """
+
+    # Time in seconds while slow subscriber reads between stalls
+    READ_TIME: float = 1
+
+    def __init__(self, slow: bool, stall: float) -> None:
+        """
+        :param slow: if True, subscriber reads intermittently;
+        :param stall: time in seconds while slow subscriber does not read.
+        """
+
+        self._decoder: FrameDecoder = FrameDecoder()
+        self._event: Optional[asyncio.TimerHandle] = None
+        self._slow: bool = slow
+        self._stall_time: float = stall
+        self._transport: Optional[asyncio.Transport] = None
+        self.errors: int = 0
+        self.frames: int = 0
+        self.last: Optional[Tuple[int, Tuple]] = None
+        self.stalls: int = 0
+
+    def _read(self) -> None:
+        self._transport.resume_reading()
+        self._event = asyncio.get_event_loop().call_later(_LoadTestProtocol.READ_TIME, self._stall)
+
+    def _stall(self) -> None:
+        self._transport.pause_reading()
+        self.stalls += 1
+        self._event = asyncio.get_event_loop().call_later(self._stall_time, self._read)
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        if self._event:
+            self._event.cancel()
+            self._event = None
+
+    def connection_made(self, transport: asyncio.Transport) -> None:
+        self._transport = transport
+        if self._slow:
+            self._stall()
+
+    def data_received(self, data: bytes) -> None:
+        try:
+            states = self._decoder.feed(data)
+        except ValueError:
+            self.errors += 1
+            self._transport.close()
+            return
+        self.frames += len(states)
+        if states:
+            self.last = states[-1]
+
+    def finish(self) -> None:
+        """
+        Method makes slow subscriber read everything that is left.
+        """
+
+        if self._event:
+            self._event.cancel()
+            self._event = None
+        if self._slow and not self._transport.is_closing():
+            self._transport.resume_reading()
+
+
+def run_subscribers(port: int, count: int, slow: int, duration: float, stall: float) -> Dict[str, Any]:
+    """
+    Function connects subscribers to broadcast server and reads frames.
+    :param port: port of server on localhost;
+    :param count: number of subscribers;
+    :param slow: number of slow subscribers among them;
+    :param duration: time to read in seconds, after it all subscribers read the rest of frames;
+    :param stall: time in seconds while slow subscriber does not read.
+    :return: numbers of received frames and keyframes, decoding errors and the last received states.
+    """
+
+    async def subscribe() -> List[_LoadTestProtocol]:
+        loop = asyncio.get_event_loop()
+        protocols = []
+        for index in range(count):
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            if index < slow:
+                # Buffer is set before connection, so that small window is advertised from the start and stalled
+                # subscriber is found by server sooner
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1)
+            sock.setblocking(False)
+            await loop.sock_connect(sock, ("127.0.0.1", port))
+            _, protocol = await loop.create_connection(lambda: _LoadTestProtocol(index < slow, stall), sock=sock)
+            protocols.append(protocol)
+        await asyncio.sleep(duration)
+        for protocol in protocols:
+            protocol.finish()
+        await asyncio.sleep(DRAIN_TIME)
+        return protocols
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        protocols = loop.run_until_complete(subscribe())
+    finally:
+        loop.close()
+    return {"fast_frames": [protocol.frames for protocol in protocols[slow:]],
+            "slow_frames": [protocol.frames for protocol in protocols[:slow]],
+            "slow_stalls": [protocol.stalls for protocol in protocols[:slow]],
+            "keyframes": sum(protocol._decoder.keyframes for protocol in protocols),
+            "errors": sum(protocol.errors for protocol in protocols),
+            "fast_last": [protocol.last for protocol in protocols[slow:]],
+            "slow_last": [protocol.last for protocol in protocols[:slow]]}
+
+
+def raise_open_files_limit(required: int) -> None:
+    """
+    :param required: number of files that should be open at once.
+    """
+
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if hard != resource.RLIM_INFINITY and hard < required:
+        raise RuntimeError(f"Limit of open files {hard} is less than required {required}, raise it by ulimit -Hn")
+    if soft < required:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (required, hard))
+
+
+async def _publish_match(server: BroadcastServer, rate: int, duration: float, published: Dict[int, Tuple]) -> float:
+    """
+    Function plays match between two AIs and publishes its states with given rate.
+    :return: processor time spent by server in seconds.
+    """
+
+    tick_rate = 120
+    field = FieldState(1000, 800)
+    simulation = Simulation(field, left_controller=AIController(), right_controller=AIController(),
+                            rng=random.Random(1))
+    simulation.start_match()
+    loop = asyncio.get_event_loop()
+    period = 1 / rate
+    deadline = loop.time()
+    finish = deadline + duration
+    cpu_start = time.process_time()
+    while deadline < finish:
+        for _ in range(tick_rate // rate):
+            simulation.step(1 / tick_rate)
+            if simulation.round_over:
+                if simulation.score.is_game_over():
+                    simulation.start_match()
+                else:
+                    simulation.start_round()
+        values = get_snapshot_values(simulation, Phase.PLAYING)
+        published[simulation.tick] = values
+        server.publish(values, simulation.tick, field.width, field.height, tick_rate)
+        deadline += period
+        await asyncio.sleep(max(deadline - loop.time(), 0))
+    return time.process_time() - cpu_start
+
+
+def _wait_for_subscribers(loop: asyncio.AbstractEventLoop, server: BroadcastServer, subscribers: int,
+                          futures: List[Future]) -> None:
+    """
+    Function waits until all subscribers of load test connect.
+    :param loop: event loop of server;
+    :param server: broadcast server;
+    :param subscribers: number of subscribers;
+    :param futures: futures of processes with subscribers.
+    """
+
+    deadline = time.monotonic() + CONNECT_TIMEOUT
+    while len(server.subscribers) < subscribers:
+        for future in futures:
+            if future.done():
+                # Process with subscribers failed to connect, its error is raised
+                future.result()
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"Only {len(server.subscribers)} of {subscribers} subscribers connected in "
+                               f"{CONNECT_TIMEOUT} s")
+        loop.run_until_complete(asyncio.sleep(0.1))
+
+
+def run_load_test(subscribers: int, slow: int, duration: float, rate: int, processes: int,
+                  stall: float = STALL_TIME) -> None:
+    """
+    Function runs broadcast server with many local subscribers and prints cost of fan-out. Test fails if median
+    fan-out takes longer than period of frames, if subscriber that reads all the time misses frames, if any subscriber
+    decodes state that was not published or if frames are not dropped for slow subscribers.
+    :param subscribers: number of subscribers;
+    :param slow: number of slow subscribers;
+    :param duration: time to publish in seconds;
+    :param rate: number of published frames per second;
+    :param processes: number of processes with subscribers;
+    :param stall: time in seconds while slow subscriber does not read.
+    """
+
+    raise_open_files_limit(subscribers + 100)
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    server = BroadcastServer(("127.0.0.1", 0), max_subscribers=subscribers)
+    loop.run_until_complete(server.start())
+    port = server.address[1]
+    counts = [len(range(shard, subscribers, processes)) for shard in range(processes)]
+    slow_counts = [len(range(shard, slow, processes)) for shard in range(processes)]
+    published = {}
+    try:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            futures = [executor.submit(run_subscribers, port, count, slow_count, duration, stall)
+                       for count, slow_count in zip(counts, slow_counts)]
+            _wait_for_subscribers(loop, server, subscribers, futures)
+            cpu_time = loop.run_until_complete(_publish_match(server, rate, duration, published))
+            reports = [future.result() for future in futures]
+    finally:
+        server.close()
+        loop.run_until_complete(asyncio.sleep(0))
+        loop.close()
+
+    fast_frames = [frames for report in reports for frames in report["fast_frames"]]
+    slow_frames = [frames for report in reports for frames in report["slow_frames"]]
+    # Subscriber that reads all the time gets every published frame
+    lossy = [server.frames - frames for frames in fast_frames if frames < server.frames]
+    mismatches = sum(1 for report in reports for last in report["fast_last"]
+                     if last is None or published.get(last[0]) != last[1])
+    slow_mismatches = sum(1 for report in reports for last in report["slow_last"]
+                          if last is None or published.get(last[0]) != last[1])
+    stalls = [stalls for report in reports for stalls in report["slow_stalls"]]
+    statistics = calculate_statistics(server.durations.get_samples())
+    period = 1000 / rate
+    frame_size = server.bytes_sent / max(server.frames * subscribers, 1)
+    print(f"Subscribers: {subscribers} ({slow} slow), frames: {server.frames} at {rate} per second")
+    print(f"Fan-out of frame: p50 {statistics['p50']:.3f} p95 {statistics['p95']:.3f} p99 {statistics['p99']:.3f} "
+          f"max {statistics['max']:.3f} ms, {1e6 * statistics['p50'] / 1000 / subscribers:.2f} us per subscriber")
+    print(f"Fan-out of frame against period {period:.1f} ms: p50 {100 * statistics['p50'] / period:.0f}%, "
+          f"p95 {100 * statistics['p95'] / period:.0f}%")
+    print(f"Server CPU load: {100 * cpu_time / duration:.1f}%, "
+          f"{1e6 * cpu_time / max(server.frames * subscribers, 1):.2f} us per frame and subscriber")
+    print(f"Sent: {server.bytes_sent / duration / 2 ** 20:.2f} MB/s, {frame_size:.1f} bytes per frame on average")
+    print(f"Fast subscribers received: min {min(fast_frames, default=0)} frames, "
+          f"mean {sum(fast_frames) / max(len(fast_frames), 1):.0f} frames, {len(lossy)} subscribers missed "
+          f"{sum(lossy)} frames")
+    if slow:
+        print(f"Slow subscribers received: mean {sum(slow_frames) / len(slow_frames):.0f} frames, "
+              f"stalls: {sum(stalls) / len(stalls):.1f} on average, dropped frames: {server.dropped_frames}, "
+              f"with wrong last state: {slow_mismatches}")
+    errors = sum(report["errors"] for report in reports)
+    print(f"Keyframes received: {sum(report['keyframes'] for report in reports)}, decoding errors: {errors}, "
+          f"fast subscribers with wrong last state: {mismatches}")
+    if errors or mismatches or slow_mismatches:
+        raise RuntimeError("Subscribers decoded states that were not published")
+    if slow and not server.dropped_frames:
+        raise RuntimeError(f"No frames were dropped for slow subscribers, duration should be longer than stall time "
+                           f"{stall} s")
+    if statistics["p50"] > period:
+        raise RuntimeError(f"Fan-out of frame usually takes longer than period {period:.1f} ms, server cannot keep "
+                           f"up with {subscribers} subscribers")
+    if lossy:
+        raise RuntimeError(f"{len(lossy)} subscribers that read all the time missed frames")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure cost of broadcast of match to many local spectators")
+    parser.add_argument("--subscribers", type=int, default=500, help="number of subscribers")
+    parser.add_argument("--slow", type=int, default=50, help="number of subscribers that read slowly")
+    parser.add_argument("--duration", type=float, default=20, help="time to publish in seconds")
+    parser.add_argument("--rate", type=int, default=60, help="number of frames per second")
+    parser.add_argument("--processes", type=int, default=2, help="number of processes with subscribers")
+    parser.add_argument("--stall", type=float, default=STALL_TIME,
+                        help="time in seconds while slow subscriber does not read")
+    args = parser.parse_args()
+    if args.slow and args.duration <= args.stall:
+        parser.error("duration should be longer than stall time of slow subscribers")
+    run_load_test(args.subscribers, min(args.slow, args.subscribers), args.duration, args.rate, args.processes,
+                  args.stall)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+import argparse
+import logging
+import os
+import queue
+import struct
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Tuple
+from pong.simulation import Event, Simulation
+
+
+MAGIC: bytes = b"PONGEVT\x01"
+# Start of match: record type, time, width and height of field, tick rate
+MATCH_START = struct.Struct("<BdHHH")
+# Event of tick: record type, tick, position of ball center and velocity of ball in pixels per second
+EVENT = struct.Struct("<BIHHH")
+# End of match: record type, tick, scores of left and right players
+MATCH_END = struct.Struct("<BIBB")
+MATCH_START_RECORD: int = 1
+LEFT_HIT_RECORD: int = 2
+RIGHT_HIT_RECORD: int = 3
+WALL_BOUNCE_RECORD: int = 4
+LEFT_GOAL_RECORD: int = 5
+RIGHT_GOAL_RECORD: int = 6
+MATCH_END_RECORD: int = 7
+EVENT_RECORDS: Tuple[Tuple[Event, int], ...] = ((Event.LEFT_HIT, LEFT_HIT_RECORD), (Event.RIGHT_HIT, RIGHT_HIT_RECORD),
+                                                (Event.WALL_BOUNCE, WALL_BOUNCE_RECORD),
+                                                (Event.LEFT_GOAL, LEFT_GOAL_RECORD),
+                                                (Event.RIGHT_GOAL, RIGHT_GOAL_RECORD))
+RECORD_NAMES: Dict[int, str] = {MATCH_START_RECORD: "match_start", LEFT_HIT_RECORD: "left_hit",
+                                RIGHT_HIT_RECORD: "right_hit", WALL_BOUNCE_RECORD: "wall_bounce",
+                                LEFT_GOAL_RECORD: "left_goal", RIGHT_GOAL_RECORD: "right_goal",
+                                MATCH_END_RECORD: "match_end"}
+
+
+def _clamp(value: float) -> int:
+    return min(max(int(value), 0), 0xFFFF)
+
+
+class EventLog:
+    """
+    Class collects events of matches to append-only binary log. Records are kept in memory during rounds and are
+    passed to background thread between rounds, so game thread does not wait for disk. When file grows larger than
+    given size, it is renamed to backup and the oldest backup is deleted, so log takes limited space.
+    """
+
+    BACKUPS: int = 3
+    MAX_BYTES: int = 4 * 1024 * 1024
+
+    def __init__(self, path: str, max_bytes: int = MAX_BYTES, backups: int = BACKUPS) -> None:
+        """
+        :param path: path to log file;
+        :param max_bytes: maximum size of file;
+        :param backups: number of backup files, backups have suffixes .1, .2 and so on.
+        """
+
+        self._buffer: bytearray = bytearray()
+        self._queue: queue.Queue = queue.Queue()
+        self._simulation: Simulation = None
+        self.backups: int = backups
+        self.max_bytes: int = max_bytes
+        self.path: str = path
+        self._thread: threading.Thread = threading.Thread(target=self._run, name="EventLog", daemon=True)
+        self._thread.start()
+
+    def _append(self, data: bytes) -> None:
+        """
+        Method appends records to file. It is called in background thread.
+        :param data: records.
+        """
+
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            size = 0
+        if size and size + len(data) > self.max_bytes:
+            self._rotate()
+            size = 0
+        with open(self.path, "ab") as file:
+            if size == 0:
+                file.write(MAGIC)
+            file.write(data)
+
+    def _rotate(self) -> None:
+        for number in range(self.backups - 1, 0, -1):
+            source = f"{self.path}.{number}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{number + 1}")
+        if self.backups:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+    def _run(self) -> None:
+        while True:
+            data = self._queue.get()
+            if data is None:
+                break
+            try:
+                self._append(data)
+            except OSError:
+                logging.exception("Failed to write %d bytes to event log '%s'", len(data), self.path)
+
+    def close(self) -> None:
+        """
+        Method ends current match and waits until all records are written to file.
+        """
+
+        self.end_match()
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    def end_match(self) -> None:
+        """
+        Method writes end of match, stops collecting events and passes records to background thread.
+        """
+
+        simulation = self._simulation
+        if simulation is None:
+            return
+        simulation.tick_listeners.remove(self.handle_tick)
+        self._buffer += MATCH_END.pack(MATCH_END_RECORD, simulation.tick, min(simulation.score.left, 0xFF),
+                                       min(simulation.score.right, 0xFF))
+        self._simulation = None
+        self.flush()
+
+    def flush(self) -> None:
+        """
+        Method passes collected records to background thread that appends them to file.
+        """
+
+        if not self._buffer:
+            return
+        self._queue.put(bytes(self._buffer))
+        self._buffer.clear()
+
+    def handle_tick(self, simulation: Simulation) -> None:
+        """
+        :param simulation: simulation that has just made a tick.
+        """
+
+        events = simulation.events
+        if not events:
+            return
+        ball = simulation.ball
+        for event, record_type in EVENT_RECORDS:
+            if events & event:
+                self._buffer += EVENT.pack(record_type, simulation.tick, _clamp(ball.center_x), _clamp(ball.center_y),
+                                           _clamp(ball.velocity_module))
+
+    def start_match(self, simulation: Simulation, tick_rate: int) -> None:
+        """
+        Method starts collecting events of match.
+        :param simulation: simulation with started match;
+        :param tick_rate: number of ticks per second.
+        """
+
+        self.end_match()
+        self._simulation = simulation
+        simulation.tick_listeners.append(self.handle_tick)
+        self._buffer += MATCH_START.pack(MATCH_START_RECORD, time.time(), _clamp(simulation.field.width),
+                                         _clamp(simulation.field.height), tick_rate)
+
+
+def read_events(path: str) -> Iterator[Tuple[Any, ...]]:
+    """
+    Function reads records of event log. Record cut by interruption of the game at the end of file is skipped.
+    :param path: path to log file.
+    :return: records as tuples, the first item of tuple is type of record.
+    """
+
+    with open(path, "rb") as file:
+        data = file.read()
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"File '{path}' is not an event log")
+    offset = len(MAGIC)
+    while offset < len(data):
+        record_type = data[offset]
+        if record_type == MATCH_START_RECORD:
+            record_struct = MATCH_START
+        elif record_type == MATCH_END_RECORD:
+            record_struct = MATCH_END
+        elif record_type in RECORD_NAMES:
+            record_struct = EVENT
+        else:
+            raise ValueError(f"Unknown record {record_type} at offset {offset} of file '{path}'")
+        if offset + record_struct.size > len(data):
+            break
+        yield record_struct.unpack_from(data, offset)
+        offset += record_struct.size
+
+
+def summarize(paths: List[str]) -> Dict[str, Any]:
+    """
+    :param paths: paths to log files.
+    :return: statistics of matches, events, rallies and ball speed at hits.
+    """
+
+    counts = {name: 0 for name in RECORD_NAMES.values()}
+    hit_speeds = []
+    rallies = []
+    rally = 0
+    for path in paths:
+        for record in read_events(path):
+            record_type = record[0]
+            counts[RECORD_NAMES[record_type]] += 1
+            if record_type in (LEFT_HIT_RECORD, RIGHT_HIT_RECORD):
+                hit_speeds.append(record[4])
+                rally += 1
+            elif record_type in (LEFT_GOAL_RECORD, RIGHT_GOAL_RECORD):
+                rallies.append(rally)
+                rally = 0
+            elif record_type == MATCH_START_RECORD:
+                rally = 0
+    hit_speeds.sort()
+    return {"counts": counts,
+            "rallies": len(rallies),
+            "mean_rally": sum(rallies) / len(rallies) if rallies else 0,
+            "max_rally": max(rallies, default=0),
+            "mean_hit_speed": sum(hit_speeds) / len(hit_speeds) if hit_speeds else 0,
+            "median_hit_speed": hit_speeds[len(hit_speeds) // 2] if hit_speeds else 0,
+            "max_hit_speed": hit_speeds[-1] if hit_speeds else 0}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Print statistics of event logs of matches")
+    parser.add_argument("paths", nargs="+", help="paths to event log files")
+    parser.add_argument("--dump", action="store_true", help="print all records")
+    args = parser.parse_args()
+
+    if args.dump:
+        for path in args.paths:
+            for record in read_events(path):
+                print(RECORD_NAMES[record[0]], *record[1:])
+    summary = summarize(args.paths)
+    print(", ".join(f"{name}: {count}" for name, count in summary["counts"].items()))
+    print(f"Rallies: {summary['rallies']}, hits per rally: mean {summary['mean_rally']:.1f}, "
+          f"max {summary['max_rally']}")
+    print(f"Ball speed at hit: mean {summary['mean_hit_speed']:.0f}, median {summary['median_hit_speed']}, "
+          f"max {summary['max_hit_speed']} pixels per second")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,15 @@
 import os
 from kivy.app import App
+from kivy.clock import Clock
+from kivy.core.window import Window
 from kivy.uix.widget import Widget
-from pong.pong_game import PongGame
+from pong.audio import get_audio_manager
+from pong.media import get_media_loader
+from pong.profiler import get_profiler
 from pong.menu import GameType, Menu
+from pong.power import get_power_governor
+from pong.screen import ScreenManager
+from pong.startup import mark, report
 from version import VERSION
 
 
@@ -11,30 +18,97 @@ class Game(Widget):
     Class with main widget of application.
     """
 
+    MATCH_STORE_FILE: str = "matches.db"
+
     def __init__(self) -> None:
         super().__init__()
         self._menu: Menu = Menu()
         self._menu.bind(game_type=self.start_game)
-        self._pong_game: PongGame = PongGame(self)
+        self._menu.bind(show_history=self.show_history)
+        self._screens: ScreenManager = ScreenManager(self)
+        # History screen and store of matches are created when they are needed for the first time
+        self._history = None
+        self._match_store = None
+        # Game screen is built after the menu is shown, see build_pong_game
+        self._pong_game = None
+
+    def build_pong_game(self, dt: float = 0) -> None:
+        """
+        Method builds game screen. It is called in idle time after the first frame or when game is started.
+        :param dt: time elapsed since the call was scheduled.
+        """
+
+        if self._pong_game is not None:
+            return
+        from pong.pong_game import PongGame
+
+        self._pong_game = PongGame(self)
+        self.resize(self, None)
+        mark("pong_game")
+
+    def close(self) -> None:
+        """
+        Method writes matches left in queue of store and event log and stops broadcast for spectators.
+        """
+
+        if self._match_store is not None:
+            self._match_store.close()
+            self._match_store = None
+        if self._pong_game is not None:
+            self._pong_game.close()
+
+    def get_match_store(self):
+        """
+        :return: store of finished matches.
+        """
+
+        if self._match_store is None:
+            from pong.match_store import MatchStore
+
+            self._match_store = MatchStore(os.path.join(App.get_running_app().user_data_dir, Game.MATCH_STORE_FILE))
+        return self._match_store
+
+    def pause(self) -> None:
+        """
+        Method stops clock events of shown screen while application is in background.
+        """
+
+        self._screens.pause()
+        get_power_governor().pause()
 
     def resize(self, root, _) -> None:
-        for widget in (self._pong_game, self._menu):
+        for widget in (self._pong_game, self._menu, self._history):
+            if widget is None:
+                continue
             widget.pos = root.pos
             widget.size = root.size
             resize_func = getattr(widget, "resize", None)
             if resize_func:
                 resize_func()
 
+    def resume(self) -> None:
+        get_power_governor().resume()
+        self._screens.resume()
+
+    def show_history(self, menu: Menu, show: bool) -> None:
+        """
+        :param menu: menu widget;
+        :param show: True if history of matches should be shown.
+        """
+
+        if not show:
+            return
+        if self._history is None:
+            from pong.history import HistoryScreen
+
+            self._history = HistoryScreen(self)
+            self.resize(self, None)
+        self._screens.show(self._history)
+
     def show_menu(self) -> None:
         self._menu.game_type = GameType.NOTHING
-        try:
-            self.add_widget(self._menu)
-        except Exception:
-            pass
-        try:
-            self.remove_widget(self._pong_game)
-        except Exception:
-            pass
+        self._menu.show_history = False
+        self._screens.show(self._menu)
 
     def start_game(self, menu: Menu, game_type: GameType) -> None:
         """
@@ -44,14 +118,8 @@ class Game(Widget):
 
         if game_type == GameType.NOTHING:
             return
-        try:
-            self.add_widget(self._pong_game)
-        except Exception:
-            pass
-        try:
-            self.remove_widget(self._menu)
-        except Exception:
-            pass
+        self.build_pong_game()
+        self._screens.show(self._pong_game)
         self._pong_game.start_game(game_type)
 
 
@@ -60,18 +128,45 @@ class PongApp(App):
     Class for application.
     """
 
-    icon = os.path.join("media", "icon.png")
+    DEFERRED_LOADING_DELAY: float = 0.5
+    ICON: str = "icon.png"
     title = f"Pong v{VERSION}"
 
+    def _handle_first_frame(self, *args) -> None:
+        Window.unbind(on_flip=self._handle_first_frame)
+        mark("first_frame")
+        report(os.path.join(self.user_data_dir, "startup_times.json"))
+        # Heavy parts are loaded after the menu is on screen
+        Clock.schedule_once(self.game.build_pong_game, PongApp.DEFERRED_LOADING_DELAY)
+        Clock.schedule_once(lambda _: get_audio_manager().preload(), PongApp.DEFERRED_LOADING_DELAY)
+
     def build(self) -> Game:
         """
         :return: main widget of application.
         """
 
+        # Window icon is set after build, icon from bundle should be extracted to disk by this moment
+        self.icon = get_media_loader().find(PongApp.ICON) or ""
         self.game = Game()
+        mark("build")
         return self.game
 
+    def on_pause(self) -> bool:
+        self.game.pause()
+        return True
+
+    def on_resume(self) -> None:
+        self.game.resume()
+
     def on_start(self) -> None:
+        get_power_governor().start()
         self.root.bind(size=self.game.resize)
         self.game.resize(self.root, None)
         self.game.show_menu()
+        mark("start")
+        Window.bind(on_flip=self._handle_first_frame)
+
+    def on_stop(self) -> None:
+        get_profiler().export(os.path.join(self.user_data_dir, "frame_times.json"))
+        self.game.close()
+        get_power_governor().export(os.path.join(self.user_data_dir, "power.json"))
@@ -0,0 +1,331 @@
+import logging
+import os
+import socket
+from datetime import datetime
+from typing import Callable, Optional, Tuple, Union
+from kivy.app import App
+from kivy.config import Config
+from kivy.uix.label import Label
+from pong.broadcast import BroadcastThread, SpectatorClient
+from pong.event_log import EventLog
+from pong.headband import Headband
+from pong.loop import FixedStepLoop
+from pong.match_store import MatchRecord, MatchTracker
+from pong.menu import GameType
+from pong.multiball import MultiBallSimulation
+from pong.network import create_socket, get_snapshot_values, LossyChannel, NetworkClient, NetworkHost
+from pong.profiler import FrameProfiler, get_profiler
+from pong.replay import ReplayRecorder
+from pong.screen import Screen
+from pong.simulation import AIController, FieldState, Simulation
+
+BROADCAST_PORT: int = 7778
+NETWORK_ADDRESS: str = "127.0.0.1"
+NETWORK_PORT: int = 7777
+
+
+class Broadcaster:
+    """
+    Class sends state of matches on game screen to spectators if option broadcast of section [network] is set.
+    """
+
+    RATE: int = 60
+
+    def __init__(self, screen: Screen, loop: FixedStepLoop, headband: Headband, get_phase: Callable[[], int]) -> None:
+        """
+        :param screen: game screen, clock event of broadcast is cancelled when screen is suspended;
+        :param loop: loop that advances simulation;
+        :param headband: headband with countdown;
+        :param get_phase: function that returns phase of match.
+        """
+
+        self._event = None
+        self._get_phase: Callable[[], int] = get_phase
+        self._headband: Headband = headband
+        self._loop: FixedStepLoop = loop
+        self._screen: Screen = screen
+        self._simulation: Optional[Simulation] = None
+        self._thread: Optional[BroadcastThread] = None
+
+    def _update(self, dt: float) -> None:
+        """
+        Method passes state of match to broadcast server.
+        :param dt: time elapsed since the previous call.
+        """
+
+        simulation = self._simulation
+        self._thread.publish(get_snapshot_values(simulation, self._get_phase(), self._headband.number), simulation.tick,
+                             simulation.field.width, simulation.field.height, self._loop.tick_rate)
+
+    def close(self) -> None:
+        if self._thread:
+            self._thread.close()
+            self._thread = None
+
+    def start(self, simulation: Simulation) -> None:
+        """
+        :param simulation: simulation of match to broadcast.
+        """
+
+        if not Config.getdefaultint("network", "broadcast", 0) or isinstance(simulation, MultiBallSimulation):
+            return
+        if self._thread is None:
+            port = Config.getdefaultint("network", "broadcast_port", BROADCAST_PORT)
+            thread = BroadcastThread(("0.0.0.0", port))
+            try:
+                thread.start()
+            except OSError:
+                logging.exception("Failed to start broadcast for spectators")
+                return
+            self._thread = thread
+            logging.info("Matches are broadcast to spectators on port %d", port)
+        self._simulation = simulation
+        # Matches of AI players follow one another on the same screen, so event of the previous match may be scheduled
+        if self._event:
+            self._event.cancel()
+        self._event = self._screen.schedule_interval(self._update, 1 / Broadcaster.RATE)
+
+    def suspend(self) -> None:
+        # Clock event is already cancelled by screen
+        self._event = None
+
+
+class MatchRecording:
+    """
+    Class writes event log, statistics and replay of matches.
+    """
+
+    EVENT_LOG_FILE: str = "events.bin"
+    REPLAYS_DIR: str = "replays"
+
+    def __init__(self) -> None:
+        self._event_log: Optional[EventLog] = None
+        self._match_tracker: MatchTracker = MatchTracker()
+        self._recorder: Optional[ReplayRecorder] = None
+
+    def close(self) -> None:
+        """
+        Method writes the rest of event log.
+        """
+
+        if self._event_log:
+            self._event_log.close()
+            self._event_log = None
+
+    def finish(self, game_type: GameType) -> Optional[MatchRecord]:
+        """
+        :param game_type: type of finished game.
+        :return: results of match or None if match was not tracked.
+        """
+
+        record = self._match_tracker.finish(game_type.value)
+        self.stop()
+        return record
+
+    def flush(self) -> None:
+        if self._event_log:
+            self._event_log.flush()
+
+    def record_drive(self, side: int) -> None:
+        """
+        :param side: index of racket whose keyboard drive has changed direction.
+        """
+
+        if self._recorder:
+            self._recorder.record_drive(side)
+
+    def record_inputs(self) -> None:
+        if self._recorder:
+            self._recorder.record_inputs()
+
+    def start(self, simulation: Simulation, seed: int, tick_rate: int) -> None:
+        """
+        :param simulation: simulation of match;
+        :param seed: seed of random number generator of simulation;
+        :param tick_rate: number of ticks of simulation per second.
+        """
+
+        # Event log keeps events of one ball
+        if Config.getdefaultint("pong", "event_log", 0) and not isinstance(simulation, MultiBallSimulation):
+            if self._event_log is None:
+                self._event_log = EventLog(os.path.join(App.get_running_app().user_data_dir,
+                                                        MatchRecording.EVENT_LOG_FILE))
+                logging.info("Events of matches are written to '%s'", self._event_log.path)
+            self._event_log.start_match(simulation, tick_rate)
+        # Rallies and speed of ball are counted for games with one ball
+        if not isinstance(simulation, MultiBallSimulation):
+            self._match_tracker.start(simulation)
+        # Replays keep state of one ball and of hand-written AI without random error, so multi-ball games, games with
+        # learned policy and AI-vs-AI games are not recorded
+        if isinstance(simulation, MultiBallSimulation) or \
+                any(controller and (not isinstance(controller, AIController) or controller.error_scale)
+                    for controller in simulation.controllers):
+            return
+        if not Config.getdefaultint("pong", "record_replays", 0):
+            return
+        replays_dir = os.path.join(App.get_running_app().user_data_dir, MatchRecording.REPLAYS_DIR)
+        os.makedirs(replays_dir, exist_ok=True)
+        path = os.path.join(replays_dir, datetime.now().strftime("%Y-%m-%d_%H-%M-%S") + ".replay")
+        self._recorder = ReplayRecorder(path, simulation, seed, tick_rate)
+        logging.info("Replay is recorded to '%s'", path)
+
+    def stop(self) -> None:
+        self._match_tracker.stop()
+        if self._event_log:
+            self._event_log.end_match()
+        if self._recorder:
+            self._recorder.close()
+            self._recorder = None
+
+
+class ProfilerOverlay:
+    """
+    Class shows durations of frame phases over game screen. Durations are measured only while overlay is shown.
+    """
+
+    FONT_SIZE: int = 14
+    UPDATE_INTERVAL: float = 0.5
+
+    def __init__(self, screen: Screen, get_details: Callable[[], str]) -> None:
+        """
+        :param screen: game screen to show overlay on;
+        :param get_details: function that returns text shown under durations.
+        """
+
+        self._event = None
+        self._get_details: Callable[[], str] = get_details
+        self._screen: Screen = screen
+        self.label: Label = Label(font_size=ProfilerOverlay.FONT_SIZE, halign="left")
+        self.label.bind(texture_size=self.label.setter("size"))
+        self.profiler: FrameProfiler = get_profiler()
+
+    def _schedule(self) -> None:
+        self._event = self._screen.schedule_interval(self._update_label, ProfilerOverlay.UPDATE_INTERVAL)
+
+    def _update_label(self, dt: float) -> None:
+        details = self._get_details()
+        self.label.text = self.profiler.format() + ("\n" + details if details else "")
+
+    def activate(self) -> None:
+        if self.profiler.enabled and not self._event:
+            self._schedule()
+
+    def suspend(self) -> None:
+        # Clock event is already cancelled by screen
+        self._event = None
+
+    def toggle(self) -> None:
+        self.profiler.enabled = not self.profiler.enabled
+        if self.profiler.enabled:
+            if self.label.parent is None:
+                self._screen.add_widget(self.label)
+            self._schedule()
+        else:
+            if self.label.parent:
+                self._screen.remove_widget(self.label)
+            if self._event:
+                self._event.cancel()
+                self._event = None
+
+
+class TimeScaleControl:
+    """
+    Class speeds up local games by keys. Networked games always run in real time.
+    """
+
+    DOWN_KEY: str = "f5"
+    FONT_SIZE: int = 30
+    MAX_TIME_SCALE: int = 16
+    UP_KEY: str = "f6"
+
+    def __init__(self, loop: FixedStepLoop, headband: Headband, color: Tuple[float, float, float, float]) -> None:
+        """
+        :param loop: loop that advances simulation;
+        :param headband: headband whose countdown is sped up too;
+        :param color: color of label with time scale.
+        """
+
+        self._headband: Headband = headband
+        self._is_networked: bool = False
+        self._loop: FixedStepLoop = loop
+        self._time_scale: int = self._limit(Config.getdefaultint("pong", "time_scale", 1))
+        self.label: Label = Label(font_size=TimeScaleControl.FONT_SIZE, color=color)
+        self.label.bind(texture_size=self.label.setter("size"))
+
+    @staticmethod
+    def _limit(time_scale: int) -> int:
+        """
+        :param time_scale: time scale.
+        :return: time scale limited to range from real time to maximum speed-up.
+        """
+
+        return min(max(time_scale, 1), TimeScaleControl.MAX_TIME_SCALE)
+
+    def _update(self) -> None:
+        time_scale = 1 if self._is_networked else self._time_scale
+        self._loop.time_scale = time_scale
+        self._headband.time_scale = time_scale
+        self.label.text = f"x{time_scale}" if time_scale > 1 else ""
+
+    def apply(self, game_type: GameType) -> None:
+        """
+        :param game_type: type of started game.
+        """
+
+        self._is_networked = game_type in (GameType.NETWORK_CLIENT, GameType.NETWORK_HOST, GameType.SPECTATOR)
+        self._update()
+
+    def handle_key(self, key: str) -> bool:
+        """
+        :param key: pressed key.
+        :return: True if key changes time scale.
+        """
+
+        if key not in (TimeScaleControl.DOWN_KEY, TimeScaleControl.UP_KEY):
+            return False
+        time_scale = self._time_scale * 2 if key == TimeScaleControl.UP_KEY else self._time_scale // 2
+        self._time_scale = self._limit(time_scale)
+        self._update()
+        logging.info("Time scale: %d", self._loop.time_scale)
+        return True
+
+
+def open_network(game_type: GameType, field: FieldState,
+                 tick_rate: int) -> Optional[Union[NetworkClient, NetworkHost, SpectatorClient]]:
+    """
+    Function opens connection of networked game with addresses from section [network] of config.
+    :param game_type: type of networked game;
+    :param field: field of simulation of host;
+    :param tick_rate: number of ticks of simulation per second.
+    :return: connection or None if socket was not opened.
+    """
+
+    if game_type == GameType.SPECTATOR:
+        port = Config.getdefaultint("network", "broadcast_port", BROADCAST_PORT)
+        try:
+            address = socket.gethostbyname(Config.getdefault("network", "address", NETWORK_ADDRESS))
+            network = SpectatorClient((address, port))
+        except OSError:
+            logging.exception("Failed to connect to broadcast server")
+            return None
+        logging.info("Watch match broadcast by %s:%d", address, port)
+        return network
+    port = Config.getdefaultint("network", "port", NETWORK_PORT)
+    try:
+        if game_type == GameType.NETWORK_HOST:
+            sock = create_socket(("0.0.0.0", port))
+        else:
+            address = socket.gethostbyname(Config.getdefault("network", "address", NETWORK_ADDRESS))
+            sock = create_socket(("0.0.0.0", 0))
+    except OSError:
+        logging.exception("Failed to open network connection")
+        return None
+    # Latency and loss can be simulated to check how the game feels on bad network
+    channel = LossyChannel(sock, float(Config.getdefault("network", "latency", 0)),
+                           float(Config.getdefault("network", "jitter", 0)),
+                           float(Config.getdefault("network", "loss", 0)))
+    if game_type == GameType.NETWORK_HOST:
+        logging.info("Wait for network player on port %d", port)
+        return NetworkHost(channel, field, tick_rate)
+    logging.info("Connect to network host %s:%d", address, port)
+    return NetworkClient(channel, (address, port))
@@ -1,27 +1,43 @@
-import os
 from random import random
 from kivy.clock import Clock
-from kivy.core.audio import SoundLoader
 from kivy.properties import Property
-from kivy.uix.label import Label
+from pong.audio import get_audio_manager
+from pong.text_cache import CachedLabel, get_text_cache
 
 
-class Headband(Label):
+class Headband(CachedLabel):
 
     FONT_SIZE: int = 150
+    LOSE_SOUND: str = "sad_trombone.mp3"
+    LOSE_TEXT: str = "You lose!"
     START_NUMBER: int = 5
+    START_TEXT: str = "START"
+    WAIT_TEXT: str = "Wait"
+    WIN_SOUND: str = "applause.wav"
+    WIN_TEXT: str = "You won!"
     return_to_menu: Property = Property(False)
     start_round: Property = Property(False)
 
     def __init__(self) -> None:
-        super().__init__()
-        self.font_size = Headband.FONT_SIZE
+        super().__init__(Headband.FONT_SIZE)
+        self._event = None
         self._number: int = None
         self._time: float = 0
+        # Countdown and congratulations of fast-forwarded game are as many times shorter
+        self.time_scale: int = 1
+
+    @property
+    def number(self) -> int:
+        """
+        :return: number of countdown shown now.
+        """
+
+        return max(self._number or 0, 0)
 
     def _show_congratulations(self, dt) -> None:
-        self._time += dt
+        self._time += dt * self.time_scale
         if self._time > 5:
+            self.cancel()
             self.return_to_menu = True
         else:
             self.color = random(), random(), random(), 0.8
@@ -29,27 +45,55 @@ class Headband(Label):
     def _show_countdown(self, dt) -> None:
         self._number -= 1
         if self._number == 0:
-            self.text = "START"
+            self.text = Headband.START_TEXT
         elif self._number > 0:
             self.text = str(self._number)
         elif self._number == -1:
-            self._event.cancel()
+            self.cancel()
             self.start_round = True
 
+    def cancel(self) -> None:
+        """
+        Method stops countdown or congratulations.
+        """
+
+        if self._event:
+            self._event.cancel()
+            self._event = None
+
     def show_congratulations(self, winner: bool) -> None:
+        self.cancel()
         self.return_to_menu = False
         self._time = 0
         self.color = 1, 0, 0, 0.8
-        self.text = "You won!" if winner else "You lose!"
+        self.text = Headband.WIN_TEXT if winner else Headband.LOSE_TEXT
         self._event = Clock.schedule_interval(self._show_congratulations, 0.3)
-        path_to_sound = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "media",
-                                     "applause.wav" if winner else "sad_trombone.mp3")
-        sound = SoundLoader.load(path_to_sound)
-        sound.play()
+        if self.time_scale == 1:
+            get_audio_manager().play(Headband.WIN_SOUND if winner else Headband.LOSE_SOUND)
+
+    @staticmethod
+    def preload_texts() -> None:
+        """
+        Method rasterizes all texts of headband, so that countdown and congratulations do not render text.
+        """
+
+        texts = [str(number) for number in range(Headband.START_NUMBER + 1)]
+        texts.extend((Headband.LOSE_TEXT, Headband.START_TEXT, Headband.WAIT_TEXT, Headband.WIN_TEXT))
+        get_text_cache().preload(texts, Headband.FONT_SIZE)
+
+    def show_text(self, text: str) -> None:
+        """
+        Method shows text without countdown, for example, countdown received from network host.
+        :param text: text to show.
+        """
+
+        self.color = 1, 0, 0, 0.8
+        self.text = text
 
     def start_countdown(self, start_number: int = None) -> None:
+        self.cancel()
         self.start_round = False
         self.color = 1, 0, 0, 0.8
         self._number = start_number if start_number is not None else Headband.START_NUMBER
         self.text = str(self._number)
-        self._event = Clock.schedule_interval(self._show_countdown, 1)
+        self._event = Clock.schedule_interval(self._show_countdown, 1 / self.time_scale)
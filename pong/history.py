@@ -0,0 +1,181 @@
+import logging
+import sqlite3
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from kivy.graphics import Color, Rectangle
+from kivy.uix.button import Button
+from kivy.uix.floatlayout import FloatLayout
+from kivy.uix.label import Label
+from pong.match_store import MatchRecord
+from pong.menu import GameType, Menu
+from pong.power import get_power_governor, PowerMode
+from pong.screen import Screen
+
+
+class HistoryScreen(Screen, FloatLayout):
+    """
+    Class for screen with history of matches. Only one page of matches is read from store at a time.
+    """
+
+    BUTTON_SIZE_HINT: Tuple[float, float] = (0.18, 0.1)
+    MODES: Tuple[Optional[GameType], ...] = (None, GameType.AI, GameType.WITH_FRIEND, GameType.NETWORK_HOST,
+                                             GameType.AI_VS_AI)
+    MODE_NAMES: Dict[Optional[GameType], str] = {None: "All games", GameType.AI: "With AI",
+                                                 GameType.WITH_FRIEND: "With friend",
+                                                 GameType.NETWORK_HOST: "Network", GameType.AI_VS_AI: "AI vs AI"}
+    ORDER_NAMES: Dict[str, str] = {"newest": "Newest", "longest_rally": "Longest rally", "peak_speed": "Fastest ball"}
+    PAGE_SIZE: int = 8
+
+    def __init__(self, main_widget) -> None:
+        """
+        :param main_widget: main widget of application.
+        """
+
+        super().__init__()
+        self._after: List[Optional[MatchRecord]] = [None]
+        self._has_next_page: bool = False
+        self._main_widget = main_widget
+        self._mode_index: int = 0
+        self._order_index: int = 0
+        self._page: List[MatchRecord] = []
+        self._label_statistics: Label = Label(pos_hint={"center_x": 0.5, "center_y": 0.93})
+        self._labels: List[Label] = []
+        for row in range(HistoryScreen.PAGE_SIZE):
+            label = Label(pos_hint={"center_x": 0.5, "center_y": 0.83 - 0.08 * row})
+            self._labels.append(label)
+        self._button_order: Button = Button(pos_hint={"center_x": 0.12, "center_y": 0.08})
+        self._button_order.bind(on_press=self.change_order)
+        self._button_mode: Button = Button(pos_hint={"center_x": 0.31, "center_y": 0.08})
+        self._button_mode.bind(on_press=self.change_mode)
+        self._button_previous: Button = Button(text="Previous", pos_hint={"center_x": 0.5, "center_y": 0.08})
+        self._button_previous.bind(on_press=self.show_previous_page)
+        self._button_next: Button = Button(text="Next", pos_hint={"center_x": 0.69, "center_y": 0.08})
+        self._button_next.bind(on_press=self.show_next_page)
+        self._button_back: Button = Button(text="Back", pos_hint={"center_x": 0.88, "center_y": 0.08})
+        self._button_back.bind(on_press=self.return_to_menu)
+        self._buttons: List[Button] = [self._button_order, self._button_mode, self._button_previous,
+                                       self._button_next, self._button_back]
+        for widget in self._buttons:
+            widget.background_color = Menu.BUTTON_COLOR
+            widget.size_hint = HistoryScreen.BUTTON_SIZE_HINT
+        for label in (self._label_statistics, *self._labels):
+            label.color = Menu.BUTTON_COLOR
+            label.size_hint = 1, 0.08
+        self._widgets: List = [self._label_statistics, *self._labels, *self._buttons]
+        self.resize()
+
+    @property
+    def _mode(self) -> Optional[GameType]:
+        return HistoryScreen.MODES[self._mode_index]
+
+    @property
+    def _order(self) -> str:
+        return list(HistoryScreen.ORDER_NAMES)[self._order_index]
+
+    @staticmethod
+    def _format_record(record: MatchRecord) -> str:
+        """
+        :param record: match.
+        :return: text of row with match.
+        """
+
+        date = datetime.fromtimestamp(record.finished_at).strftime("%Y-%m-%d %H:%M")
+        mode = HistoryScreen.MODE_NAMES.get(GameType(record.mode), "")
+        minutes, seconds = divmod(int(record.duration), 60)
+        return (f"{date}   {mode}   {record.score_left}:{record.score_right}   {minutes}:{seconds:02}   "
+                f"rally {record.longest_rally}   ball {record.peak_speed:.0f} px/s")
+
+    def _load_page(self) -> None:
+        store = self._main_widget.get_match_store()
+        mode = self._mode.value if self._mode else None
+        try:
+            # One extra match shows whether the next page exists
+            page = store.get_page(self._order, mode, self._after[-1], HistoryScreen.PAGE_SIZE + 1)
+            statistics = store.get_statistics()
+        except (OSError, sqlite3.Error):
+            logging.exception("Failed to read history of matches")
+            page, statistics = [], None
+        self._has_next_page = len(page) > HistoryScreen.PAGE_SIZE
+        self._page = page[:HistoryScreen.PAGE_SIZE]
+        for index, label in enumerate(self._labels):
+            label.text = self._format_record(self._page[index]) if index < len(self._page) else ""
+        if statistics is None:
+            self._labels[0].text = "History of matches is unavailable"
+        elif not self._page and len(self._after) == 1:
+            self._labels[0].text = "No matches yet"
+        self._button_order.text = HistoryScreen.ORDER_NAMES[self._order]
+        self._button_mode.text = HistoryScreen.MODE_NAMES[self._mode]
+        self._button_previous.disabled = len(self._after) == 1
+        self._button_next.disabled = not self._has_next_page
+        self._label_statistics.text = self._format_statistics(statistics, mode) if statistics is not None else ""
+
+    @staticmethod
+    def _format_statistics(statistics: Dict[int, Dict[str, float]], mode: Optional[int]) -> str:
+        """
+        :param statistics: totals of matches by types of game;
+        :param mode: type of game to show, all types if None.
+        :return: text with totals.
+        """
+
+        totals = [values for key, values in statistics.items() if mode is None or key == mode]
+        matches = sum(values["matches"] for values in totals)
+        if not matches:
+            return ""
+        left_wins = sum(values["left_wins"] for values in totals)
+        rallies = sum(values["rallies"] for values in totals)
+        hits = sum(values["hits"] for values in totals)
+        return (f"Matches: {matches}   left won: {100 * left_wins / matches:.0f}%   "
+                f"hits per rally: {hits / rallies if rallies else 0:.1f}   "
+                f"best rally: {max(values['longest_rally'] for values in totals)}   "
+                f"fastest ball: {max(values['peak_speed'] for values in totals):.0f} px/s")
+
+    def _reset_pages(self) -> None:
+        self._after = [None]
+        self._load_page()
+
+    def _set_font_sizes(self, app_height: int) -> None:
+        """
+        :param app_height: height of application window.
+        """
+
+        for button in self._buttons:
+            button.font_size = app_height * HistoryScreen.BUTTON_SIZE_HINT[1] * 0.3
+        for label in (self._label_statistics, *self._labels):
+            label.font_size = app_height * 0.035
+
+    def change_mode(self, instance) -> None:
+        self._mode_index = (self._mode_index + 1) % len(HistoryScreen.MODES)
+        self._reset_pages()
+
+    def change_order(self, instance) -> None:
+        self._order_index = (self._order_index + 1) % len(HistoryScreen.ORDER_NAMES)
+        self._reset_pages()
+
+    def on_activate(self) -> None:
+        get_power_governor().request(PowerMode.IDLE)
+        self._reset_pages()
+
+    def on_size(self, *args) -> None:
+        self._set_font_sizes(self.size[1])
+
+    def resize(self) -> None:
+        self.canvas.before.clear()
+        with self.canvas.before:
+            Color(*Menu.BACKGROUND_COLOR)
+            Rectangle(pos=self.pos, size=self.size)
+        for widget in self._widgets:
+            if widget.parent is None:
+                self.add_widget(widget)
+
+    def return_to_menu(self, instance) -> None:
+        self._main_widget.show_menu()
+
+    def show_next_page(self, instance) -> None:
+        if self._has_next_page:
+            self._after.append(self._page[-1])
+            self._load_page()
+
+    def show_previous_page(self, instance) -> None:
+        if len(self._after) > 1:
+            self._after.pop()
+            self._load_page()
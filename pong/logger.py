@@ -1,6 +1,60 @@
+import atexit
+import copy
 import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+
+DATE_FORMAT: str = "%Y-%m-%d %H:%M:%S"
+FORMAT: str = "[%(asctime)s %(levelname)s] %(message)s"
+_EXCEPTION_FORMATTER: logging.Formatter = logging.Formatter()
+_listener: Optional[QueueListener] = None
+
+
+class _RecordQueueHandler(QueueHandler):
+    """
+    Class puts records to queue with message and traceback made in calling thread, because arguments of message may be
+    changed and exception may be handled before listener gets record. Time and level are formatted and record is
+    written by handlers of listener in background thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _EXCEPTION_FORMATTER.formatException(record.exc_info)
+            record.exc_info = None
+        return record
 
 
 def set_logger() -> None:
-    logging.basicConfig(format="[%(asctime)s %(levelname)s] %(message)s", datefmt="%Y-%m-%d %H:%M:%S",
-                        level=logging.INFO)
+    """
+    Function configures logging so that logging calls only put records to queue. Records are formatted and written
+    to stderr by background thread.
+    """
+
+    global _listener
+    if _listener is not None:
+        return
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter(FORMAT, DATE_FORMAT))
+    records = queue.Queue()
+    _listener = QueueListener(records, handler, respect_handler_level=True)
+    root = logging.getLogger()
+    root.addHandler(_RecordQueueHandler(records))
+    root.setLevel(logging.INFO)
+    _listener.start()
+    atexit.register(stop_logger)
+
+
+def stop_logger() -> None:
+    """
+    Function writes records left in queue and stops background thread.
+    """
+
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,111 @@
+from typing import Tuple
+from pong.simulation import Event, Simulation
+
+
+class Snapshot:
+    """
+    Class with positions of ball and rackets at some moment of simulation.
+    """
+
+    __slots__ = ("ball_x", "ball_y", "left_y", "right_y")
+
+    def __init__(self) -> None:
+        self.ball_x: float = 0
+        self.ball_y: float = 0
+        self.left_y: float = 0
+        self.right_y: float = 0
+
+    def capture(self, simulation: Simulation) -> None:
+        """
+        :param simulation: simulation to copy positions from.
+        """
+
+        self.ball_x = simulation.ball.x
+        self.ball_y = simulation.ball.y
+        self.left_y = simulation.paddles[0].y
+        self.right_y = simulation.paddles[1].y
+
+
+class FixedStepLoop:
+    """
+    Class advances simulation with fixed time step independent of frame rate. Time of frames is accumulated and
+    spent in whole physics ticks, remainder is used to interpolate rendered positions between the last two states.
+    """
+
+    MAX_STEPS_PER_FRAME: int = 8
+    TICK_RATE: int = 120
+    __slots__ = ("_accumulator", "_previous", "dropped_time", "max_steps", "step_dt", "tick_rate", "time_scale")
+
+    def __init__(self, tick_rate: int = TICK_RATE, max_steps: int = MAX_STEPS_PER_FRAME) -> None:
+        """
+        :param tick_rate: number of physics ticks per second;
+        :param max_steps: maximum number of ticks per frame. Time that does not fit into these ticks is dropped, so
+        the game slows down instead of spending more and more time catching up.
+        """
+
+        self._accumulator: float = 0
+        self._previous: Snapshot = Snapshot()
+        self.dropped_time: float = 0
+        self.max_steps: int = max_steps
+        self.step_dt: float = 1 / tick_rate
+        self.tick_rate: int = tick_rate
+        # Game time runs this many times faster than real time, limit of ticks per frame grows accordingly
+        self.time_scale: int = 1
+
+    @property
+    def alpha(self) -> float:
+        """
+        :return: fraction of tick elapsed since the last physics state.
+        """
+
+        return self._accumulator / self.step_dt
+
+    def advance(self, frame_dt: float, simulation: Simulation) -> Event:
+        """
+        Method runs as many physics ticks as fit into game time elapsed since the previous frame.
+        :param frame_dt: time elapsed since the previous frame;
+        :param simulation: simulation to advance.
+        :return: events that happened during ticks.
+        """
+
+        self._accumulator += frame_dt * self.time_scale
+        events = Event.NOTHING
+        max_steps = self.max_steps * self.time_scale
+        steps = 0
+        while self._accumulator >= self.step_dt:
+            if steps == max_steps:
+                self.dropped_time += self._accumulator
+                self._accumulator = 0
+                break
+            self._previous.capture(simulation)
+            events |= simulation.step(self.step_dt)
+            self._accumulator -= self.step_dt
+            steps += 1
+            if simulation.round_over:
+                self._accumulator = 0
+                break
+        return events
+
+    def interpolate(self, simulation: Simulation) -> Tuple[float, float, float, float]:
+        """
+        :param simulation: simulation.
+        :return: positions of ball and rackets to be rendered in current frame.
+        """
+
+        alpha = self.alpha
+        previous = self._previous
+        ball = simulation.ball
+        left, right = simulation.paddles
+        return (previous.ball_x + (ball.x - previous.ball_x) * alpha,
+                previous.ball_y + (ball.y - previous.ball_y) * alpha,
+                previous.left_y + (left.y - previous.left_y) * alpha,
+                previous.right_y + (right.y - previous.right_y) * alpha)
+
+    def reset(self, simulation: Simulation) -> None:
+        """
+        Method forgets accumulated time and previous state, for example, after ball is placed to start position.
+        :param simulation: simulation.
+        """
+
+        self._accumulator = 0
+        self._previous.capture(simulation)
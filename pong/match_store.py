@@ -0,0 +1,355 @@
+import argparse
+import logging
+import os
+import queue
+import random
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from pong.simulation import Event, Simulation
+
+
+SCHEMA: Tuple[str, ...] = (
+    "PRAGMA journal_mode=WAL",
+    """CREATE TABLE IF NOT EXISTS matches (
+        id INTEGER PRIMARY KEY,
+        finished_at REAL NOT NULL,
+        mode INTEGER NOT NULL,
+        score_left INTEGER NOT NULL,
+        score_right INTEGER NOT NULL,
+        duration REAL NOT NULL,
+        rallies INTEGER NOT NULL,
+        hits INTEGER NOT NULL,
+        longest_rally INTEGER NOT NULL,
+        peak_speed REAL NOT NULL)""",
+    "CREATE INDEX IF NOT EXISTS matches_longest_rally ON matches (longest_rally DESC, id DESC)",
+    "CREATE INDEX IF NOT EXISTS matches_peak_speed ON matches (peak_speed DESC, id DESC)",
+    "CREATE INDEX IF NOT EXISTS matches_mode ON matches (mode, id DESC)",
+    "CREATE INDEX IF NOT EXISTS matches_mode_longest_rally ON matches (mode, longest_rally DESC, id DESC)",
+    "CREATE INDEX IF NOT EXISTS matches_mode_peak_speed ON matches (mode, peak_speed DESC, id DESC)",
+    # Totals of modes are updated with every insert, so statistics do not scan matches
+    """CREATE TABLE IF NOT EXISTS mode_statistics (
+        mode INTEGER PRIMARY KEY,
+        matches INTEGER NOT NULL DEFAULT 0,
+        left_wins INTEGER NOT NULL DEFAULT 0,
+        right_wins INTEGER NOT NULL DEFAULT 0,
+        duration REAL NOT NULL DEFAULT 0,
+        rallies INTEGER NOT NULL DEFAULT 0,
+        hits INTEGER NOT NULL DEFAULT 0,
+        longest_rally INTEGER NOT NULL DEFAULT 0,
+        peak_speed REAL NOT NULL DEFAULT 0)""",
+    """CREATE TRIGGER IF NOT EXISTS matches_statistics AFTER INSERT ON matches BEGIN
+        INSERT OR IGNORE INTO mode_statistics (mode) VALUES (NEW.mode);
+        UPDATE mode_statistics SET matches = matches + 1,
+            left_wins = left_wins + (NEW.score_left > NEW.score_right),
+            right_wins = right_wins + (NEW.score_right > NEW.score_left),
+            duration = duration + NEW.duration,
+            rallies = rallies + NEW.rallies,
+            hits = hits + NEW.hits,
+            longest_rally = MAX(longest_rally, NEW.longest_rally),
+            peak_speed = MAX(peak_speed, NEW.peak_speed)
+        WHERE mode = NEW.mode;
+    END"""
+)
+COLUMNS: Tuple[str, ...] = ("id", "finished_at", "mode", "score_left", "score_right", "duration", "rallies", "hits",
+                            "longest_rally", "peak_speed")
+INSERT: str = (f"INSERT INTO matches ({', '.join(COLUMNS[1:])}) "
+               f"VALUES ({', '.join('?' * (len(COLUMNS) - 1))})")
+# Orders of leaderboards: columns to sort by in descending order
+ORDERS: Dict[str, Tuple[str, ...]] = {"newest": ("id",),
+                                      "longest_rally": ("longest_rally", "id"),
+                                      "peak_speed": ("peak_speed", "id")}
+
+
+class MatchRecord:
+    """
+    Class with results of finished match.
+    """
+
+    __slots__ = COLUMNS
+
+    def __init__(self, mode: int, score_left: int, score_right: int, duration: float, rallies: int, hits: int,
+                 longest_rally: int, peak_speed: float, finished_at: Optional[float] = None,
+                 id: Optional[int] = None) -> None:
+        """
+        :param mode: type of game;
+        :param score_left: final score of left player;
+        :param score_right: final score of right player;
+        :param duration: duration of match in seconds;
+        :param rallies: number of played rounds;
+        :param hits: number of hits of ball by rackets;
+        :param longest_rally: maximum number of hits in one round;
+        :param peak_speed: maximum velocity of ball in pixels per second;
+        :param finished_at: time when match finished, current time by default;
+        :param id: identifier of match in store.
+        """
+
+        self.id: Optional[int] = id
+        self.finished_at: float = time.time() if finished_at is None else finished_at
+        self.mode: int = mode
+        self.score_left: int = score_left
+        self.score_right: int = score_right
+        self.duration: float = duration
+        self.rallies: int = rallies
+        self.hits: int = hits
+        self.longest_rally: int = longest_rally
+        self.peak_speed: float = peak_speed
+
+    def to_row(self) -> Tuple[Any, ...]:
+        return tuple(getattr(self, column) for column in COLUMNS[1:])
+
+
+class MatchTracker:
+    """
+    Class counts rallies, hits and peak velocity of ball during match. It listens to ticks of simulation.
+    """
+
+    __slots__ = ("_rally", "_simulation", "_start", "hits", "longest_rally", "peak_speed", "rallies")
+
+    def __init__(self) -> None:
+        self._rally: int = 0
+        self._simulation: Optional[Simulation] = None
+        self._start: float = 0
+        self.hits: int = 0
+        self.longest_rally: int = 0
+        self.peak_speed: float = 0
+        self.rallies: int = 0
+
+    def finish(self, mode: int) -> Optional[MatchRecord]:
+        """
+        :param mode: type of game.
+        :return: results of match or None if match was not tracked.
+        """
+
+        simulation = self._simulation
+        if simulation is None:
+            return None
+        self.stop()
+        return MatchRecord(mode, simulation.score.left, simulation.score.right, time.monotonic() - self._start,
+                           self.rallies, self.hits, self.longest_rally, self.peak_speed)
+
+    def handle_tick(self, simulation: Simulation) -> None:
+        """
+        :param simulation: simulation that has just made a tick.
+        """
+
+        events = simulation.events
+        if not events:
+            return
+        if events & (Event.LEFT_HIT | Event.RIGHT_HIT):
+            self.hits += 1
+            self._rally += 1
+            self.peak_speed = max(self.peak_speed, simulation.ball.velocity_module)
+        if events & (Event.LEFT_GOAL | Event.RIGHT_GOAL):
+            self.rallies += 1
+            self.longest_rally = max(self.longest_rally, self._rally)
+            self._rally = 0
+
+    def start(self, simulation: Simulation) -> None:
+        """
+        :param simulation: simulation with started match.
+        """
+
+        self.stop()
+        self._rally = 0
+        self.hits = 0
+        self.longest_rally = 0
+        self.peak_speed = 0
+        self.rallies = 0
+        self._simulation = simulation
+        self._start = time.monotonic()
+        simulation.tick_listeners.append(self.handle_tick)
+
+    def stop(self) -> None:
+        if self._simulation is not None:
+            self._simulation.tick_listeners.remove(self.handle_tick)
+            self._simulation = None
+
+
+class MatchStore:
+    """
+    Class keeps finished matches in SQLite database. Matches are written by background thread in batches, so adding
+    match does not wait for disk. Leaderboards are read with indices and are paged by the last shown match instead
+    of offset, so any page is found in milliseconds regardless of number of matches.
+    """
+
+    # Writer waits for more matches this time before it writes the batch
+    BATCH_DELAY: float = 0.5
+    BATCH_SIZE: int = 1000
+
+    def __init__(self, path: str) -> None:
+        """
+        :param path: path to database file.
+        """
+
+        self._connection: Optional[sqlite3.Connection] = None
+        # Error of opening database in writer thread, store cannot be used if it is set
+        self.error: Optional[Exception] = None
+        self._queue: queue.Queue = queue.Queue()
+        self._ready: threading.Event = threading.Event()
+        self.path: str = path
+        self.written: int = 0
+        self._thread: threading.Thread = threading.Thread(target=self._write, name="MatchStore", daemon=True)
+        self._thread.start()
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """
+        :return: connection to read database in the thread that created store.
+        """
+
+        if self._connection is None:
+            self._ready.wait()
+            if self.error is not None:
+                raise self.error
+            self._connection = sqlite3.connect(self.path)
+        return self._connection
+
+    def _open(self) -> Optional[sqlite3.Connection]:
+        """
+        :return: connection for writer thread with created tables or None if database cannot be opened.
+        """
+
+        try:
+            connection = sqlite3.connect(self.path)
+            try:
+                for statement in SCHEMA:
+                    connection.execute(statement)
+                connection.commit()
+            except sqlite3.Error:
+                connection.close()
+                raise
+            return connection
+        except (OSError, sqlite3.Error) as exc:
+            logging.exception("Failed to open match store '%s'", self.path)
+            self.error = exc
+            return None
+        finally:
+            # Readers wait for this event, so it is set even if database cannot be opened
+            self._ready.set()
+
+    def _write(self) -> None:
+        connection = self._open()
+        if connection is None:
+            return
+        stopped = False
+        while not stopped:
+            record = self._queue.get()
+            if record is None:
+                break
+            rows = [record.to_row()]
+            deadline = time.monotonic() + MatchStore.BATCH_DELAY
+            while len(rows) < MatchStore.BATCH_SIZE:
+                try:
+                    record = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if record is None:
+                    stopped = True
+                    break
+                rows.append(record.to_row())
+            try:
+                with connection:
+                    connection.executemany(INSERT, rows)
+                self.written += len(rows)
+            except sqlite3.Error:
+                logging.exception("Failed to write %d matches to match store '%s'", len(rows), self.path)
+        connection.close()
+
+    def add(self, record: MatchRecord) -> None:
+        """
+        :param record: finished match to write.
+        """
+
+        if self.error is None:
+            self._queue.put(record)
+
+    def close(self) -> None:
+        """
+        Method writes matches left in queue and closes database.
+        """
+
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def count(self) -> int:
+        return self._get_connection().execute("SELECT COALESCE(SUM(matches), 0) FROM mode_statistics").fetchone()[0]
+
+    def get_page(self, order: str = "newest", mode: Optional[int] = None, after: Optional[MatchRecord] = None,
+                 limit: int = 10) -> List[MatchRecord]:
+        """
+        :param order: name of leaderboard from ORDERS;
+        :param mode: type of game to show, all types by default;
+        :param after: the last match of the previous page, None for the first page;
+        :param limit: number of matches in page.
+        :return: matches of page.
+        """
+
+        keys = ORDERS[order]
+        conditions = []
+        parameters = []
+        if mode is not None:
+            conditions.append("mode = ?")
+            parameters.append(mode)
+        if after is not None:
+            conditions.append(f"({', '.join(keys)}) < ({', '.join('?' * len(keys))})")
+            parameters.extend(getattr(after, key) for key in keys)
+        where = f"WHERE {' AND '.join(conditions)} " if conditions else ""
+        query = (f"SELECT {', '.join(COLUMNS)} FROM matches {where}"
+                 f"ORDER BY {', '.join(key + ' DESC' for key in keys)} LIMIT ?")
+        rows = self._get_connection().execute(query, (*parameters, limit)).fetchall()
+        return [MatchRecord(**dict(zip(COLUMNS, row))) for row in rows]
+
+    def get_statistics(self) -> Dict[int, Dict[str, float]]:
+        """
+        :return: totals of matches by types of game.
+        """
+
+        cursor = self._get_connection().execute("SELECT * FROM mode_statistics ORDER BY mode")
+        names = [description[0] for description in cursor.description]
+        return {row[0]: dict(zip(names[1:], row[1:])) for row in cursor.fetchall()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fill match store with random matches and measure queries")
+    parser.add_argument("--path", default="matches.db", help="path to database file")
+    parser.add_argument("--fill", type=int, default=0, help="number of random matches to add")
+    parser.add_argument("--seed", type=int, default=0, help="seed of random number generator")
+    args = parser.parse_args()
+
+    store = MatchStore(args.path)
+    if args.fill:
+        rng = random.Random(args.seed)
+        start = time.perf_counter()
+        for _ in range(args.fill):
+            rallies = rng.randint(5, 9)
+            left = rng.randint(0, 5)
+            store.add(MatchRecord(rng.randint(1, 5), left, 5 if left < 5 else rng.randint(0, 4),
+                                  rng.uniform(30, 600), rallies, rallies * rng.randint(1, 30), rng.randint(0, 60),
+                                  rng.uniform(300, 1300)))
+        store.close()
+        print(f"Added {args.fill} matches in {time.perf_counter() - start:.1f} s")
+        store = MatchStore(args.path)
+    print(f"Matches in store: {store.count()}, size {os.path.getsize(args.path) / 2 ** 20:.1f} MB")
+    queries = [("statistics", store.get_statistics)]
+    for order in ORDERS:
+        queries.append((f"{order} page", lambda order=order: store.get_page(order)))
+        queries.append((f"{order} page of mode", lambda order=order: store.get_page(order, 1)))
+    for name, query in queries:
+        start = time.perf_counter()
+        query()
+        print(f"{name}: {1000 * (time.perf_counter() - start):.2f} ms")
+    start = time.perf_counter()
+    page = store.get_page("peak_speed")
+    for _ in range(99):
+        page = store.get_page("peak_speed", after=page[-1])
+    print(f"100 pages of peak_speed: {1000 * (time.perf_counter() - start):.2f} ms")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
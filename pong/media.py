@@ -0,0 +1,238 @@
+import argparse
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import zlib
+from typing import Dict, List, Optional, Tuple
+from kivy.resources import resource_find
+
+
+MAGIC: bytes = b"PONGMED\x01"
+# Header: magic, number of files, checksum of data. Checksum names directory with extracted files
+HEADER = struct.Struct("<8sII")
+# Entry of index: offset and size of data, length of name. Name in UTF-8 follows the entry
+ENTRY = struct.Struct("<QQH")
+# Data of every file starts at aligned offset
+ALIGNMENT: int = 16
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def build_bundle(media_dir: str, path: str) -> Dict[str, int]:
+    """
+    Function packs files of media folder into one bundle file.
+    :param media_dir: path to media folder;
+    :param path: path to bundle file.
+    :return: sizes of packed files.
+    """
+
+    files = {}
+    for name in sorted(os.listdir(media_dir)):
+        file_path = os.path.join(media_dir, name)
+        if os.path.isfile(file_path):
+            with open(file_path, "rb") as file:
+                files[name] = file.read()
+    index = bytearray()
+    offset = _align(HEADER.size + sum(ENTRY.size + len(name.encode("utf-8")) for name in files))
+    offsets = []
+    checksum = 0
+    for name, data in files.items():
+        encoded_name = name.encode("utf-8")
+        index += ENTRY.pack(offset, len(data), len(encoded_name)) + encoded_name
+        offsets.append(offset)
+        checksum = zlib.crc32(data, zlib.crc32(encoded_name, checksum))
+        offset = _align(offset + len(data))
+    temporary_path = path + ".tmp"
+    with open(temporary_path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, len(files), checksum))
+        file.write(index)
+        for data, data_offset in zip(files.values(), offsets):
+            file.write(b"\0" * (data_offset - file.tell()))
+            file.write(data)
+    os.replace(temporary_path, path)
+    return {name: len(data) for name, data in files.items()}
+
+
+class MediaBundle:
+    """
+    Class reads files from bundle built by build_bundle. Bundle is memory-mapped, so only pages of requested files
+    are read from disk, and files are returned as views of mapped memory without copying.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        :param path: path to bundle file.
+        """
+
+        self.path: str = path
+        with open(path, "rb") as file:
+            self._mmap: mmap.mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view: memoryview = memoryview(self._mmap)
+        magic, count, self.checksum = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"File '{path}' is not a media bundle")
+        self._index: Dict[str, Tuple[int, int]] = {}
+        position = HEADER.size
+        for _ in range(count):
+            offset, size, name_length = ENTRY.unpack_from(self._mmap, position)
+            position += ENTRY.size
+            name = bytes(self._view[position:position + name_length]).decode("utf-8")
+            position += name_length
+            self._index[name] = offset, size
+
+    def close(self) -> None:
+        """
+        Method unmaps bundle. Views returned by get must be released before.
+        """
+
+        self._view.release()
+        self._mmap.close()
+
+    def extract(self, name: str, directory: str) -> str:
+        """
+        Method writes file from bundle to directory. File that was written earlier is not written again.
+        :param name: name of file;
+        :param directory: directory to write file to.
+        :return: path to written file.
+        """
+
+        data = self.get(name)
+        path = os.path.join(directory, name)
+        if os.path.isfile(path) and os.path.getsize(path) == len(data):
+            return path
+        os.makedirs(directory, exist_ok=True)
+        temporary_path = path + ".tmp"
+        with open(temporary_path, "wb") as file:
+            file.write(data)
+        os.replace(temporary_path, path)
+        return path
+
+    def get(self, name: str) -> memoryview:
+        """
+        :param name: name of file.
+        :return: content of file as view of mapped memory.
+        """
+
+        offset, size = self._index[name]
+        return self._view[offset:offset + size]
+
+    def get_names(self) -> List[str]:
+        return list(self._index)
+
+
+class MediaLoader:
+    """
+    Class finds media files of application. Files are taken from bundle if it exists, in development loose files
+    from media folder are used.
+    """
+
+    BUNDLE_FILE: str = "media.bundle"
+    MEDIA_DIR: str = "media"
+
+    def __init__(self, cache_dir: str) -> None:
+        """
+        :param cache_dir: directory for files extracted from bundle for libraries that can open only files on disk.
+        """
+
+        self.bundle: Optional[MediaBundle] = None
+        bundle_path = resource_find(MediaLoader.BUNDLE_FILE)
+        if bundle_path:
+            try:
+                self.bundle = MediaBundle(bundle_path)
+                logging.info("Media files are loaded from bundle '%s'", bundle_path)
+            except (OSError, ValueError):
+                logging.exception("Failed to open media bundle '%s', loose files are used", bundle_path)
+        # Bundle with other content gets other directory, so stale files are never used
+        self._cache_dir: str = os.path.join(cache_dir, f"{self.bundle.checksum:08x}") if self.bundle else cache_dir
+
+    def find(self, name: str) -> Optional[str]:
+        """
+        Method is used only by consumers that can open files on disk only: audio providers of SDL and window icon.
+        File from bundle is extracted to cache for them. Other consumers read content with method read.
+        :param name: name of media file.
+        :return: path to file on disk or None if file is not found.
+        """
+
+        if self.bundle is not None:
+            try:
+                return self.bundle.extract(name, self._cache_dir)
+            except KeyError:
+                pass
+            except OSError:
+                logging.exception("Failed to extract media file '%s'", name)
+        return resource_find(os.path.join(MediaLoader.MEDIA_DIR, name)) or resource_find(name)
+
+    def get_names(self) -> List[str]:
+        """
+        :return: names of all media files.
+        """
+
+        if self.bundle is not None:
+            return self.bundle.get_names()
+        media_dir = resource_find(MediaLoader.MEDIA_DIR)
+        try:
+            return sorted(os.listdir(media_dir)) if media_dir else []
+        except OSError:
+            return []
+
+    def read(self, name: str) -> Optional[memoryview]:
+        """
+        Method serves content of file by name without extracting it to disk.
+        :param name: name of media file.
+        :return: content of file, view of mapped memory if file is in bundle, or None if file is not found.
+        """
+
+        if self.bundle is not None:
+            try:
+                return self.bundle.get(name)
+            except KeyError:
+                pass
+        path = resource_find(os.path.join(MediaLoader.MEDIA_DIR, name))
+        if not path:
+            return None
+        with open(path, "rb") as file:
+            return memoryview(file.read())
+
+
+_media_loader: Optional[MediaLoader] = None
+
+
+def get_media_loader() -> MediaLoader:
+    """
+    :return: media loader of application.
+    """
+
+    global _media_loader
+    if _media_loader is None:
+        from kivy.app import App
+
+        app = App.get_running_app()
+        cache_dir = os.path.join(app.user_data_dir if app else tempfile.gettempdir(), "media_cache")
+        _media_loader = MediaLoader(cache_dir)
+    return _media_loader
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Pack media folder into one bundle file")
+    parser.add_argument("--source", default=MediaLoader.MEDIA_DIR, help="path to media folder")
+    parser.add_argument("--output", default=MediaLoader.BUNDLE_FILE, help="path to bundle file")
+    args = parser.parse_args()
+
+    sizes = build_bundle(args.source, args.output)
+    bundle = MediaBundle(args.output)
+    for name, size in sizes.items():
+        with open(os.path.join(args.source, name), "rb") as file:
+            if bundle.get(name) != file.read():
+                raise RuntimeError(f"File '{name}' is packed incorrectly")
+        print(f"{name:<24} {size:>10} bytes")
+    bundle.close()
+    print(f"{len(sizes)} files packed to '{args.output}', {os.path.getsize(args.output)} bytes")
+
+
+if __name__ == "__main__":
+    main()
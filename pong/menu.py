@@ -1,22 +1,28 @@
 from enum import auto, Enum
 from typing import List, Tuple
 from kivy.app import App
-from kivy.core.window import Window
 from kivy.graphics import Color, Rectangle
 from kivy.properties import Property
 from kivy.uix.button import Button
 from kivy.uix.floatlayout import FloatLayout
 from kivy.uix.label import Label
+from pong.power import get_power_governor, PowerMode
+from pong.screen import Screen
 from version import VERSION
 
 
 class GameType(Enum):
     AI = auto()
+    NETWORK_CLIENT = auto()
+    NETWORK_HOST = auto()
     NOTHING = auto()
     WITH_FRIEND = auto()
+    # Values are saved in history of matches, so new types are added to the end
+    SPECTATOR = auto()
+    AI_VS_AI = auto()
 
 
-class Menu(FloatLayout):
+class Menu(Screen, FloatLayout):
     """
     Class for game menu.
     """
@@ -24,19 +30,36 @@ class Menu(FloatLayout):
     BACKGROUND_COLOR: Tuple[float, float, float, float] = (208 / 255, 189 / 255, 244 / 255, 1)
     BUTTON_COLOR: Tuple[float, float, float, float] = (132 / 255, 88 / 255, 179 / 255, 1)
     BUTTON_COLOR_ON_HOVER: Tuple[float, float, float, float] = (160 / 255, 210 / 255, 235 / 255, 1)
-    BUTTON_SIZE_HINT: Tuple[float, float] = (0.7, 0.16)
+    BUTTON_SIZE_HINT: Tuple[float, float] = (0.7, 0.08)
     game_type = Property(GameType.NOTHING)
+    show_history: Property = Property(False)
 
     def __init__(self) -> None:
         super().__init__()
         self._button_play_with_friend: Button = Button(text="Play with friend",
-                                                       pos_hint={"center_x": 0.5, "center_y": 0.75})
+                                                       pos_hint={"center_x": 0.5, "center_y": 0.9})
         self._button_play_with_friend.bind(on_press=self.start_game_with_friend)
+        self._button_host_network_game: Button = Button(text="Host network game",
+                                                        pos_hint={"center_x": 0.5, "center_y": 0.8})
+        self._button_host_network_game.bind(on_press=self.start_network_host_game)
+        self._button_join_network_game: Button = Button(text="Join network game",
+                                                        pos_hint={"center_x": 0.5, "center_y": 0.7})
+        self._button_join_network_game.bind(on_press=self.start_network_client_game)
+        self._button_watch_network_game: Button = Button(text="Watch network game",
+                                                         pos_hint={"center_x": 0.5, "center_y": 0.6})
+        self._button_watch_network_game.bind(on_press=self.start_spectator_game)
         self._button_play_with_ai: Button = Button(text="Play with AI", pos_hint={"center_x": 0.5, "center_y": 0.5})
         self._button_play_with_ai.bind(on_press=self.start_ai_game)
-        self._button_exit: Button = Button(text="Exit", pos_hint={"center_x": 0.5, "center_y": 0.25})
+        self._button_watch_ai_game: Button = Button(text="Watch AI vs AI", pos_hint={"center_x": 0.5, "center_y": 0.4})
+        self._button_watch_ai_game.bind(on_press=self.start_ai_vs_ai_game)
+        self._button_history: Button = Button(text="History", pos_hint={"center_x": 0.5, "center_y": 0.3})
+        self._button_history.bind(on_press=self.open_history)
+        self._button_exit: Button = Button(text="Exit", pos_hint={"center_x": 0.5, "center_y": 0.2})
         self._button_exit.bind(on_press=self.stop_app)
-        self._buttons: List[Button] = [self._button_play_with_friend, self._button_play_with_ai, self._button_exit]
+        self._buttons: List[Button] = [self._button_play_with_friend, self._button_host_network_game,
+                                       self._button_join_network_game, self._button_watch_network_game,
+                                       self._button_play_with_ai, self._button_watch_ai_game, self._button_history,
+                                       self._button_exit]
         for widget in self._buttons:
             widget.background_color = Menu.BUTTON_COLOR
             widget.size_hint = Menu.BUTTON_SIZE_HINT
@@ -44,7 +67,7 @@ class Menu(FloatLayout):
         self._label_version: Label = Label(text=f"v{VERSION}", pos_hint={"center_x": 0.5, "center_y": 0.075})
         self._widgets: List = [*self._buttons, self._label_version]
         self.resize()
-        Window.bind(mouse_pos=self._handle_mouse_hover)
+        self.bind_window(mouse_pos=self._handle_mouse_hover)
 
     @staticmethod
     def _check_press(instance) -> bool:
@@ -72,9 +95,18 @@ class Menu(FloatLayout):
             button.font_size = app_height * Menu.BUTTON_SIZE_HINT[1] * 0.3
         self._label_version.font_size = app_height * 0.05
 
+    def on_activate(self) -> None:
+        # Menu is static, so main loop wakes up only to read input
+        get_power_governor().request(PowerMode.IDLE)
+
     def on_size(self, *args) -> None:
         self._set_font_sizes(self.size[1])
 
+    def open_history(self, instance) -> None:
+        if self._check_press(instance):
+            return
+        self.show_history = True
+
     def resize(self) -> None:
         self.canvas.clear()
         with self.canvas:
@@ -92,11 +124,31 @@ class Menu(FloatLayout):
             return
         self.game_type = GameType.AI
 
+    def start_ai_vs_ai_game(self, instance) -> None:
+        if self._check_press(instance):
+            return
+        self.game_type = GameType.AI_VS_AI
+
     def start_game_with_friend(self, instance) -> None:
         if self._check_press(instance):
             return
         self.game_type = GameType.WITH_FRIEND
 
+    def start_network_client_game(self, instance) -> None:
+        if self._check_press(instance):
+            return
+        self.game_type = GameType.NETWORK_CLIENT
+
+    def start_network_host_game(self, instance) -> None:
+        if self._check_press(instance):
+            return
+        self.game_type = GameType.NETWORK_HOST
+
+    def start_spectator_game(self, instance) -> None:
+        if self._check_press(instance):
+            return
+        self.game_type = GameType.SPECTATOR
+
     def stop_app(self, instance) -> None:
         if self._check_press(instance):
             return
@@ -0,0 +1,349 @@
+import argparse
+import math
+import random
+import time
+from array import array
+from typing import Dict, List, Optional, Tuple
+from pong.simulation import AIController, BALL_SIZE, BallState, Event, FieldState, PaddleState, Side, Simulation
+
+
+class BallPool:
+    """
+    Class keeps balls in preallocated arrays of coordinates and velocities. Active balls occupy the first count items
+    of arrays.
+    """
+
+    __slots__ = ("capacity", "count", "size", "velocity_x", "velocity_y", "x", "y")
+
+    def __init__(self, capacity: int, size: float = BALL_SIZE) -> None:
+        """
+        :param capacity: maximum number of balls;
+        :param size: diameter of balls.
+        """
+
+        self.capacity: int = capacity
+        self.count: int = 0
+        self.size: float = size
+        self.velocity_x: array = array("d", bytes(8 * capacity))
+        self.velocity_y: array = array("d", bytes(8 * capacity))
+        self.x: array = array("d", bytes(8 * capacity))
+        self.y: array = array("d", bytes(8 * capacity))
+
+    def clear(self) -> None:
+        self.count = 0
+
+    def load(self, index: int, ball: BallState) -> None:
+        """
+        :param index: index of ball in pool;
+        :param ball: state to copy ball to.
+        """
+
+        ball.x = self.x[index]
+        ball.y = self.y[index]
+        ball.velocity_x = self.velocity_x[index]
+        ball.velocity_y = self.velocity_y[index]
+
+    def spawn(self, x: float, y: float, velocity_x: float, velocity_y: float) -> Optional[int]:
+        """
+        :param x: horizontal position of bottom left corner of ball;
+        :param y: vertical position of bottom left corner of ball;
+        :param velocity_x: horizontal velocity;
+        :param velocity_y: vertical velocity.
+        :return: index of new ball, None if pool is full.
+        """
+
+        if self.count == self.capacity:
+            return None
+        index = self.count
+        self.count += 1
+        self.store(index, x, y, velocity_x, velocity_y)
+        return index
+
+    def store(self, index: int, x: float, y: float, velocity_x: float, velocity_y: float) -> None:
+        self.x[index] = x
+        self.y[index] = y
+        self.velocity_x[index] = velocity_x
+        self.velocity_y[index] = velocity_y
+
+
+class SpatialHash:
+    """
+    Class with uniform grid over the field. Side of cell equals to diameter of ball, so overlapping balls are always in
+    the same or in adjacent cells and only these pairs are checked.
+    """
+
+    # Half of neighbourhood of cell, so that every pair of cells is visited once
+    NEIGHBOURS: Tuple[Tuple[int, int], ...] = ((1, -1), (1, 0), (1, 1), (0, 1))
+
+    def __init__(self, cell_size: float) -> None:
+        """
+        :param cell_size: side of cell.
+        """
+
+        self._cells: Dict[Tuple[int, int], List[int]] = {}
+        self.cell_size: float = cell_size
+
+    def get_pairs(self, pool: BallPool) -> List[Tuple[int, int]]:
+        """
+        :param pool: balls.
+        :return: pairs of indices of balls that are close enough to collide.
+        """
+
+        cells = self._cells
+        cells.clear()
+        cell_size = self.cell_size
+        xs = pool.x
+        ys = pool.y
+        for index in range(pool.count):
+            key = int(xs[index] // cell_size), int(ys[index] // cell_size)
+            members = cells.get(key)
+            if members is None:
+                cells[key] = [index]
+            else:
+                members.append(index)
+
+        pairs = []
+        limit = cell_size * cell_size
+        for (cell_x, cell_y), members in cells.items():
+            for position, first in enumerate(members):
+                for second in members[position + 1:]:
+                    if (xs[first] - xs[second]) ** 2 + (ys[first] - ys[second]) ** 2 < limit:
+                        pairs.append((first, second))
+            for shift_x, shift_y in SpatialHash.NEIGHBOURS:
+                others = cells.get((cell_x + shift_x, cell_y + shift_y))
+                if others is None:
+                    continue
+                for first in members:
+                    for second in others:
+                        if (xs[first] - xs[second]) ** 2 + (ys[first] - ys[second]) ** 2 < limit:
+                            pairs.append((first, second))
+        return pairs
+
+
+class MultiBallSimulation(Simulation):
+    """
+    Class with rules of multi-ball game. Balls collide with each other, a ball that crosses left or right border
+    brings a point and is served again from the center, so round ends only with the end of match. Every AI player
+    chases the ball that will reach its racket first.
+    """
+
+    __slots__ = ("_target_velocities", "_targets", "balls", "grid")
+
+    def __init__(self, field: FieldState, ball_count: int, ball_size: float = BALL_SIZE, **kwargs) -> None:
+        """
+        :param field: game field;
+        :param ball_count: number of balls;
+        :param ball_size: diameter of balls;
+        :param kwargs: arguments of Simulation. Ball of Simulation is used as cursor to move balls of pool with
+        continuous collision detection.
+        """
+
+        super().__init__(field, ball=BallState(ball_size), **kwargs)
+        self._target_velocities: List[Tuple[float, float]] = [(0, 0), (0, 0)]
+        self._targets: List[Optional[int]] = [None, None]
+        self.balls: BallPool = BallPool(ball_count, ball_size)
+        self.grid: SpatialHash = SpatialHash(ball_size)
+
+    def _collide_balls(self) -> None:
+        """
+        Method resolves elastic collisions of balls of equal mass: components of velocities along the line of centers
+        are exchanged and balls are pushed apart.
+        """
+
+        pool = self.balls
+        size = pool.size
+        xs, ys = pool.x, pool.y
+        velocities_x, velocities_y = pool.velocity_x, pool.velocity_y
+        for first, second in self.grid.get_pairs(pool):
+            dx = xs[second] - xs[first]
+            dy = ys[second] - ys[first]
+            distance = math.hypot(dx, dy)
+            if distance == 0:
+                dx, dy, distance = 1.0, 0.0, 1.0
+            normal_x = dx / distance
+            normal_y = dy / distance
+            overlap = (size - distance) / 2
+            first_x, second_x = xs[first], xs[second]
+            xs[first] -= normal_x * overlap
+            ys[first] -= normal_y * overlap
+            xs[second] += normal_x * overlap
+            ys[second] += normal_y * overlap
+            xs[first] = self._stop_at_paddles(first_x, xs[first], ys[first])
+            xs[second] = self._stop_at_paddles(second_x, xs[second], ys[second])
+            approach = ((velocities_x[first] - velocities_x[second]) * normal_x +
+                        (velocities_y[first] - velocities_y[second]) * normal_y)
+            if approach > 0:
+                velocities_x[first] -= approach * normal_x
+                velocities_y[first] -= approach * normal_y
+                velocities_x[second] += approach * normal_x
+                velocities_y[second] += approach * normal_y
+        top = self.field.height - size
+        for index in range(pool.count):
+            ys[index] = min(max(ys[index], 0), top)
+
+    def _move_controllers(self, dt: float) -> None:
+        pool = self.balls
+        cursor = self.ball
+        for side, (paddle, controller) in enumerate(zip(self.paddles, self.controllers)):
+            if not controller:
+                drive = self.drives[side]
+                if drive.direction:
+                    drive.move(dt, paddle, self.field)
+                continue
+            target = self.select_target(paddle)
+            if target is None:
+                continue
+            velocity = pool.velocity_x[target], pool.velocity_y[target]
+            # Prediction is recalculated only when chased ball changes or changes its direction
+            if target != self._targets[side] or velocity != self._target_velocities[side]:
+                controller.invalidate()
+                self._targets[side] = target
+                self._target_velocities[side] = velocity
+            pool.load(target, cursor)
+            controller.change_position(dt, cursor, paddle, self.field)
+
+    def _stop_at_paddles(self, old_x: float, x: float, y: float) -> float:
+        """
+        Method keeps ball pushed by another ball in front of racket, otherwise ball could be pushed through racket
+        past its swept collision test.
+        :param old_x: horizontal position of ball before push;
+        :param x: horizontal position of ball after push;
+        :param y: vertical position of ball.
+        :return: horizontal position of ball that does not cross racket.
+        """
+
+        size = self.balls.size
+        left, right = self.paddles
+        if old_x >= left.right > x and y + size > left.y and y < left.top:
+            return left.right
+        line = right.x - size
+        if old_x <= line < x and y + size > right.y and y < right.top:
+            return line
+        return x
+
+    def _serve(self, index: int) -> None:
+        """
+        :param index: index of ball to place to the center of field with random velocity.
+        """
+
+        size = self.balls.size
+        velocity_x, velocity_y = self.generate_random_velocity()
+        self.balls.store(index, (self.field.width - size) / 2, (self.field.height - size) / 2, velocity_x, velocity_y)
+
+    def select_target(self, paddle: PaddleState) -> Optional[int]:
+        """
+        :param paddle: racket of AI player.
+        :return: index of ball that will reach racket first, None if no ball moves to racket. Balls that have
+        already passed racket are ignored.
+        """
+
+        pool = self.balls
+        best_time = math.inf
+        target = None
+        if paddle.side == Side.LEFT:
+            line = paddle.right
+            for index in range(pool.count):
+                velocity_x = pool.velocity_x[index]
+                if velocity_x < 0:
+                    time_to_line = (line - pool.x[index]) / velocity_x
+                    if 0 <= time_to_line < best_time:
+                        best_time = time_to_line
+                        target = index
+        else:
+            line = paddle.x - pool.size
+            for index in range(pool.count):
+                velocity_x = pool.velocity_x[index]
+                if velocity_x > 0:
+                    time_to_line = (line - pool.x[index]) / velocity_x
+                    if 0 <= time_to_line < best_time:
+                        best_time = time_to_line
+                        target = index
+        return target
+
+    def start_round(self) -> None:
+        super().start_round()
+        pool = self.balls
+        pool.clear()
+        size = pool.size
+        columns = max(int(math.sqrt(pool.capacity)), 1)
+        spacing = 1.5 * size
+        start_x = (self.field.width - columns * spacing) / 2
+        start_y = (self.field.height - math.ceil(pool.capacity / columns) * spacing) / 2
+        for number in range(pool.capacity):
+            row, column = divmod(number, columns)
+            pool.spawn(start_x + column * spacing, start_y + row * spacing, *self.generate_random_velocity())
+        self._targets = [None, None]
+
+    def step(self, dt: float) -> Event:
+        """
+        Method advances the game by given time.
+        :param dt: time elapsed since the previous moment.
+        :return: events that happened during step.
+        """
+
+        if self.round_over:
+            return Event.NOTHING
+
+        profiler = self.profiler
+        if profiler is not None:
+            start = profiler.clock()
+        self._move_controllers(dt)
+        if profiler is not None:
+            start = self._add_phase("ai", start)
+
+        pool = self.balls
+        cursor = self.ball
+        width = self.field.width
+        score = self.score
+        events = Event.NOTHING
+        for index in range(pool.count):
+            pool.load(index, cursor)
+            events |= self._move_ball(dt)
+            if cursor.x < 0:
+                score.right += 1
+                events |= Event.LEFT_GOAL
+                self._serve(index)
+            elif cursor.x > width:
+                score.left += 1
+                events |= Event.RIGHT_GOAL
+                self._serve(index)
+            else:
+                pool.store(index, cursor.x, cursor.y, cursor.velocity_x, cursor.velocity_y)
+        if profiler is not None:
+            start = self._add_phase("ball", start)
+        self._collide_balls()
+        if profiler is not None:
+            start = self._add_phase("collide", start)
+
+        if score.is_game_over():
+            self.round_over = True
+            events |= Event.GAME_OVER
+        self.events = events
+        self.tick += 1
+        for listener in self.tick_listeners:
+            listener(self)
+        return events
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure speed of multi-ball simulation without window")
+    parser.add_argument("--balls", type=int, nargs="+", default=[10, 100, 300], help="numbers of balls")
+    parser.add_argument("--size", type=float, default=10, help="diameter of balls")
+    parser.add_argument("--ticks", type=int, default=600, help="number of ticks")
+    args = parser.parse_args()
+
+    for ball_count in args.balls:
+        simulation = MultiBallSimulation(FieldState(1000, 800), ball_count, args.size, left_controller=AIController(),
+                                         right_controller=AIController(), rng=random.Random(0), max_score=10 ** 9)
+        simulation.start_match()
+        start = time.perf_counter()
+        for _ in range(args.ticks):
+            simulation.step(1 / 120)
+        elapsed = time.perf_counter() - start
+        score = simulation.score
+        print(f"{ball_count:5d} balls: {1e6 * elapsed / args.ticks:9.1f} us per tick, "
+              f"{1e9 * elapsed / args.ticks / ball_count:7.0f} ns per ball, score {score.left}:{score.right}")
+
+
+if __name__ == "__main__":
+    main()
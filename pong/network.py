@@ -0,0 +1,567 @@
+import argparse
+import heapq
+import random
+import socket
+import struct
+import time
+from typing import Dict, List, Optional, Tuple
+from pong.simulation import AIController, Event, FieldState, Simulation
+
+
+PROTOCOL_VERSION: int = 1
+JOIN_PACKET: int = 1
+ACCEPT_PACKET: int = 2
+INPUT_PACKET: int = 3
+SNAPSHOT_PACKET: int = 4
+JOIN = struct.Struct("<BI")
+ACCEPT = struct.Struct("<BIddH")
+INPUT_HEADER = struct.Struct("<BIdB")
+INPUT_ITEM = struct.Struct("<Id")
+SNAPSHOT_HEADER = struct.Struct("<BIIIIdH")
+# Fields of snapshot. Fields that did not change since baseline snapshot are not sent
+FIELDS: List[Tuple[str, str]] = [("ball_x", "f"), ("ball_y", "f"), ("velocity_x", "f"), ("velocity_y", "f"),
+                                 ("left_y", "f"), ("right_y", "f"), ("score_left", "B"), ("score_right", "B"),
+                                 ("phase", "B"), ("countdown", "b")]
+FIELD_FORMATS: List[struct.Struct] = [struct.Struct("<" + field_format) for _, field_format in FIELDS]
+FULL_MASK: int = (1 << len(FIELDS)) - 1
+HISTORY_SIZE: int = 64
+MAX_DATAGRAM: int = 1024
+
+
+class Phase:
+    """
+    Class with phases of networked match sent in snapshots.
+    """
+
+    PLAYING: int = 0
+    COUNTDOWN: int = 1
+    LEFT_WON: int = 2
+    RIGHT_WON: int = 3
+
+
+def quantize(values: Tuple) -> Tuple:
+    """
+    :param values: values of snapshot fields.
+    :return: values as they are received after packing, so that host and client have equal baselines.
+    """
+
+    return tuple(field_struct.unpack(field_struct.pack(value))[0]
+                 for field_struct, value in zip(FIELD_FORMATS, values))
+
+
+def get_snapshot_values(simulation: Simulation, phase: int, countdown: int = 0) -> Tuple:
+    """
+    :param simulation: simulation of match;
+    :param phase: phase of match;
+    :param countdown: number shown during countdown.
+    :return: quantized values of snapshot fields.
+    """
+
+    ball = simulation.ball
+    return quantize((ball.x, ball.y, ball.velocity_x, ball.velocity_y, simulation.paddles[0].y,
+                     simulation.paddles[1].y, simulation.score.left, simulation.score.right, phase, countdown))
+
+
+def interpolate_state(timeline: List[Tuple[float, Tuple]], render_time: float, width: float) -> Dict[str, float]:
+    """
+    :param timeline: received states with local time of receiving, not empty;
+    :param render_time: moment to render;
+    :param width: width of field, longer jumps of coordinates are not interpolated.
+    :return: fields of states interpolated for given moment.
+    """
+
+    previous_time, previous = timeline[0]
+    for next_time, values in timeline:
+        if next_time >= render_time:
+            break
+        previous_time, previous = next_time, values
+    else:
+        next_time, values = previous_time, previous
+    alpha = 0 if next_time <= previous_time else min(max((render_time - previous_time) /
+                                                         (next_time - previous_time), 0), 1)
+    state = {}
+    for bit, (name, field_format) in enumerate(FIELDS):
+        if field_format == "f" and abs(values[bit] - previous[bit]) < 0.25 * width:
+            state[name] = previous[bit] + (values[bit] - previous[bit]) * alpha
+        else:
+            # Integer fields and jumps (new round) are not interpolated
+            state[name] = values[bit] if alpha >= 0.5 else previous[bit]
+    return state
+
+
+class NetworkStats:
+    """
+    Class with traffic and latency counters of network connection.
+    """
+
+    __slots__ = ("bytes_received", "bytes_sent", "corrections", "input_latency", "max_correction",
+                 "packets_received", "packets_sent", "rtt", "started")
+
+    def __init__(self) -> None:
+        self.bytes_received: int = 0
+        self.bytes_sent: int = 0
+        # Number and maximum size of corrections of predicted racket position by server
+        self.corrections: int = 0
+        self.max_correction: float = 0
+        # Smoothed time from input of user to its confirmation by host in seconds
+        self.input_latency: float = 0
+        self.packets_received: int = 0
+        self.packets_sent: int = 0
+        # Smoothed round trip time in seconds
+        self.rtt: float = 0
+        self.started: float = time.perf_counter()
+
+    def format(self) -> str:
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        return (f"sent {8 * self.bytes_sent / elapsed / 1000:.1f} kbit/s ({self.packets_sent / elapsed:.0f} pkt/s), "
+                f"received {8 * self.bytes_received / elapsed / 1000:.1f} kbit/s "
+                f"({self.packets_received / elapsed:.0f} pkt/s), RTT {1000 * self.rtt:.0f} ms, "
+                f"input latency {1000 * self.input_latency:.0f} ms, corrections {self.corrections} "
+                f"(max {self.max_correction:.1f} px)")
+
+
+def smooth(old: float, new: float, coefficient: float = 0.1) -> float:
+    return new if old == 0 else old + coefficient * (new - old)
+
+
+class LossyChannel:
+    """
+    Class sends datagrams through UDP socket with simulated one-way latency, jitter and packet loss. With zero latency
+    and loss datagrams are sent at once.
+    """
+
+    def __init__(self, sock: socket.socket, latency: float = 0, jitter: float = 0, loss: float = 0,
+                 seed: Optional[int] = None) -> None:
+        """
+        :param sock: UDP socket;
+        :param latency: one-way delay in seconds;
+        :param jitter: maximum random addition to delay in seconds;
+        :param loss: probability to lose datagram;
+        :param seed: seed of random number generator.
+        """
+
+        self._counter: int = 0
+        self._queue: List[Tuple[float, int, bytes, Tuple[str, int]]] = []
+        self._rng: random.Random = random.Random(seed)
+        self.jitter: float = jitter
+        self.latency: float = latency
+        self.loss: float = loss
+        self.socket: socket.socket = sock
+
+    def flush(self) -> None:
+        """
+        Method sends delayed datagrams that are due.
+        """
+
+        now = time.perf_counter()
+        while self._queue and self._queue[0][0] <= now:
+            _, _, data, address = heapq.heappop(self._queue)
+            self._send(data, address)
+
+    def _send(self, data: bytes, address: Tuple[str, int]) -> None:
+        try:
+            self.socket.sendto(data, address)
+        except OSError:
+            pass
+
+    def receive(self) -> List[Tuple[bytes, Tuple[str, int]]]:
+        """
+        :return: all datagrams that are ready to be read.
+        """
+
+        self.flush()
+        datagrams = []
+        while True:
+            try:
+                datagrams.append(self.socket.recvfrom(MAX_DATAGRAM))
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError:
+                # On Windows ICMP port unreachable is reported as error of recvfrom
+                continue
+        return datagrams
+
+    def send(self, data: bytes, address: Tuple[str, int]) -> None:
+        """
+        :param data: datagram;
+        :param address: address of receiver.
+        """
+
+        if self.loss and self._rng.random() < self.loss:
+            return
+        if not self.latency and not self.jitter:
+            self._send(data, address)
+            return
+        due = time.perf_counter() + self.latency + self._rng.uniform(0, self.jitter)
+        self._counter += 1
+        heapq.heappush(self._queue, (due, self._counter, data, address))
+
+
+def create_socket(address: Tuple[str, int]) -> socket.socket:
+    """
+    :param address: address to bind socket to.
+    :return: non-blocking UDP socket.
+    """
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(address)
+    sock.setblocking(False)
+    return sock
+
+
+class NetworkPeer:
+    """
+    Class with common part of host and client: channel, counters of traffic and detection of lost connection.
+    """
+
+    TIMEOUT: float = 5
+
+    def __init__(self, channel: LossyChannel) -> None:
+        """
+        :param channel: channel to communicate with another peer.
+        """
+
+        self._channel: LossyChannel = channel
+        self.last_received: float = 0
+        self.stats: NetworkStats = NetworkStats()
+
+    def _receive(self) -> List[Tuple[bytes, Tuple[str, int]]]:
+        datagrams = self._channel.receive()
+        for data, _ in datagrams:
+            self.stats.bytes_received += len(data)
+            self.stats.packets_received += 1
+        if datagrams:
+            self.last_received = time.perf_counter()
+        return datagrams
+
+    def _send_to(self, data: bytes, address: Tuple[str, int]) -> None:
+        self._channel.send(data, address)
+        self.stats.bytes_sent += len(data)
+        self.stats.packets_sent += 1
+
+    def close(self) -> None:
+        self._channel.socket.close()
+
+    def is_timed_out(self) -> bool:
+        """
+        :return: True if connection was established and nothing has been received for TIMEOUT seconds.
+        """
+
+        return bool(self.last_received) and time.perf_counter() - self.last_received > NetworkPeer.TIMEOUT
+
+
+class NetworkHost(NetworkPeer):
+    """
+    Class of host of networked match. Host runs simulation, receives positions of right racket from client and sends
+    delta-compressed snapshots of state.
+    """
+
+    SNAPSHOT_RATE: int = 60
+
+    def __init__(self, channel: LossyChannel, field: FieldState, tick_rate: int) -> None:
+        """
+        :param channel: channel to communicate with client;
+        :param field: field of game;
+        :param tick_rate: number of physics ticks per second.
+        """
+
+        super().__init__(channel)
+        self._acked_snapshot: int = 0
+        self._client_time: float = 0
+        self._field: FieldState = field
+        self._history: Dict[int, Tuple] = {}
+        self._last_input: int = 0
+        self._last_snapshot_time: float = 0
+        self._sequence: int = 0
+        self._tick_rate: int = tick_rate
+        self.client_address: Optional[Tuple[str, int]] = None
+        # New position of racket of client, it is reset to None by the game after it is applied
+        self.remote_paddle_y: Optional[float] = None
+
+    def _handle_input(self, data: bytes) -> None:
+        _, acked_snapshot, client_time, count = INPUT_HEADER.unpack_from(data)
+        self._acked_snapshot = max(self._acked_snapshot, acked_snapshot)
+        self._client_time = client_time
+        for index in range(count):
+            sequence, paddle_y = INPUT_ITEM.unpack_from(data, INPUT_HEADER.size + index * INPUT_ITEM.size)
+            if sequence > self._last_input:
+                self._last_input = sequence
+                self.remote_paddle_y = paddle_y
+
+    def poll(self) -> None:
+        """
+        Method handles all received datagrams. It should be called once per frame.
+        """
+
+        for data, address in self._receive():
+            if not data:
+                continue
+            if data[0] == JOIN_PACKET and len(data) >= JOIN.size and JOIN.unpack(data)[1] == PROTOCOL_VERSION:
+                if self.client_address != address:
+                    self.disconnect()
+                    self.client_address = address
+                    self.last_received = time.perf_counter()
+                self._send(ACCEPT.pack(ACCEPT_PACKET, PROTOCOL_VERSION, self._field.width, self._field.height,
+                                       self._tick_rate))
+            elif data[0] == INPUT_PACKET and address == self.client_address and len(data) >= INPUT_HEADER.size:
+                self._handle_input(data)
+
+    def disconnect(self) -> None:
+        """
+        Method forgets client, so that the next player can join.
+        """
+
+        self._acked_snapshot = 0
+        self._history.clear()
+        self._last_input = 0
+        self.client_address = None
+        self.last_received = 0
+        self.remote_paddle_y = None
+
+    def _send(self, data: bytes) -> None:
+        if self.client_address:
+            self._send_to(data, self.client_address)
+
+    def send_snapshot(self, simulation: Simulation, phase: int, countdown: int = 0, force: bool = False) -> None:
+        """
+        Method sends snapshot of state if it is time to send it. Fields are sent relative to the last snapshot
+        acknowledged by client.
+        :param simulation: simulation of match;
+        :param phase: phase of match;
+        :param countdown: number shown during countdown;
+        :param force: if True, snapshot is sent regardless of snapshot rate.
+        """
+
+        now = time.perf_counter()
+        if not self.client_address or (not force and now - self._last_snapshot_time < 1 / NetworkHost.SNAPSHOT_RATE):
+            return
+        self._last_snapshot_time = now
+        values = get_snapshot_values(simulation, phase, countdown)
+        self._sequence += 1
+        baseline_sequence = self._acked_snapshot if self._acked_snapshot in self._history else 0
+        baseline = self._history.get(baseline_sequence)
+        mask = 0
+        payload = []
+        for bit, (field_struct, value) in enumerate(zip(FIELD_FORMATS, values)):
+            if baseline is None or baseline[bit] != value:
+                mask |= 1 << bit
+                payload.append(field_struct.pack(value))
+        self._history[self._sequence] = values
+        self._history.pop(self._sequence - HISTORY_SIZE, None)
+        self._send(SNAPSHOT_HEADER.pack(SNAPSHOT_PACKET, self._sequence, baseline_sequence, simulation.tick,
+                                        self._last_input, self._client_time, mask) + b"".join(payload))
+
+
+class NetworkClient(NetworkPeer):
+    """
+    Class of client of networked match. Client predicts position of its own racket at once, renders the rest of state
+    interpolated between snapshots with small delay and reconciles its racket with positions confirmed by host.
+    """
+
+    INTERPOLATION_DELAY: float = 0.1
+    JOIN_INTERVAL: float = 0.5
+    # Number of the last inputs sent in every packet, so that lost packets do not lose inputs
+    REDUNDANT_INPUTS: int = 3
+
+    def __init__(self, channel: LossyChannel, host_address: Tuple[str, int]) -> None:
+        """
+        :param channel: channel to communicate with host;
+        :param host_address: address of host.
+        """
+
+        super().__init__(channel)
+        self._history: Dict[int, Tuple] = {}
+        self._host_address: Tuple[str, int] = host_address
+        self._input_times: Dict[int, float] = {}
+        self._input_sequence: int = 0
+        self._inputs: List[Tuple[int, float]] = []
+        self._last_join: float = 0
+        self._latest_snapshot: int = 0
+        # Received states with local time of receiving
+        self._timeline: List[Tuple[float, Tuple]] = []
+        self.connected: bool = False
+        self.field: Optional[FieldState] = None
+        self.predicted_y: Optional[float] = None
+        self.tick_rate: int = 0
+
+    def _decode_snapshot(self, data: bytes) -> None:
+        _, sequence, baseline_sequence, _, acked_input, client_time, mask = SNAPSHOT_HEADER.unpack_from(data)
+        baseline = self._history.get(baseline_sequence)
+        if baseline_sequence and baseline is None:
+            return
+        offset = SNAPSHOT_HEADER.size
+        values = []
+        for bit, field_struct in enumerate(FIELD_FORMATS):
+            if mask & (1 << bit):
+                values.append(field_struct.unpack_from(data, offset)[0])
+                offset += field_struct.size
+            else:
+                values.append(baseline[bit])
+        values = tuple(values)
+        self._history[sequence] = values
+        self._history.pop(sequence - HISTORY_SIZE, None)
+        if sequence <= self._latest_snapshot:
+            return
+        self._latest_snapshot = sequence
+        now = time.perf_counter()
+        if client_time:
+            self.stats.rtt = smooth(self.stats.rtt, now - client_time)
+        self._timeline.append((now, values))
+        while len(self._timeline) > 2 and self._timeline[1][0] < now - 2 * NetworkClient.INTERPOLATION_DELAY:
+            self._timeline.pop(0)
+        self._reconcile(acked_input, values[5])
+
+    def _reconcile(self, acked_input: int, server_y: float) -> None:
+        """
+        :param acked_input: the last input applied by host;
+        :param server_y: position of racket of client on host.
+        """
+
+        input_time = self._input_times.pop(acked_input, None)
+        if input_time is not None:
+            self.stats.input_latency = smooth(self.stats.input_latency, time.perf_counter() - input_time)
+            for sequence in [sequence for sequence in self._input_times if sequence < acked_input]:
+                del self._input_times[sequence]
+        self._inputs = [item for item in self._inputs if item[0] > acked_input]
+        if self._inputs or self.predicted_y is None:
+            # Host has not seen the latest inputs yet, prediction is kept
+            if self.predicted_y is None:
+                self.predicted_y = server_y
+            return
+        # Host has applied all inputs, its racket position is correct one (host could clamp it, for example)
+        correction = abs(server_y - self.predicted_y)
+        if correction > 0.5:
+            self.stats.corrections += 1
+            self.stats.max_correction = max(self.stats.max_correction, correction)
+        self.predicted_y = server_y
+
+    def _send(self, data: bytes) -> None:
+        self._send_to(data, self._host_address)
+
+    def get_state(self) -> Optional[Dict[str, float]]:
+        """
+        :return: state to render: fields of snapshots interpolated for moment INTERPOLATION_DELAY ago and predicted
+        position of racket of client.
+        """
+
+        if not self._timeline:
+            return None
+        state = interpolate_state(self._timeline, time.perf_counter() - NetworkClient.INTERPOLATION_DELAY,
+                                  self.field.width)
+        if self.predicted_y is not None:
+            state["right_y"] = self.predicted_y
+        return state
+
+    def poll(self) -> None:
+        """
+        Method handles all received datagrams and keeps sending join requests until host accepts. It should be called
+        once per frame.
+        """
+
+        now = time.perf_counter()
+        if not self.connected and now - self._last_join > NetworkClient.JOIN_INTERVAL:
+            self._last_join = now
+            self._send(JOIN.pack(JOIN_PACKET, PROTOCOL_VERSION))
+        for data, address in self._receive():
+            if not data or address != self._host_address:
+                continue
+            if data[0] == ACCEPT_PACKET and len(data) >= ACCEPT.size:
+                _, version, width, height, self.tick_rate = ACCEPT.unpack(data)
+                self.field = FieldState(width, height)
+                self.connected = version == PROTOCOL_VERSION
+            elif data[0] == SNAPSHOT_PACKET and self.connected and len(data) >= SNAPSHOT_HEADER.size:
+                self._decode_snapshot(data)
+        if self.connected:
+            self._send_inputs()
+
+    def _send_inputs(self) -> None:
+        now = time.perf_counter()
+        inputs = self._inputs[-NetworkClient.REDUNDANT_INPUTS:]
+        self._send(INPUT_HEADER.pack(INPUT_PACKET, self._latest_snapshot, now, len(inputs)) +
+                   b"".join(INPUT_ITEM.pack(sequence, y) for sequence, y in inputs))
+
+    def set_paddle_position(self, y: float) -> None:
+        """
+        Method applies new position of racket of client at once and sends it to host with the next packet.
+        :param y: new vertical position of bottom of racket.
+        """
+
+        if y == self.predicted_y:
+            return
+        self._input_sequence += 1
+        self._inputs.append((self._input_sequence, y))
+        self._input_times[self._input_sequence] = time.perf_counter()
+        self.predicted_y = y
+
+
+def run_localhost_session(duration: float, latency: float, jitter: float, loss: float, port: int = 0) -> None:
+    """
+    Function plays match between host and client in one process over localhost and prints statistics. Client racket
+    follows the ball as a user would do.
+    :param duration: duration of session in seconds;
+    :param latency: one-way delay in seconds;
+    :param jitter: maximum random addition to delay in seconds;
+    :param loss: probability to lose datagram;
+    :param port: port of host, 0 to choose free port.
+    """
+
+    host_socket = create_socket(("127.0.0.1", port))
+    client_socket = create_socket(("127.0.0.1", 0))
+    host_channel = LossyChannel(host_socket, latency, jitter, loss, seed=1)
+    client_channel = LossyChannel(client_socket, latency, jitter, loss, seed=2)
+    field = FieldState(1000, 800)
+    simulation = Simulation(field, left_controller=AIController(), rng=random.Random(1))
+    simulation.start_match()
+    tick_rate = 120
+    host = NetworkHost(host_channel, field, tick_rate)
+    client = NetworkClient(client_channel, host_socket.getsockname())
+    start = time.perf_counter()
+    last = start
+    accumulator = 0.0
+    frames = 0
+    frame_time = 1 / 60
+    while time.perf_counter() - start < duration:
+        now = time.perf_counter()
+        accumulator += now - last
+        last = now
+        host.poll()
+        if host.remote_paddle_y is not None:
+            paddle = simulation.paddles[1]
+            paddle.move_to(host.remote_paddle_y + paddle.height / 2, field.height)
+            host.remote_paddle_y = None
+        while accumulator >= 1 / tick_rate:
+            accumulator -= 1 / tick_rate
+            events = simulation.step(1 / tick_rate)
+            if events & Event.GAME_OVER:
+                simulation.start_match()
+            elif simulation.round_over:
+                simulation.start_round()
+        host.send_snapshot(simulation, Phase.PLAYING)
+        client.poll()
+        state = client.get_state()
+        if state and client.field:
+            paddle = simulation.paddles[1]
+            target = min(max(state["ball_y"] + 25 - paddle.height / 2, 0), field.height - paddle.height)
+            client.set_paddle_position(round(target))
+        frames += 1
+        time.sleep(max(0.0, frame_time - (time.perf_counter() - now)))
+    elapsed = time.perf_counter() - start
+    print(f"Frames: {frames} ({frames / elapsed:.1f} per second)")
+    print(f"Host: {host.stats.format()}")
+    print(f"Client: {client.stats.format()}")
+    host.close()
+    client.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Play networked match over localhost and measure traffic and latency")
+    parser.add_argument("--duration", type=float, default=10, help="duration of session in seconds")
+    parser.add_argument("--latency", type=float, default=0.05, help="one-way delay in seconds")
+    parser.add_argument("--jitter", type=float, default=0.005, help="maximum random addition to delay in seconds")
+    parser.add_argument("--loss", type=float, default=0.02, help="probability to lose datagram")
+    args = parser.parse_args()
+    run_localhost_session(args.duration, args.latency, args.jitter, args.loss)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+import io
+import os
+import random
+import zlib
+from typing import BinaryIO, Dict, List, Optional, Tuple, Union
+import numpy as np
+from pong.simulation import BallState, FieldState, PaddleState, Side
+
+
+# Number of values in observation of policy
+FEATURES: int = 6
+Layer = Tuple[np.ndarray, np.ndarray]
+
+
+def _get_features(direction: int, face_x, ball_center_x, ball_center_y, velocity_x, velocity_y, paddle_center_y,
+                  width: float, height: float, paddle_height: float, max_velocity: float) -> tuple:
+    return (direction * (face_x - ball_center_x) / width,
+            direction * velocity_x / max_velocity,
+            2 * ball_center_y / height - 1,
+            velocity_y / max_velocity,
+            2 * paddle_center_y / height - 1,
+            (ball_center_y - paddle_center_y) / paddle_height)
+
+
+def make_observations(direction: int, face_x, ball_center_x, ball_center_y, velocity_x, velocity_y, paddle_center_y,
+                      width: float, height: float, paddle_height: float, max_velocity: float) -> np.ndarray:
+    """
+    Function builds observations of policy from state of game. Observations are mirrored for the left racket, so the
+    same policy can play on both sides. Arguments can be numbers or arrays of the same shape.
+    :param direction: 1 for the right racket and -1 for the left racket;
+    :param face_x: horizontal position of side of racket that faces the field;
+    :param ball_center_x: horizontal position of ball center;
+    :param ball_center_y: vertical position of ball center;
+    :param velocity_x: horizontal velocity of ball;
+    :param velocity_y: vertical velocity of ball;
+    :param paddle_center_y: vertical position of racket center;
+    :param width: width of field;
+    :param height: height of field;
+    :param paddle_height: height of racket;
+    :param max_velocity: maximum velocity of ball.
+    :return: array of observations with FEATURES values in the last dimension.
+    """
+
+    return np.stack(_get_features(direction, face_x, ball_center_x, ball_center_y, velocity_x, velocity_y,
+                                  paddle_center_y, width, height, paddle_height, max_velocity), axis=-1)
+
+
+def get_observation(ball: BallState, paddle: PaddleState, field: FieldState,
+                    out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    :param ball: ball;
+    :param paddle: racket controlled by policy;
+    :param field: game field;
+    :param out: array of shape (1, FEATURES) to write observation to, so that array is not allocated in every tick.
+    :return: observation of policy as batch of one item.
+    """
+
+    if paddle.side == Side.RIGHT:
+        direction, face_x = 1, paddle.x
+    else:
+        direction, face_x = -1, paddle.right
+    if out is None:
+        out = np.empty((1, FEATURES))
+    out[0] = _get_features(direction, face_x, ball.center_x, ball.center_y, ball.velocity_x, ball.velocity_y,
+                           paddle.center_y, field.width, field.height, paddle.height, ball.max_velocity)
+    return out
+
+
+class Policy:
+    """
+    Base class for policies that decide how rackets move. Policy works with batches of observations, so one call
+    can drive rackets of many matches.
+    """
+
+    def decide(self, observations: np.ndarray) -> np.ndarray:
+        """
+        :param observations: array of shape (number of rackets, FEATURES).
+        :return: velocities of rackets relative to maximum velocity, from -1 (down) to 1 (up).
+        """
+
+        raise NotImplementedError
+
+
+class MLPPolicy(Policy):
+    """
+    Class for policy of multilayer perceptron with tanh activations. Weights of layer can have additional leading
+    dimension for population of networks: then batch of observations is split into equal parts, one part for every
+    network.
+    """
+
+    def __init__(self, layers: List[Layer]) -> None:
+        """
+        :param layers: weights and biases of layers.
+        """
+
+        self.layers: List[Layer] = layers
+
+    @property
+    def population(self) -> int:
+        """
+        :return: number of networks, 0 if weights are not stacked.
+        """
+
+        weights = self.layers[0][0]
+        return weights.shape[0] if weights.ndim == 3 else 0
+
+    @staticmethod
+    def create(sizes: List[int], rng: np.random.Generator) -> "MLPPolicy":
+        """
+        :param sizes: sizes of input, hidden and output layers;
+        :param rng: random number generator.
+        :return: network with random weights.
+        """
+
+        return MLPPolicy([(rng.normal(0, 1 / np.sqrt(inputs), (inputs, outputs)), np.zeros(outputs))
+                          for inputs, outputs in zip(sizes[:-1], sizes[1:])])
+
+    @staticmethod
+    def from_vector(vector: np.ndarray, shapes: List[Tuple[int, int]]) -> "MLPPolicy":
+        """
+        :param vector: parameters of network as array of shape (size,) or stacked parameters of population as array
+        of shape (population, size);
+        :param shapes: shapes of weights of layers.
+        :return: network or population of networks.
+        """
+
+        layers = []
+        offset = 0
+        for inputs, outputs in shapes:
+            weights = vector[..., offset: offset + inputs * outputs]
+            offset += inputs * outputs
+            biases = vector[..., offset: offset + outputs]
+            offset += outputs
+            layers.append((weights.reshape(vector.shape[:-1] + (inputs, outputs)), biases[..., np.newaxis, :]
+                           if vector.ndim == 2 else biases))
+        return MLPPolicy(layers)
+
+    @staticmethod
+    def load(file: Union[str, BinaryIO]) -> "MLPPolicy":
+        """
+        :param file: path to .npz file or file object with arrays w0, b0, w1, b1 and so on.
+        :return: network.
+        """
+
+        with np.load(file) as data:
+            return MLPPolicy([(data[f"w{index}"], data[f"b{index}"]) for index in range(len(data.files) // 2)])
+
+    def decide(self, observations: np.ndarray) -> np.ndarray:
+        population = self.population
+        values = observations.reshape(population, -1, observations.shape[-1]) if population else observations
+        for weights, biases in self.layers:
+            values = np.tanh(values @ weights + biases)
+        return values.reshape(-1)
+
+    def get_shapes(self) -> List[Tuple[int, int]]:
+        return [weights.shape[-2:] for weights, _ in self.layers]
+
+    def save(self, path: str) -> None:
+        """
+        :param path: path to .npz file.
+        """
+
+        arrays = {}
+        for index, (weights, biases) in enumerate(self.layers):
+            arrays[f"w{index}"] = weights
+            arrays[f"b{index}"] = biases
+        np.savez(path, **arrays)
+
+    def to_vector(self) -> np.ndarray:
+        return np.concatenate([array.ravel() for layer in self.layers for array in layer])
+
+
+class WeightCache:
+    """
+    Class loads weights of policies from files and entries of media bundle once. File is loaded again only if it was
+    modified, entry is loaded again only if its content changed.
+    """
+
+    # Prefix of keys of entries, so they are not mixed with paths of files
+    ENTRY_PREFIX: str = "entry:"
+
+    def __init__(self) -> None:
+        # Policies by key with version of weights: time of modification of file or checksum of entry
+        self._policies: Dict[str, Tuple[float, MLPPolicy]] = {}
+
+    def get(self, path: str) -> MLPPolicy:
+        """
+        :param path: path to .npz file with weights.
+        :return: policy with weights from file.
+        """
+
+        path = os.path.abspath(path)
+        modified = os.path.getmtime(path)
+        cached = self._policies.get(path)
+        if cached is None or cached[0] != modified:
+            cached = modified, MLPPolicy.load(path)
+            self._policies[path] = cached
+        return cached[1]
+
+    def get_entry(self, name: str, data: Union[bytes, memoryview]) -> MLPPolicy:
+        """
+        :param name: name of media file with weights;
+        :param data: content of media file.
+        :return: policy with weights from content.
+        """
+
+        key = WeightCache.ENTRY_PREFIX + name
+        checksum = zlib.crc32(data)
+        cached = self._policies.get(key)
+        if cached is None or cached[0] != checksum:
+            cached = checksum, MLPPolicy.load(io.BytesIO(data))
+            self._policies[key] = cached
+        return cached[1]
+
+
+_weight_cache: Optional[WeightCache] = None
+
+
+def get_weight_cache() -> WeightCache:
+    """
+    :return: cache of weights of policies.
+    """
+
+    global _weight_cache
+    if _weight_cache is None:
+        _weight_cache = WeightCache()
+    return _weight_cache
+
+
+class PolicyController:
+    """
+    Class moves racket of computer player by decisions of policy. It can replace AIController in Simulation. Policy
+    makes no random errors, its quality depends only on weights.
+    """
+
+    # Racket of policy is slower than ball, so policy has to anticipate where ball comes
+    MAX_VELOCITY: float = 500
+    __slots__ = ("_observation", "error", "max_velocity", "policy")
+
+    def __init__(self, policy: Union[Policy, str], max_velocity: float = MAX_VELOCITY) -> None:
+        """
+        :param policy: policy or path to file with weights of MLP policy;
+        :param max_velocity: maximum velocity of racket.
+        """
+
+        self._observation: np.ndarray = np.empty((1, FEATURES))
+        self.error: float = 0
+        self.max_velocity: float = max_velocity
+        self.policy: Policy = get_weight_cache().get(policy) if isinstance(policy, str) else policy
+
+    def change_error(self, opponent_score: int, max_score: int, rng: random.Random) -> None:
+        pass
+
+    def change_position(self, dt: float, ball: BallState, paddle: PaddleState, field: FieldState) -> None:
+        """
+        :param dt: time elapsed since the previous moment;
+        :param ball: ball;
+        :param paddle: racket of computer player;
+        :param field: game field.
+        """
+
+        action = float(self.policy.decide(get_observation(ball, paddle, field, self._observation))[0])
+        paddle.move_to(paddle.center_y + action * self.max_velocity * dt, field.height)
+
+    def invalidate(self) -> None:
+        pass
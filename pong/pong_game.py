@@ -1,34 +1,52 @@
-import math
 import logging
-import os
 import random
-from typing import Tuple
-from kivy.clock import Clock
-from kivy.core.audio import SoundLoader
+import time
+from typing import List, Optional, Set, Tuple, TYPE_CHECKING, Union
+from kivy.config import Config
 from kivy.core.window import Window
 from kivy.graphics import Color, Rectangle
 from kivy.uix.label import Label
 from kivy.uix.widget import Widget
 from kivy.utils import platform
-from kivy.vector import Vector
-from pong.ball import Ball
+from pong.audio import get_audio_manager
+from pong.ball import Ball, BallGroup
+from pong.broadcast import SpectatorClient
+from pong.game_features import Broadcaster, MatchRecording, open_network, ProfilerOverlay, TimeScaleControl
 from pong.headband import Headband
+from pong.loop import FixedStepLoop
+from pong.media import get_media_loader
 from pong.menu import GameType
-from pong.player import AIPlayer, Player, Side
+from pong.multiball import MultiBallSimulation
+from pong.network import NetworkClient, NetworkHost, Phase
+from pong.player import AIPlayer, Player
+from pong.power import get_power_governor, PowerMode
+from pong.profiler import FrameProfiler
+from pong.screen import Screen
+from pong.text_cache import CachedLabel, get_text_cache
+from pong.simulation import AIController, BALL_SIZE, Event, FieldState, MAX_SCORE, Side, Simulation
 
+if TYPE_CHECKING:
+    from pong.policy import PolicyController
 
-class PongGame(Widget):
+
+class PongGame(Screen, Widget):
     """
     Class is responsible for the logic of the game.
     """
 
     BACKGROUND_COLOR: Tuple[float, float, float, float] = (53 / 255, 56 / 255, 57 / 255, 1)
+    # Error of AI players of AI-vs-AI game. With default error two AI players hardly ever miss the ball
+    DEMO_AI_ERROR: float = 0.3
     FONT_SIZE: int = 70
     ENEMY_COLOR: Tuple[float, float, float, float] = (160 / 255, 210 / 255, 235 / 255, 1)
-    MAX_SCORE: int = 5
+    DOWN_KEY: str = "down"
+    MAX_SCORE: int = MAX_SCORE
+    PROFILER_KEY: str = "f3"
     STOP_COLOR: Tuple[float, float, float, float] = (1, 0, 0, 1)
     STOP_HOVER_COLOR: Tuple[float, float, float, float] = (121 / 255, 6 / 255, 4 / 255, 1)
-    TIMEOUT: float = 1 / 60
+    SOUND: str = "impact_on_ground.wav"
+    TICK_RATE: int = FixedStepLoop.TICK_RATE
+    UP_KEY: str = "up"
     USER_COLOR: Tuple[float, float, float, float] = (229 / 255, 234 / 255, 245 / 255, 1)
 
     def __init__(self, main_widget) -> None:
@@ -38,56 +56,120 @@ class PongGame(Widget):
 
         super().__init__()
         self._ball: Ball = Ball()
+        self._ball_group: BallGroup = BallGroup()
+        self._field: FieldState = FieldState()
         self._headband: Headband = Headband()
         self._headband.bind(return_to_menu=self.stop_game)
         self._headband.bind(start_round=self.start_round)
         self._is_running: bool = False
         self._keyboard = None
-        self._label_1: Label = Label()
-        self._label_2: Label = Label()
+        self._label_1: CachedLabel = CachedLabel(PongGame.FONT_SIZE)
+        self._label_2: CachedLabel = CachedLabel(PongGame.FONT_SIZE)
         self._label_stop: Label = Label(text="Stop", color=PongGame.STOP_COLOR)
         self._label_stop.bind(on_touch_down=self.stop_game_by_user)
+        self._loop: FixedStepLoop = FixedStepLoop(Config.getdefaultint("pong", "tick_rate", PongGame.TICK_RATE))
+        self._broadcaster: Broadcaster = Broadcaster(self, self._loop, self._headband, self._get_phase)
+        self._local_players: List[Player] = []
         self._main_widget = main_widget
+        self._network: Optional[Union[NetworkClient, NetworkHost, SpectatorClient]] = None
+        self._network_event = None
+        self._network_velocity: Tuple[float, float] = (0, 0)
+        self._profiler_overlay: ProfilerOverlay = ProfilerOverlay(self, self._get_network_stats)
+        self._profiler: FrameProfiler = self._profiler_overlay.profiler
         self._player_1: Player = None
+        self._pressed_keys: Set[str] = set()
         self._player_2: Player = None
+        self._game_type: GameType = GameType.NOTHING
+        self._recording: MatchRecording = MatchRecording()
         self._schedule_event = None
-        self._sound: SoundLoader = SoundLoader.load(os.path.join("media", "impact_on_ground.wav"))
-
-        for label in (self._label_1, self._label_2, self._label_stop):
-            label.font_size = PongGame.FONT_SIZE
+        self._seed: int = None
+        self._simulation: Simulation = None
+        self._time_scale: TimeScaleControl = TimeScaleControl(self._loop, self._headband, PongGame.STOP_COLOR)
+        self._waiting_for_client: bool = False
+
+        self._label_stop.font_size = PongGame.FONT_SIZE
+        # Texts of scores and headband are rasterized once when game screen is built
+        get_text_cache().preload([str(score) for score in range(PongGame.MAX_SCORE + 1)], PongGame.FONT_SIZE)
+        Headband.preload_texts()
+        if Config.getdefaultint("pong", "profiler", 0):
+            self.toggle_profiler()
         with self.canvas:
             Color(*PongGame.BACKGROUND_COLOR)
             self._background: Rectangle = Rectangle(pos=self.pos, size=self.size)
             Color(1, 1, 1, 1)
             self._net: Rectangle = Rectangle(pos=[self.center_x - 5, 0], size=[10, self.height])
-        Window.bind(mouse_pos=self._handle_mouse_hover)
+        self.bind_window(mouse_pos=self._handle_mouse_hover)
+
+    def _change_drive_direction(self) -> None:
+        """
+        Method sets direction of keyboard drive of racket of user according to pressed keys. Racket is moved by drive
+        in ticks of simulation.
+        """
+
+        if not self._local_players:
+            return
+        direction = (PongGame.UP_KEY in self._pressed_keys) - (PongGame.DOWN_KEY in self._pressed_keys)
+        side = 0 if self._local_players[0] is self._player_1 else 1
+        drive = self._simulation.drives[side]
+        if drive.direction != direction:
+            drive.set_direction(direction, time.perf_counter())
+            self._recording.record_drive(side)
+
+    @staticmethod
+    def _create_demo_controller() -> AIController:
+        """
+        :return: controller for racket of AI-vs-AI game. It makes errors also on match point, otherwise match of two
+        AI players would never end.
+        """
+
+        return AIController(AIPlayer.VELOCITY, AIPlayer.MIN_VELOCITY, PongGame.DEMO_AI_ERROR, error_scale=1,
+                            match_point_error=True)
+
+    def _create_policy_controller(self) -> Optional["PolicyController"]:
+        """
+        :return: controller with learned policy from file set by option ai_policy of section [pong] or None if
+        hand-written AI should be used.
+        """
+
+        name = Config.getdefault("pong", "ai_policy", "")
+        if not name:
+            return None
+        data = get_media_loader().read(name)
+        if data is None:
+            logging.warning("File '%s' with weights of AI policy is not found, hand-written AI is used", name)
+            return None
+        from pong.policy import get_weight_cache, PolicyController
+
+        logging.info("AI player uses policy from '%s'", name)
+        return PolicyController(get_weight_cache().get_entry(name, data))
 
     def _handle_keyboard_closed(self) -> None:
         if self._keyboard:
             self._keyboard.unbind(on_key_down=self.handle_keyboard_down)
+            self._keyboard.unbind(on_key_up=self.handle_keyboard_up)
             self._keyboard = None
+        self._pressed_keys.clear()
 
-    def _continue_game(self) -> bool:
+    def _get_network_stats(self) -> str:
         """
-        :return: True if game should continue.
+        :return: statistics of network connection shown in profiler overlay.
         """
 
-        return self._player_1.score < PongGame.MAX_SCORE and self._player_2.score < PongGame.MAX_SCORE
+        return self._network.stats.format() if self._network else ""
 
-    def _generate_random_velocity(self) -> Vector:
+    def _get_phase(self) -> int:
         """
-        :return: velocity vector with a randomly chosen direction. The direction of velocity is normally distributed.
+        :return: phase of match for network player and spectators.
         """
 
-        angle = random.choice([*list(range(10, 81)), *list(range(-80, -9))])
-        direction = 0 if random.randint(0, 1) == 0 else 180
-        angle += direction
-        return Vector(self._ball.init_velocity, 0).rotate(angle)
+        score = self._simulation.score
+        if score.is_game_over():
+            return Phase.LEFT_WON if score.left > score.right else Phase.RIGHT_WON
+        return Phase.COUNTDOWN if self._headband.parent else Phase.PLAYING
 
     def _init_ball(self) -> None:
-        width, height = self.size
-        self._ball.max_velocity = math.pow(width ** 2 + height ** 2, 0.5) / 1
-        self._ball.init_velocity = self._ball.max_velocity / 4
+        self._field.width, self._field.height = self.size
+        self._simulation.init_ball()
         logging.info("Initial velocity of ball: %.2f", self._ball.init_velocity)
 
     def _init_players(self, game_type: GameType) -> None:
@@ -98,29 +180,60 @@ class PongGame(Widget):
         for player in (self._player_1, self._player_2):
             if player and player.parent:
                 self.remove_widget(player)
-        self._player_1 = Player(PongGame.USER_COLOR, Side.LEFT)
-        self._player_1.bind(score=self.set_score)
-        if game_type == GameType.AI:
-            self._player_2 = AIPlayer(PongGame.ENEMY_COLOR, Side.RIGHT)
-        elif game_type == GameType.WITH_FRIEND:
+        if game_type == GameType.AI_VS_AI:
+            self._player_1 = AIPlayer(PongGame.USER_COLOR, Side.LEFT, self._create_demo_controller())
+            self._player_2 = AIPlayer(PongGame.ENEMY_COLOR, Side.RIGHT, self._create_demo_controller())
+        elif game_type == GameType.AI:
+            self._player_1 = Player(PongGame.USER_COLOR, Side.LEFT)
+            self._player_2 = AIPlayer(PongGame.ENEMY_COLOR, Side.RIGHT, self._create_policy_controller())
+        else:
+            self._player_1 = Player(PongGame.USER_COLOR, Side.LEFT)
             self._player_2 = Player(PongGame.ENEMY_COLOR, Side.RIGHT)
+        self._player_1.bind(score=self.set_score)
+        if game_type == GameType.WITH_FRIEND:
+            self._local_players = [self._player_1, self._player_2]
+        elif game_type == GameType.NETWORK_CLIENT:
+            self._local_players = [self._player_2]
+        elif game_type in (GameType.AI_VS_AI, GameType.SPECTATOR):
+            self._local_players = []
+        else:
+            self._local_players = [self._player_1]
         self._player_2.bind(score=self.set_score)
+        self._seed = random.getrandbits(32)
+        logging.info("Seed of random number generator: %d", self._seed)
+        ball_count = Config.getdefaultint("pong", "balls", 1)
+        if ball_count > 1 and game_type in (GameType.AI, GameType.AI_VS_AI, GameType.WITH_FRIEND):
+            ball_size = float(Config.getdefault("pong", "ball_size", BALL_SIZE))
+            self._simulation = MultiBallSimulation(self._field, ball_count, ball_size, left=self._player_1.state,
+                                                   right=self._player_2.state,
+                                                   left_controller=getattr(self._player_1, "controller", None),
+                                                   right_controller=getattr(self._player_2, "controller", None),
+                                                   rng=random.Random(self._seed), max_score=PongGame.MAX_SCORE)
+        else:
+            self._simulation = Simulation(self._field, self._ball.state, self._player_1.state, self._player_2.state,
+                                          left_controller=getattr(self._player_1, "controller", None),
+                                          right_controller=getattr(self._player_2, "controller", None),
+                                          rng=random.Random(self._seed), max_score=PongGame.MAX_SCORE)
         self._set_keyboard_for_computer()
 
     def _init_round(self) -> None:
         logging.info("Start new round")
         if self._schedule_event:
             self._schedule_event.cancel()
-        self._ball.center = self.center
-        self._ball.velocity = self._generate_random_velocity()
-
-        self._player_1.x = self.x
-        self._player_1.center_y = self.center_y
-        self._player_2.x = self.width - self._player_2.width
-        self._player_2.center_y = self.center_y
+        self._field.width, self._field.height = self.size
+        self._simulation.start_round()
+        self._loop.reset(self._simulation)
+        self._sync_widgets()
+        # Events of the previous round are written while countdown is shown
+        self._recording.flush()
         if isinstance(self._player_2, AIPlayer):
-            self._player_2.change_player_error(self._player_1.score, PongGame.MAX_SCORE)
+            logging.info("AI player has error = %.2f", self._player_2.controller.error)
+        self._place_widgets()
+        self._simulation.profiler = self._profiler if self._profiler.enabled else None
+        self._headband.start_countdown()
+        self._request_headband_power_mode()
 
+    def _place_widgets(self) -> None:
         self._background.pos = self.pos
         self._background.size = self.size
         self._net.pos = [self.center_x - 5, 0]
@@ -132,17 +245,25 @@ class PongGame(Widget):
         self._label_2.top = self.top - 50
         self._label_stop.center_x = self.width / 2
         self._label_stop.top = 90
+        self._profiler_overlay.label.x = self._label_stop.right + 20
+        self._profiler_overlay.label.y = 10
+        self._time_scale.label.center_x = self.width / 2
+        self._time_scale.label.top = self.top - 10
 
         self._headband.center_x = self.center_x
         self._headband.center_y = self.center_y
 
-        for widget in (self._ball, self._player_1, self._player_2, self._label_1, self._label_2, self._label_stop,
-                       self._headband):
+        if isinstance(self._simulation, MultiBallSimulation):
+            ball_widget, unused_widget = self._ball_group, self._ball
+        else:
+            ball_widget, unused_widget = self._ball, self._ball_group
+        if unused_widget.parent:
+            self.remove_widget(unused_widget)
+        for widget in (ball_widget, self._player_1, self._player_2, self._label_1, self._label_2, self._label_stop,
+                       self._time_scale.label, self._headband):
             if widget.parent is None:
                 self.add_widget(widget)
 
-        self._headband.start_countdown()
-
     def _handle_mouse_hover(self, window, pos) -> None:
         """
         Method handles mouse movement over screen.
@@ -153,28 +274,218 @@ class PongGame(Widget):
         self._label_stop.color = PongGame.STOP_HOVER_COLOR if self._label_stop.collide_point(*pos) else \
             PongGame.STOP_COLOR
 
+    def _handle_local_input(self) -> None:
+        """
+        Method passes positions of rackets changed by user to replay recorder or network host.
+        """
+
+        self._recording.record_inputs()
+        if isinstance(self._network, NetworkClient) and self._network.field:
+            self._network.set_paddle_position(self._player_2.state.y * self._network.field.height / self.height)
+
+    def _request_headband_power_mode(self) -> None:
+        # Countdown and congratulations change once in a fraction of second. Networked game exchanges data on every
+        # frame, so it keeps full rate
+        get_power_governor().request(PowerMode.ACTIVE if self._network else PowerMode.REDUCED)
+
     def _set_keyboard_for_computer(self) -> None:
         if platform.lower() in ("linux", "macosx", "win") and not self._keyboard:
             self._keyboard = Window.request_keyboard(self._handle_keyboard_closed, self, "text")
             self._keyboard.bind(on_key_down=self.handle_keyboard_down)
+            self._keyboard.bind(on_key_up=self.handle_keyboard_up)
+
+    def _stop_game(self) -> None:
+        self._handle_keyboard_closed()
+        self._recording.stop()
+        self._stop_network()
+        self._is_running = False
+        self._waiting_for_client = False
+        if self._schedule_event:
+            self._schedule_event.cancel()
+            self._schedule_event = None
+        self._main_widget.show_menu()
+
+    def _stop_network(self) -> None:
+        if self._network_event:
+            self._network_event.cancel()
+            self._network_event = None
+        if self._network:
+            logging.info("Network statistics: %s", self._network.stats.format())
+            self._network.close()
+            self._network = None
+
+    def _start_recording(self) -> None:
+        if self._network and not isinstance(self._network, NetworkHost):
+            return
+        self._recording.start(self._simulation, self._seed, self._loop.tick_rate)
 
     def _show_game_end(self) -> None:
+        record = self._recording.finish(self._game_type)
+        if record:
+            self._main_widget.get_match_store().add(record)
         if self._schedule_event:
             self._schedule_event.cancel()
         if self._headband.parent is None:
             self.add_widget(self._headband)
         self._headband.show_congratulations(self._player_1.score >= PongGame.MAX_SCORE)
+        self._request_headband_power_mode()
+
+    def _sync_widgets(self, events: Event = Event.NOTHING) -> None:
+        """
+        Method copies state of simulation to widgets. It is called once per rendered frame, after the last tick of
+        frame. In fast-forwarded game sounds, color of ball and highlighting of hits are skipped: they would flicker
+        and play many times per frame.
+        :param events: events that happened in simulation since the previous frame.
+        """
+
+        effects = self._loop.time_scale == 1
+        ball_x, ball_y, left_y, right_y = self._loop.interpolate(self._simulation)
+        if isinstance(self._simulation, MultiBallSimulation):
+            self._ball_group.sync(self._simulation.balls, self._simulation.ball.max_velocity)
+        else:
+            self._ball.sync((ball_x, ball_y), effects)
+        # Rackets of users are rendered where they are now to avoid extra input latency
+        left_controller, right_controller = self._simulation.controllers
+        self._player_1.sync(left_y if left_controller else None)
+        self._player_2.sync(right_y if right_controller else None)
+        # Highlighting that has already started is finished anyway
+        self._player_1.show_hit(effects and bool(events & Event.LEFT_HIT))
+        self._player_2.show_hit(effects and bool(events & Event.RIGHT_HIT))
+        if effects and events & Event.WALL_BOUNCE:
+            get_audio_manager().play(PongGame.SOUND)
+        score = self._simulation.score
+        self._player_1.score = score.left
+        self._player_2.score = score.right
+
+    def _update_client(self, dt: float) -> None:
+        """
+        Method renders state received from network host or broadcast server. Racket of user is rendered at predicted
+        position.
+        :param dt: time elapsed since the previous frame.
+        """
+
+        client = self._network
+        drive = self._simulation.drives[1]
+        if drive.direction:
+            drive.move(dt, self._player_2.state, self._field)
+            self._handle_local_input()
+        state = client.get_state()
+        if state is None:
+            return
+        scale_x = self.width / client.field.width
+        scale_y = self.height / client.field.height
+        ball = self._ball.state
+        ball.velocity_x, ball.velocity_y = state["velocity_x"], state["velocity_y"]
+        ball.x, ball.y = state["ball_x"] * scale_x, state["ball_y"] * scale_y
+        self._ball.sync((ball.x, ball.y))
+        self._player_1.sync(state["left_y"] * scale_y)
+        self._player_2.sync(state["right_y"] * scale_y)
+
+        # Hits and bounces are found by change of direction of ball near rackets and walls
+        velocity_x, velocity_y = self._network_velocity
+        self._network_velocity = ball.velocity_x, ball.velocity_y
+        self._player_1.show_hit(velocity_x < 0 < ball.velocity_x and ball.x < self.width / 4)
+        self._player_2.show_hit(ball.velocity_x < 0 < velocity_x and ball.right > 3 * self.width / 4)
+        if velocity_y * ball.velocity_y < 0 and (ball.y < ball.size or ball.top > self.height - ball.size):
+            get_audio_manager().play(PongGame.SOUND)
+        self._player_1.score = int(state["score_left"])
+        self._player_2.score = int(state["score_right"])
+
+        phase = int(state["phase"])
+        if phase == Phase.COUNTDOWN:
+            if self._headband.parent is None:
+                self.add_widget(self._headband)
+            countdown = int(state["countdown"])
+            self._headband.show_text(str(countdown) if countdown else Headband.START_TEXT)
+        elif phase == Phase.PLAYING:
+            if self._headband.parent:
+                self.remove_widget(self._headband)
+        elif self._is_running:
+            self._is_running = False
+            if self._headband.parent is None:
+                self.add_widget(self._headband)
+            self._headband.show_congratulations(phase == Phase.RIGHT_WON)
+
+    def _update_host(self) -> None:
+        """
+        Method applies position of racket received from client and sends state of simulation to client.
+        """
+
+        host = self._network
+        if self._waiting_for_client:
+            if not host.client_address:
+                return
+            self._waiting_for_client = False
+            self._init_round()
+            self._start_recording()
+        if host.remote_paddle_y is not None:
+            paddle = self._player_2.state
+            paddle.move_to(host.remote_paddle_y + paddle.height / 2, self._field.height)
+            host.remote_paddle_y = None
+            self._recording.record_inputs()
+        host.send_snapshot(self._simulation, self._get_phase(), self._headband.number)
+
+    def _update_network(self, dt: float) -> None:
+        """
+        Method exchanges data with another player. It is called on every rendered frame of networked game.
+        :param dt: time elapsed since the previous frame.
+        """
+
+        self._network.poll()
+        if self._network.is_timed_out():
+            logging.warning("Connection with network player is lost")
+            self._stop_game()
+            return
+        if isinstance(self._network, NetworkHost):
+            self._update_host()
+        else:
+            self._update_client(dt)
+
+    def close(self) -> None:
+        """
+        Method stops broadcast for spectators and writes the rest of event log.
+        """
+
+        self._broadcaster.close()
+        self._recording.close()
 
     def handle_keyboard_down(self, keyboard, key_code, text, modifiers) -> bool:
-        if key_code[1].lower() == "down":
-            self._player_1.move_player_down()
-        elif key_code[1].lower() == "up":
-            self._player_1.move_player_up()
+        key = key_code[1].lower()
+        if key in (PongGame.DOWN_KEY, PongGame.UP_KEY):
+            # Repeated events of held key do not change anything
+            if key not in self._pressed_keys:
+                self._pressed_keys.add(key)
+                self._change_drive_direction()
+        elif key == PongGame.PROFILER_KEY:
+            self.toggle_profiler()
+        else:
+            self._time_scale.handle_key(key)
+        return True
+
+    def handle_keyboard_up(self, keyboard, key_code) -> bool:
+        key = key_code[1].lower()
+        if key in self._pressed_keys:
+            self._pressed_keys.discard(key)
+            self._change_drive_direction()
         return True
 
+    def on_activate(self) -> None:
+        get_power_governor().request(PowerMode.ACTIVE)
+        self._profiler_overlay.activate()
+
+    def on_suspend(self) -> None:
+        # Clock events are already cancelled by screen
+        self._broadcaster.suspend()
+        self._network_event = None
+        self._profiler_overlay.suspend()
+        self._schedule_event = None
+        self._handle_keyboard_closed()
+        self._headband.cancel()
+
     def on_touch_move(self, touch) -> None:
-        for player in (self._player_1, self._player_2):
+        for player in self._local_players:
             player.change_position_by_touch(touch.x, touch.y)
+        self._handle_local_input()
 
     def set_score(self, player: Player, score: int) -> None:
         """
@@ -193,22 +504,51 @@ class PongGame(Widget):
         """
 
         logging.info("Start new game")
+        self._game_type = game_type
+        self._time_scale.apply(game_type)
         self._is_running = True
-        self._init_ball()
         self._init_players(game_type)
+        self._init_ball()
+        self._simulation.score.reset()
         self._player_1.score = 0
         self._player_2.score = 0
+        if game_type in (GameType.AI, GameType.AI_VS_AI, GameType.NETWORK_HOST, GameType.WITH_FRIEND):
+            self._broadcaster.start(self._simulation)
+        if game_type in (GameType.NETWORK_CLIENT, GameType.NETWORK_HOST, GameType.SPECTATOR):
+            self._network = open_network(game_type, self._field, self._loop.tick_rate)
+            if self._network is None:
+                self._stop_game()
+                return
+            self._network_event = self.schedule_interval(self._update_network, 0)
+            # Rackets and ball are placed to start positions while players connect. Simulation of client is not
+            # advanced, client renders state received from host
+            self._field.width, self._field.height = self.size
+            self._simulation.start_round()
+            self._loop.reset(self._simulation)
+            self._sync_widgets()
+            self._place_widgets()
+            self._headband.show_text(Headband.WAIT_TEXT)
+            self._waiting_for_client = game_type == GameType.NETWORK_HOST
+            return
         self._init_round()
+        self._start_recording()
 
     def start_round(self, headband, start_round: bool) -> None:
         if start_round and self._is_running:
-            self._schedule_event = Clock.schedule_interval(self.update, PongGame.TIMEOUT)
+            self._schedule_event = self.schedule_interval(self.update, 0)
             self.remove_widget(self._headband)
+            get_power_governor().request(PowerMode.ACTIVE)
 
     def stop_game(self, headband, return_to_menu: bool) -> None:
         logging.info("Return to menu")
         self._handle_keyboard_closed()
+        self._recording.stop()
         if return_to_menu:
+            # Matches of AI players follow one another until user stops them, for example, on kiosk
+            if self._game_type == GameType.AI_VS_AI and self._is_running:
+                self.start_game(GameType.AI_VS_AI)
+                return
+            self._stop_network()
             self._is_running = False
             self._main_widget.show_menu()
 
@@ -217,44 +557,47 @@ class PongGame(Widget):
             return
         if self._label_stop.collide_point(touch.x, touch.y):
             logging.info("Game stopped by user")
-            self._handle_keyboard_closed()
-            self._is_running = False
-            if self._schedule_event:
-                self._schedule_event.cancel()
-                self._schedule_event = None
-            self._main_widget.show_menu()
+            self._stop_game()
+
+    def toggle_profiler(self) -> None:
+        """
+        Method shows or hides overlay with durations of frame phases. Durations are measured only while overlay is
+        shown.
+        """
+
+        self._profiler_overlay.toggle()
+        if self._simulation:
+            self._simulation.profiler = self._profiler if self._profiler.enabled else None
 
     def update(self, dt: float) -> None:
+        """
+        Method is called on every rendered frame. Physics is advanced with fixed ticks, positions of widgets are
+        interpolated between the last two ticks.
+        :param dt: time elapsed since the previous frame.
+        """
+
         if not self._is_running:
             return
 
-        for player in (self._player_1, self._player_2):
-            player.change_position(dt, self._ball)
-
-        self._ball.move(dt)
-        self._player_1.hit_ball(self._ball)
-        self._player_2.hit_ball(self._ball)
-
-        if self._ball.y < 0 or self._ball.top > self.height:
-            # Ball rebound from the horizontal borders of the field
-            if self._ball.y < 0:
-                self._ball.y = 0
+        profiler = self._profiler
+        if profiler.enabled:
+            start = profiler.clock()
+        events = self._loop.advance(dt, self._simulation)
+        if profiler.enabled:
+            physics_finish = profiler.clock()
+            profiler.add("physics", physics_finish - start)
+            for drive in self._simulation.drives:
+                if drive.latency is not None:
+                    profiler.add("input", drive.latency)
+                    drive.latency = None
+        self._sync_widgets(events)
+        if profiler.enabled:
+            finish = profiler.clock()
+            profiler.add("sync", finish - physics_finish)
+            profiler.add("frame", finish - start)
+        # In multi-ball game goals do not end round
+        if self._simulation.round_over:
+            if events & Event.GAME_OVER:
+                self._show_game_end()
             else:
-                self._ball.top = self.height
-            self._sound.play()
-            self._ball.velocity_y *= -1
-
-        new_round = False
-        if self._ball.x < self.x:
-            # The first player lost, add 1 point to the second player
-            self._player_2.score += 1
-            new_round = True
-        elif self._ball.x > self.width:
-            # The second player lost, add 1 point to the first player
-            self._player_1.score += 1
-            new_round = True
-        if new_round:
-            if self._continue_game():
                 self._init_round()
-            else:
-                self._show_game_end()
@@ -0,0 +1,221 @@
+import json
+import logging
+import time
+from enum import auto, Enum
+from typing import Dict, Optional
+from kivy.clock import Clock
+from kivy.config import Config
+from kivy.core.window import Window
+
+
+class PowerMode(Enum):
+    ACTIVE = auto()
+    IDLE = auto()
+    PAUSED = auto()
+    REDUCED = auto()
+
+
+class PowerUsage:
+    """
+    Class with time, processor time, wakeups of main loop and drawn frames spent in one power mode.
+    """
+
+    __slots__ = ("cpu_time", "frames", "time", "wakeups")
+
+    def __init__(self) -> None:
+        self.cpu_time: float = 0
+        self.frames: int = 0
+        self.time: float = 0
+        self.wakeups: int = 0
+
+    def get_statistics(self) -> Dict[str, float]:
+        """
+        :return: time in seconds, share of processor time in percents, wakeups and frames per second.
+        """
+
+        duration = self.time or 1
+        return {"seconds": self.time, "cpu_percent": 100 * self.cpu_time / duration,
+                "wakeups_per_second": self.wakeups / duration, "frames_per_second": self.frames / duration}
+
+
+class PowerGovernor:
+    """
+    Class limits how often main loop of Kivy wakes up. Kivy redraws window only when canvas is changed, but the loop
+    itself runs at maxfps even on static screens. Kivy has no public setter of maxfps, so in limited modes clock event
+    of every frame sleeps for the rest of frame period. Screens request a mode: active screens run at full rate, static
+    screens (menu, history) wake up a few times per second only to read input, screens with countdown or
+    congratulations are redrawn at reduced rate. Any input returns full rate for a short time, so that buttons and
+    rackets respond smoothly.
+    """
+
+    # Wakeups per second while screen is static. Input is read at this rate, so the first touch waits at most 1 / 5 s
+    IDLE_FPS: float = 5
+    # Time in seconds after the last input while full rate is kept
+    INPUT_TIMEOUT: float = 2
+    # Wakeups per second while application is in background. Screen clock events are cancelled, loop only waits for
+    # return to foreground
+    PAUSED_FPS: float = 1
+    REDUCED_FPS: float = 15
+
+    def __init__(self) -> None:
+        self._active_fps: float = Config.getfloat("graphics", "maxfps")
+        self._fps: float = 0
+        self._frame_event = None
+        self._input_event = Clock.create_trigger(self._handle_input_timeout, PowerGovernor.INPUT_TIMEOUT)
+        self._last_wakeup: float = 0
+        self._mode: PowerMode = PowerMode.ACTIVE
+        self._requested_mode: PowerMode = PowerMode.ACTIVE
+        self._started: bool = False
+        self._usage: Dict[PowerMode, PowerUsage] = {mode: PowerUsage() for mode in PowerMode}
+        self._checkpoint = self._get_counters()
+
+    @property
+    def mode(self) -> PowerMode:
+        """
+        :return: power mode applied now.
+        """
+
+        return self._mode
+
+    @staticmethod
+    def _get_counters():
+        return time.monotonic(), time.process_time(), Clock.frames, Clock.frames_displayed
+
+    def _account(self) -> None:
+        """
+        Method adds resources spent since the previous call to current mode.
+        """
+
+        counters = self._get_counters()
+        usage = self._usage[self._mode]
+        usage.time += counters[0] - self._checkpoint[0]
+        usage.cpu_time += counters[1] - self._checkpoint[1]
+        usage.wakeups += counters[2] - self._checkpoint[2]
+        usage.frames += counters[3] - self._checkpoint[3]
+        self._checkpoint = counters
+
+    def _apply(self, mode: PowerMode) -> None:
+        """
+        :param mode: power mode to apply.
+        """
+
+        if mode == self._mode:
+            return
+        self._account()
+        self._mode = mode
+        if mode == PowerMode.IDLE:
+            fps = PowerGovernor.IDLE_FPS
+        elif mode == PowerMode.PAUSED:
+            fps = PowerGovernor.PAUSED_FPS
+        elif mode == PowerMode.REDUCED:
+            fps = PowerGovernor.REDUCED_FPS
+        else:
+            fps = self._active_fps
+        self._fps = fps
+        if mode == PowerMode.ACTIVE or not fps:
+            # Rate of active mode is limited by Kivy itself with maxfps from config
+            if self._frame_event:
+                self._frame_event.cancel()
+                self._frame_event = None
+        elif not self._frame_event:
+            self._last_wakeup = time.perf_counter()
+            self._frame_event = Clock.schedule_interval(self._limit_frame_rate, 0)
+
+    def _handle_input(self, *args) -> None:
+        if self._mode != PowerMode.PAUSED and self._requested_mode in (PowerMode.IDLE, PowerMode.REDUCED):
+            self._apply(PowerMode.ACTIVE)
+            self._input_event.cancel()
+            self._input_event()
+
+    def _handle_input_timeout(self, dt: float) -> None:
+        if self._mode != PowerMode.PAUSED:
+            self._apply(self._requested_mode)
+
+    def _limit_frame_rate(self, dt: float) -> None:
+        """
+        Method is called once per frame of main loop and sleeps until the next wakeup allowed in current mode.
+        :param dt: time elapsed since the previous frame.
+        """
+
+        delay = 1 / self._fps - (time.perf_counter() - self._last_wakeup)
+        if delay > 0:
+            time.sleep(delay)
+        self._last_wakeup = time.perf_counter()
+
+    def export(self, path: str) -> None:
+        """
+        Method saves usage of resources by power modes to JSON file.
+        :param path: path to file.
+        """
+
+        statistics = self.get_statistics()
+        for mode, values in statistics.items():
+            logging.info("Power mode %s: %.0f s, CPU %.1f%%, %.1f wakeups/s, %.1f frames/s", mode, values["seconds"],
+                         values["cpu_percent"], values["wakeups_per_second"], values["frames_per_second"])
+        try:
+            with open(path, "w", encoding="utf-8") as file:
+                json.dump(statistics, file, indent=4)
+            logging.info("Power usage statistics saved to '%s'", path)
+        except OSError:
+            logging.exception("Failed to save power usage statistics to '%s'", path)
+
+    def get_statistics(self) -> Dict[str, Dict[str, float]]:
+        """
+        :return: usage of resources by power modes in which application has been.
+        """
+
+        self._account()
+        return {mode.name.lower(): usage.get_statistics() for mode, usage in self._usage.items() if usage.time}
+
+    def pause(self) -> None:
+        """
+        Method is called when application goes to background.
+        """
+
+        self._input_event.cancel()
+        self._apply(PowerMode.PAUSED)
+
+    def request(self, mode: PowerMode) -> None:
+        """
+        :param mode: power mode that shown screen needs.
+        """
+
+        self._requested_mode = mode
+        if self._mode == PowerMode.PAUSED:
+            return
+        self._input_event.cancel()
+        self._apply(mode)
+
+    def resume(self) -> None:
+        """
+        Method is called when application returns from background.
+        """
+
+        if self._mode == PowerMode.PAUSED:
+            self._apply(self._requested_mode)
+
+    def start(self) -> None:
+        """
+        Method starts watching input of window.
+        """
+
+        if self._started:
+            return
+        self._started = True
+        self._checkpoint = self._get_counters()
+        Window.bind(mouse_pos=self._handle_input, on_key_down=self._handle_input, on_motion=self._handle_input,
+                    on_resize=self._handle_input)
+
+
+_governor: Optional[PowerGovernor] = None
+
+
+def get_power_governor() -> PowerGovernor:
+    """
+    :return: power governor of application.
+    """
+
+    global _governor
+    if _governor is None:
+        _governor = PowerGovernor()
+    return _governor
@@ -0,0 +1,130 @@
+import json
+import logging
+from time import perf_counter
+from typing import Dict, List, Optional
+
+
+def calculate_statistics(samples: List[float]) -> Dict[str, float]:
+    """
+    :param samples: durations in seconds.
+    :return: percentiles 50, 95, 99 and maximum of durations in milliseconds.
+    """
+
+    samples = sorted(samples)
+    if not samples:
+        return {"p50": 0, "p95": 0, "p99": 0, "max": 0}
+
+    def percentile(value: float) -> float:
+        return 1000 * samples[min(int(value * len(samples)), len(samples) - 1)]
+
+    return {"p50": percentile(0.5), "p95": percentile(0.95), "p99": percentile(0.99), "max": 1000 * samples[-1]}
+
+
+class RollingHistogram:
+    """
+    Class keeps the last durations of some phase of frame and calculates their percentiles.
+    """
+
+    SIZE: int = 600
+    __slots__ = ("_index", "_samples", "count")
+
+    def __init__(self, size: int = SIZE) -> None:
+        """
+        :param size: number of the last durations to keep.
+        """
+
+        self._index: int = 0
+        self._samples: List[float] = [0.0] * size
+        self.count: int = 0
+
+    def add(self, duration: float) -> None:
+        """
+        :param duration: duration in seconds.
+        """
+
+        self._samples[self._index] = duration
+        self._index = (self._index + 1) % len(self._samples)
+        self.count += 1
+
+    def get_samples(self) -> List[float]:
+        """
+        :return: kept durations in seconds.
+        """
+
+        return self._samples[:min(self.count, len(self._samples))]
+
+    def get_statistics(self) -> Dict[str, float]:
+        """
+        :return: percentiles 50, 95, 99 and maximum of kept durations in milliseconds.
+        """
+
+        return calculate_statistics(self.get_samples())
+
+
+class FrameProfiler:
+    """
+    Class collects durations of frame phases. When profiler is disabled, callers should not measure time at all, so
+    the only cost is a check of enabled attribute.
+    """
+
+    def __init__(self) -> None:
+        self._histograms: Dict[str, RollingHistogram] = {}
+        self.enabled: bool = False
+
+    @staticmethod
+    def clock() -> float:
+        return perf_counter()
+
+    def add(self, phase: str, duration: float) -> None:
+        """
+        :param phase: name of phase;
+        :param duration: duration of phase in seconds.
+        """
+
+        histogram = self._histograms.get(phase)
+        if histogram is None:
+            histogram = self._histograms[phase] = RollingHistogram()
+        histogram.add(duration)
+
+    def export(self, path: str) -> None:
+        """
+        Method saves statistics of phases to JSON file.
+        :param path: path to file.
+        """
+
+        if not self._histograms:
+            return
+        statistics = {phase: {"count": histogram.count, **histogram.get_statistics()}
+                      for phase, histogram in self._histograms.items()}
+        try:
+            with open(path, "w", encoding="utf-8") as file:
+                json.dump(statistics, file, indent=4)
+            logging.info("Frame time statistics saved to '%s'", path)
+        except OSError:
+            logging.exception("Failed to save frame time statistics to '%s'", path)
+
+    def format(self) -> str:
+        """
+        :return: text with statistics of phases for overlay.
+        """
+
+        lines = []
+        for phase, histogram in self._histograms.items():
+            statistics = histogram.get_statistics()
+            lines.append(f"{phase:>7}: p50 {statistics['p50']:.2f} p95 {statistics['p95']:.2f} "
+                         f"p99 {statistics['p99']:.2f} max {statistics['max']:.2f} ms")
+        return "\n".join(lines)
+
+
+_profiler: Optional[FrameProfiler] = None
+
+
+def get_profiler() -> FrameProfiler:
+    """
+    :return: frame profiler of application.
+    """
+
+    global _profiler
+    if _profiler is None:
+        _profiler = FrameProfiler()
+    return _profiler
@@ -0,0 +1,297 @@
+import argparse
+import math
+import random
+import struct
+import time
+from typing import BinaryIO, Dict, List, Optional, Tuple
+from pong.simulation import AIController, Event, FieldState, Simulation
+
+
+MAGIC: bytes = b"PONGRPL\x02"
+# Header: magic, seed, tick rate, keyframe interval, width and height of field, maximum score, increment coefficient,
+# flags of AI players and velocity, minimum velocity and error magnitude of AI players
+HEADER = struct.Struct("<8sIHIddBdBdddddd")
+INPUT = struct.Struct("<BIBd")
+DRIVE = struct.Struct("<BIBb")
+KEYFRAME = struct.Struct("<BI?dddd" + "d" * 2 + "I" * 2 + "dddd?" * 2 + "bd" * 2 + "625Id")
+END = struct.Struct("<BI")
+INDEX_ITEM = struct.Struct("<IQ")
+INDEX_SIZE = struct.Struct("<I")
+FOOTER = struct.Struct("<Q8s")
+INPUT_RECORD: int = 1
+KEYFRAME_RECORD: int = 2
+END_RECORD: int = 3
+DRIVE_RECORD: int = 4
+
+
+def _pack_keyframe(simulation: Simulation) -> bytes:
+    """
+    :param simulation: simulation.
+    :return: record with state of simulation after the last tick.
+    """
+
+    ball = simulation.ball
+    controllers = []
+    for controller in simulation.controllers:
+        if controller:
+            controllers.extend((controller.error, controller.velocity, controller.target_y, controller.time_left,
+                                controller.valid))
+        else:
+            controllers.extend((0, 0, 0, 0, False))
+    drives = []
+    for drive in simulation.drives:
+        drives.extend((drive.direction, drive.velocity))
+    _, rng_state, gauss_next = simulation.rng.getstate()
+    return KEYFRAME.pack(KEYFRAME_RECORD, simulation.tick, simulation.round_over, ball.x, ball.y, ball.velocity_x,
+                         ball.velocity_y, simulation.paddles[0].y, simulation.paddles[1].y, simulation.score.left,
+                         simulation.score.right, *controllers, *drives, *rng_state,
+                         math.nan if gauss_next is None else gauss_next)
+
+
+def _unpack_keyframe(data: bytes, offset: int, simulation: Simulation) -> None:
+    """
+    Method restores state of simulation from keyframe record.
+    :param data: data of replay;
+    :param offset: offset of keyframe record;
+    :param simulation: simulation.
+    """
+
+    values = KEYFRAME.unpack_from(data, offset)
+    (_, simulation.tick, simulation.round_over, simulation.ball.x, simulation.ball.y, simulation.ball.velocity_x,
+     simulation.ball.velocity_y, simulation.paddles[0].y, simulation.paddles[1].y, simulation.score.left,
+     simulation.score.right) = values[:11]
+    for index, controller in enumerate(simulation.controllers):
+        if controller:
+            (controller.error, controller.velocity, controller.target_y, controller.time_left,
+             controller.valid) = values[11 + 5 * index: 16 + 5 * index]
+    for index, drive in enumerate(simulation.drives):
+        drive.direction, drive.velocity = values[21 + 2 * index: 23 + 2 * index]
+    gauss_next = values[-1]
+    simulation.rng.setstate((3, tuple(values[25:-1]), None if math.isnan(gauss_next) else gauss_next))
+
+
+class ReplayRecorder:
+    """
+    Class writes replay of match: seed of random number generator, inputs of users and keyframes with full state of
+    simulation. Keyframes are written every KEYFRAME_INTERVAL ticks, so any moment of match can be reached by
+    simulating not more than KEYFRAME_INTERVAL ticks.
+    """
+
+    KEYFRAME_INTERVAL: int = 1200
+
+    def __init__(self, path: str, simulation: Simulation, seed: int, tick_rate: int,
+                 keyframe_interval: int = KEYFRAME_INTERVAL) -> None:
+        """
+        :param path: path to replay file;
+        :param simulation: simulation with started match, its random number generator was seeded with given seed;
+        :param seed: seed of random number generator;
+        :param tick_rate: number of ticks per second;
+        :param keyframe_interval: number of ticks between keyframes.
+        """
+
+        self._file: BinaryIO = open(path, "wb")
+        self._index: List[Tuple[int, int]] = []
+        self._keyframe_interval: int = keyframe_interval
+        self._paddles_y: List[float] = [paddle.y for paddle in simulation.paddles]
+        self._simulation: Simulation = simulation
+        ai_flags = 0
+        ai_parameters = []
+        for bit, controller in enumerate(simulation.controllers):
+            if controller:
+                ai_flags |= 1 << bit
+                ai_parameters.extend((controller.velocity, controller.min_velocity, controller.error_magnitude))
+            else:
+                ai_parameters.extend((AIController.VELOCITY, AIController.MIN_VELOCITY, AIController.ERROR))
+        self._file.write(HEADER.pack(MAGIC, seed, tick_rate, keyframe_interval, simulation.field.width,
+                                     simulation.field.height, simulation.score.max_score,
+                                     simulation.increment_coefficient, ai_flags, *ai_parameters))
+        self._write_keyframe()
+        simulation.tick_listeners.append(self.handle_tick)
+
+    def _write_keyframe(self) -> None:
+        self._index.append((self._simulation.tick, self._file.tell()))
+        self._file.write(_pack_keyframe(self._simulation))
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        if self.handle_tick in self._simulation.tick_listeners:
+            self._simulation.tick_listeners.remove(self.handle_tick)
+        self._file.write(END.pack(END_RECORD, self._simulation.tick))
+        index_offset = self._file.tell()
+        self._file.write(INDEX_SIZE.pack(len(self._index)))
+        for tick, offset in self._index:
+            self._file.write(INDEX_ITEM.pack(tick, offset))
+        self._file.write(FOOTER.pack(index_offset, MAGIC))
+        self._file.close()
+
+    def handle_tick(self, simulation: Simulation) -> None:
+        """
+        :param simulation: simulation that has just made a tick.
+        """
+
+        if simulation.tick % self._keyframe_interval == 0:
+            self._write_keyframe()
+
+    def record_drive(self, side: int) -> None:
+        """
+        Method records new direction of keyboard drive of racket. It should be called after direction is changed.
+        :param side: index of racket, 0 for left and 1 for right.
+        """
+
+        self._file.write(DRIVE.pack(DRIVE_RECORD, self._simulation.tick, side,
+                                    self._simulation.drives[side].direction))
+
+    def record_inputs(self) -> None:
+        """
+        Method records positions of rackets of users that were changed since the previous call. It should be called
+        after rackets are moved by keyboard or touch.
+        """
+
+        for side, (paddle, controller) in enumerate(zip(self._simulation.paddles, self._simulation.controllers)):
+            if not controller and paddle.y != self._paddles_y[side]:
+                self._paddles_y[side] = paddle.y
+                self._file.write(INPUT.pack(INPUT_RECORD, self._simulation.tick, side, paddle.y))
+
+
+class ReplayPlayer:
+    """
+    Class simulates match from replay file without window.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        :param path: path to replay file.
+        """
+
+        with open(path, "rb") as file:
+            self._data: bytes = file.read()
+        (magic, self.seed, self.tick_rate, self.keyframe_interval, width, height, max_score, increment_coefficient,
+         ai_flags, *ai_parameters) = HEADER.unpack_from(self._data, 0)
+        if magic != MAGIC:
+            raise ValueError(f"File '{path}' is not a replay")
+        self._drives: Dict[int, List[Tuple[int, int]]] = {}
+        self._inputs: Dict[int, List[Tuple[int, float]]] = {}
+        self._keyframes: List[Tuple[int, int]] = []
+        self.total_ticks: int = 0
+        self._read_records()
+
+        controllers = [AIController(*ai_parameters[3 * bit: 3 * bit + 3]) if ai_flags & (1 << bit) else None
+                       for bit in range(2)]
+        self.simulation: Simulation = Simulation(FieldState(width, height), left_controller=controllers[0],
+                                                 right_controller=controllers[1], rng=random.Random(self.seed),
+                                                 increment_coefficient=increment_coefficient, max_score=max_score)
+        self.simulation.start_match()
+        self.dt: float = 1 / self.tick_rate
+        self.seek(0)
+
+    def _read_records(self) -> None:
+        """
+        Method reads inputs and keyframe index. If replay was not closed properly, keyframes are found by scanning.
+        """
+
+        data = self._data
+        index_offset, magic = FOOTER.unpack_from(data, len(data) - FOOTER.size) if len(data) >= FOOTER.size else \
+            (0, b"")
+        offset = HEADER.size
+        while offset < len(data):
+            record_type = data[offset]
+            if record_type == INPUT_RECORD and offset + INPUT.size <= len(data):
+                _, tick, side, y = INPUT.unpack_from(data, offset)
+                self._inputs.setdefault(tick, []).append((side, y))
+                self.total_ticks = max(self.total_ticks, tick)
+                offset += INPUT.size
+            elif record_type == DRIVE_RECORD and offset + DRIVE.size <= len(data):
+                _, tick, side, direction = DRIVE.unpack_from(data, offset)
+                self._drives.setdefault(tick, []).append((side, direction))
+                self.total_ticks = max(self.total_ticks, tick)
+                offset += DRIVE.size
+            elif record_type == KEYFRAME_RECORD and offset + KEYFRAME.size <= len(data):
+                if magic != MAGIC:
+                    self._keyframes.append((KEYFRAME.unpack_from(data, offset)[1], offset))
+                self.total_ticks = max(self.total_ticks, KEYFRAME.unpack_from(data, offset)[1])
+                offset += KEYFRAME.size
+            elif record_type == END_RECORD and offset + END.size <= len(data):
+                self.total_ticks = END.unpack_from(data, offset)[1]
+                break
+            else:
+                break
+        if magic == MAGIC:
+            count = INDEX_SIZE.unpack_from(data, index_offset)[0]
+            self._keyframes = [INDEX_ITEM.unpack_from(data, index_offset + INDEX_SIZE.size + i * INDEX_ITEM.size)
+                               for i in range(count)]
+
+    @property
+    def tick(self) -> int:
+        return self.simulation.tick
+
+    def run(self, ticks: Optional[int] = None) -> Tuple[int, float]:
+        """
+        Method simulates replay as fast as possible.
+        :param ticks: number of ticks to simulate, by default replay is simulated to the end.
+        :return: number of simulated ticks and time spent in seconds.
+        """
+
+        last_tick = self.total_ticks if ticks is None else min(self.tick + ticks, self.total_ticks)
+        start = time.perf_counter()
+        played = 0
+        while self.tick < last_tick:
+            if self.step() & Event.GAME_OVER:
+                played += 1
+                break
+            played += 1
+        return played, time.perf_counter() - start
+
+    def seek(self, tick: int) -> None:
+        """
+        Method restores state of simulation at given tick from the nearest keyframe.
+        :param tick: tick to go to.
+        """
+
+        tick = max(0, min(tick, self.total_ticks))
+        keyframe_number = min(tick // self.keyframe_interval, len(self._keyframes) - 1)
+        keyframe_tick, offset = self._keyframes[keyframe_number]
+        if keyframe_tick > tick:
+            keyframe_tick, offset = self._keyframes[0]
+        _unpack_keyframe(self._data, offset, self.simulation)
+        while self.tick < tick:
+            self.step()
+
+    def step(self) -> Event:
+        """
+        Method makes one tick in the same order as the game does: new round is started after goal, then inputs of
+        users and directions of keyboard drives are applied and then simulation is advanced.
+        :return: events of tick.
+        """
+
+        simulation = self.simulation
+        if simulation.round_over:
+            if simulation.score.is_game_over():
+                return Event.GAME_OVER
+            simulation.start_round()
+        for side, y in self._inputs.get(simulation.tick, ()):
+            simulation.paddles[side].y = y
+        for side, direction in self._drives.get(simulation.tick, ()):
+            simulation.drives[side].set_direction(direction)
+        return simulation.step(self.dt)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Simulate replay of match without window")
+    parser.add_argument("path", help="path to replay file")
+    parser.add_argument("--seek", type=int, default=None, help="tick to seek before simulation")
+    args = parser.parse_args()
+
+    player = ReplayPlayer(args.path)
+    if args.seek is not None:
+        start = time.perf_counter()
+        player.seek(args.seek)
+        print(f"Seek to tick {player.tick} took {1000 * (time.perf_counter() - start):.2f} ms")
+    ticks, elapsed = player.run()
+    score = player.simulation.score
+    print(f"Simulated {ticks} ticks ({ticks / player.tick_rate:.1f} s of game) in {elapsed:.3f} s, "
+          f"{ticks / elapsed if elapsed else float('inf'):.0f} ticks per second. Score {score.left}:{score.right}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+from typing import Callable, Dict, List, Optional
+from kivy.clock import Clock, ClockEvent
+from kivy.core.window import Window
+from kivy.uix.widget import Widget
+
+
+class Screen:
+    """
+    Mixin for screens of application. Window bindings and clock events of screen are registered through it, so that
+    they exist only while screen is shown and hidden screen costs nothing.
+    """
+
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self._clock_events: List[ClockEvent] = []
+        self._paused_events: List[ClockEvent] = []
+        self._window_bindings: Dict[str, Callable] = {}
+        self.is_active: bool = False
+
+    def _reschedule_paused_events(self, dt: float) -> None:
+        for event in self._paused_events:
+            # Event measures its first interval from the current frame, not from the moment of pause
+            event()
+            if event not in self._clock_events:
+                self._clock_events.append(event)
+        self._paused_events.clear()
+
+    def activate(self) -> None:
+        """
+        Method is called by screen manager after screen is added to the render tree.
+        """
+
+        if self.is_active:
+            return
+        self.is_active = True
+        if self._window_bindings:
+            Window.bind(**self._window_bindings)
+        self.on_activate()
+
+    def bind_window(self, **kwargs) -> None:
+        """
+        Method binds handlers to events and properties of window while screen is active.
+        :param kwargs: names of events or properties and their handlers.
+        """
+
+        self._window_bindings.update(kwargs)
+        if self.is_active:
+            Window.bind(**kwargs)
+
+    def on_activate(self) -> None:
+        pass
+
+    def on_suspend(self) -> None:
+        pass
+
+    def pause(self) -> None:
+        """
+        Method stops clock events of screen while application is in background.
+        """
+
+        for event in self._clock_events:
+            if event.is_triggered:
+                event.cancel()
+                self._paused_events.append(event)
+
+    def resume(self) -> None:
+        """
+        Method restarts clock events stopped by pause.
+        """
+
+        if self._paused_events:
+            Clock.schedule_once(self._reschedule_paused_events, 0)
+
+    def schedule_interval(self, callback: Callable, interval: float) -> ClockEvent:
+        """
+        Method schedules callback that is cancelled when screen is suspended.
+        :param callback: callback;
+        :param interval: interval between calls in seconds, 0 to call on every frame.
+        :return: clock event.
+        """
+
+        self._clock_events = [event for event in self._clock_events if event.is_triggered]
+        event = Clock.schedule_interval(callback, interval)
+        self._clock_events.append(event)
+        return event
+
+    def suspend(self) -> None:
+        """
+        Method is called by screen manager before screen is removed from the render tree. Window bindings are
+        detached and clock events are cancelled.
+        """
+
+        if not self.is_active:
+            return
+        self.is_active = False
+        if self._window_bindings:
+            Window.unbind(**self._window_bindings)
+        for event in self._clock_events:
+            event.cancel()
+        self._clock_events.clear()
+        self._paused_events.clear()
+        self.on_suspend()
+
+
+class ScreenManager:
+    """
+    Class shows one screen at a time. Hidden screens are suspended and removed from the render tree.
+    """
+
+    def __init__(self, root: Widget) -> None:
+        """
+        :param root: widget to show screens in.
+        """
+
+        self._root: Widget = root
+        self.current: Optional[Screen] = None
+
+    def pause(self) -> None:
+        if self.current is not None:
+            self.current.pause()
+
+    def resume(self) -> None:
+        if self.current is not None:
+            self.current.resume()
+
+    def show(self, screen: Screen) -> None:
+        """
+        :param screen: screen to show.
+        """
+
+        if screen is self.current:
+            return
+        if self.current is not None:
+            self.current.suspend()
+            self._root.remove_widget(self.current)
+        self.current = screen
+        self._root.add_widget(screen)
+        screen.activate()
@@ -0,0 +1,278 @@
+import argparse
+import asyncio
+import logging
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+from pong.network import create_socket, LossyChannel, NetworkHost, Phase
+from pong.profiler import calculate_statistics, RollingHistogram
+from pong.simulation import AIController, Event, FieldState, Simulation
+
+
+HEIGHT: float = 800
+WIDTH: float = 1000
+
+
+class Match:
+    """
+    Class of match hosted by server. Every match has its own tick scheduler: ticks are planned at absolute moments, so
+    a late tick does not shift the following ones. Left racket is controlled by AI, right racket is controlled by AI
+    or by network player.
+    """
+
+    # Error of AI players of match without network player. With default error two AI players hardly ever miss the ball
+    AI_ERROR: float = 0.3
+    # If match is behind schedule by more than this number of ticks, missed ticks are skipped
+    MAX_LAG_TICKS: int = 8
+    # Pause between rounds and time to show result of networked match in seconds
+    ROUND_DELAY: float = 1
+    RESULT_DELAY: float = 5
+
+    def __init__(self, match_id: int, seed: int, tick_rate: int, port: Optional[int] = None) -> None:
+        """
+        :param match_id: number of match;
+        :param seed: seed of random number generator of match;
+        :param tick_rate: number of ticks per second;
+        :param port: if given, right racket is controlled by network player connected to this port.
+        """
+
+        self._delay_ticks: int = 0
+        self.durations: RollingHistogram = RollingHistogram()
+        self.games: int = 0
+        self.late_ticks: int = 0
+        self.latencies: RollingHistogram = RollingHistogram()
+        self.match_id: int = match_id
+        self.network: Optional[NetworkHost] = None
+        self.skipped_ticks: int = 0
+        self.tick_rate: int = tick_rate
+        self.ticks: int = 0
+        field = FieldState(WIDTH, HEIGHT)
+        if port is None:
+            # AI players make errors also on match point, otherwise match of two AI players would never end
+            left_controller = AIController(error_magnitude=Match.AI_ERROR, error_scale=1, match_point_error=True)
+            right_controller = AIController(error_magnitude=Match.AI_ERROR, error_scale=1, match_point_error=True)
+        else:
+            left_controller, right_controller = AIController(), None
+        self.simulation: Simulation = Simulation(field, left_controller=left_controller,
+                                                 right_controller=right_controller, rng=random.Random(seed))
+        self.simulation.start_match()
+        if port is not None:
+            self.network = NetworkHost(LossyChannel(create_socket(("0.0.0.0", port))), field, tick_rate)
+
+    def _get_phase(self) -> int:
+        score = self.simulation.score
+        if score.is_game_over():
+            return Phase.LEFT_WON if score.left > score.right else Phase.RIGHT_WON
+        return Phase.COUNTDOWN if self._delay_ticks else Phase.PLAYING
+
+    def _tick_network(self) -> bool:
+        """
+        :return: True if simulation can be advanced, False if match waits for network player.
+        """
+
+        network = self.network
+        network.poll()
+        if network.is_timed_out():
+            logging.info("Network player of match %d is lost", self.match_id)
+            network.disconnect()
+        if not network.client_address:
+            return False
+        if network.remote_paddle_y is not None:
+            paddle = self.simulation.paddles[1]
+            paddle.move_to(network.remote_paddle_y + paddle.height / 2, self.simulation.field.height)
+            network.remote_paddle_y = None
+        return True
+
+    def close(self) -> None:
+        if self.network:
+            self.network.close()
+
+    async def run(self, duration: float, offset: float = 0) -> None:
+        """
+        Method runs ticks of match until given time passes.
+        :param duration: time to run in seconds;
+        :param offset: delay of the first tick, so that ticks of different matches do not come at once.
+        """
+
+        loop = asyncio.get_event_loop()
+        period = 1 / self.tick_rate
+        deadline = loop.time() + offset
+        finish = deadline + duration
+        while deadline < finish:
+            delay = deadline - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            start = time.perf_counter()
+            latency = max(loop.time() - deadline, 0)
+            self.latencies.add(latency)
+            if latency > period:
+                self.late_ticks += 1
+            self.tick()
+            self.durations.add(time.perf_counter() - start)
+            deadline += period
+            lag = loop.time() - deadline
+            if lag > Match.MAX_LAG_TICKS * period:
+                skipped = int(lag / period)
+                self.skipped_ticks += skipped
+                deadline += skipped * period
+            elif delay <= 0:
+                # Other matches should get their ticks even if this one is late
+                await asyncio.sleep(0)
+
+    def tick(self) -> None:
+        simulation = self.simulation
+        if self.network and not self._tick_network():
+            return
+        self.ticks += 1
+        if self._delay_ticks:
+            self._delay_ticks -= 1
+            if self._delay_ticks == 0:
+                if simulation.score.is_game_over():
+                    self.games += 1
+                    simulation.start_match()
+                    self.network.disconnect()
+                else:
+                    simulation.start_round()
+        else:
+            if simulation.round_over:
+                if simulation.score.is_game_over():
+                    self.games += 1
+                    simulation.start_match()
+                else:
+                    simulation.start_round()
+            events = simulation.step(1 / self.tick_rate)
+            if self.network and events & (Event.LEFT_GOAL | Event.RIGHT_GOAL):
+                delay = Match.RESULT_DELAY if events & Event.GAME_OVER else Match.ROUND_DELAY
+                self._delay_ticks = int(delay * self.tick_rate)
+        if self.network:
+            countdown = math.ceil(self._delay_ticks / self.tick_rate) if self._delay_ticks else 0
+            self.network.send_snapshot(simulation, self._get_phase(), countdown)
+
+
+async def _run_matches(matches: List[Match], duration: float) -> None:
+    period = 1 / matches[0].tick_rate if matches else 0
+    await asyncio.gather(*(match.run(duration, period * index / len(matches))
+                           for index, match in enumerate(matches)))
+
+
+def run_shard(shard: int, match_ids: List[int], tick_rate: int, duration: float, seed: int,
+              ports: Dict[int, int]) -> Dict[str, Any]:
+    """
+    Function runs matches of one process in asyncio event loop.
+    :param shard: number of shard;
+    :param match_ids: numbers of matches of shard;
+    :param tick_rate: number of ticks per second;
+    :param duration: time to run in seconds;
+    :param seed: seed of server, seeds of matches are derived from it;
+    :param ports: ports of networked matches by their numbers.
+    :return: report with tick metrics of shard and its matches.
+    """
+
+    matches = [Match(match_id, seed + match_id, tick_rate, ports.get(match_id)) for match_id in match_ids]
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    cpu_start = time.process_time()
+    start = time.perf_counter()
+    try:
+        loop.run_until_complete(_run_matches(matches, duration))
+    finally:
+        loop.close()
+        for match in matches:
+            match.close()
+    elapsed = time.perf_counter() - start
+    return {"shard": shard,
+            "cpu_load": (time.process_time() - cpu_start) / elapsed,
+            "elapsed": elapsed,
+            "matches": [{"match": match.match_id,
+                         "ticks": match.ticks,
+                         "games": match.games,
+                         "late_ticks": match.late_ticks,
+                         "skipped_ticks": match.skipped_ticks,
+                         "latency": match.latencies.get_statistics(),
+                         "duration": match.durations.get_statistics()} for match in matches],
+            "latencies": [latency for match in matches for latency in match.latencies.get_samples()],
+            "durations": [duration for match in matches for duration in match.durations.get_samples()]}
+
+
+def estimate_processes(matches: int, tick_rate: int, max_load: float = 0.5) -> int:
+    """
+    Function measures cost of tick and finds number of processes so that no core is loaded more than given fraction.
+    :param matches: number of matches;
+    :param tick_rate: number of ticks per second;
+    :param max_load: maximum fraction of core time to spend on ticks and their scheduling.
+    :return: number of processes, not more than number of cores.
+    """
+
+    # Cost of tick is measured together with scheduling of ticks in event loop
+    samples = [Match(match_id, match_id, tick_rate) for match_id in range(50)]
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    start = time.process_time()
+    try:
+        loop.run_until_complete(_run_matches(samples, 0.5))
+    finally:
+        loop.close()
+    tick_cost = (time.process_time() - start) / max(sum(match.ticks for match in samples), 1)
+    required = math.ceil(matches * tick_rate * tick_cost / max_load)
+    return max(1, min(required, os.cpu_count() or 1))
+
+
+def print_report(reports: List[Dict[str, Any]], tick_rate: int) -> None:
+    """
+    :param reports: reports of shards;
+    :param tick_rate: number of ticks per second.
+    """
+
+    matches = [match for report in reports for match in report["matches"]]
+    ticks = sum(match["ticks"] for match in matches)
+    elapsed = max(report["elapsed"] for report in reports)
+    late = sum(match["late_ticks"] for match in matches)
+    skipped = sum(match["skipped_ticks"] for match in matches)
+    games = sum(match["games"] for match in matches)
+    for report in reports:
+        print(f"Shard {report['shard']}: {len(report['matches'])} matches, CPU load {100 * report['cpu_load']:.0f}%")
+    print(f"Matches: {len(matches)}, ticks: {ticks} ({ticks / elapsed:.0f} per second, "
+          f"target {len(matches) * tick_rate}), late ticks: {late} ({100 * late / max(ticks, 1):.2f}%), "
+          f"skipped ticks: {skipped}, finished games: {games}")
+    for name, key in (("latency", "latencies"), ("duration", "durations")):
+        statistics = calculate_statistics([sample for report in reports for sample in report[key]])
+        print(f"Tick {name}: p50 {statistics['p50']:.3f} p95 {statistics['p95']:.3f} "
+              f"p99 {statistics['p99']:.3f} max {statistics['max']:.3f} ms")
+    worst = sorted(matches, key=lambda match: match["latency"]["p99"], reverse=True)[:5]
+    print("Matches with the highest p99 tick latency: " +
+          ", ".join(f"{match['match']} ({match['latency']['p99']:.3f} ms)" for match in worst))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run many matches without window")
+    parser.add_argument("--matches", type=int, default=500, help="number of concurrent matches")
+    parser.add_argument("--tick-rate", type=int, default=60, help="number of ticks per second")
+    parser.add_argument("--duration", type=float, default=10, help="time to run in seconds")
+    parser.add_argument("--processes", type=int, default=None,
+                        help="number of processes, by default it is chosen from measured cost of tick")
+    parser.add_argument("--network-matches", type=int, default=0,
+                        help="number of matches where right racket is controlled by network player")
+    parser.add_argument("--port", type=int, default=7777, help="port of the first networked match")
+    parser.add_argument("--seed", type=int, default=0, help="seed of server")
+    args = parser.parse_args()
+    logging.basicConfig(format="[%(asctime)s %(levelname)s] %(message)s", level=logging.INFO)
+
+    processes = args.processes or estimate_processes(args.matches, args.tick_rate)
+    shards = [list(range(shard, args.matches, processes)) for shard in range(processes)]
+    ports = {match_id: args.port + match_id for match_id in range(min(args.network_matches, args.matches))}
+    logging.info("Run %d matches in %d processes", args.matches, processes)
+    if processes == 1:
+        reports = [run_shard(0, shards[0], args.tick_rate, args.duration, args.seed, ports)]
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            futures = [executor.submit(run_shard, shard, match_ids, args.tick_rate, args.duration, args.seed, ports)
+                       for shard, match_ids in enumerate(shards)]
+            reports = [future.result() for future in futures]
+    print_report(reports, args.tick_rate)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,686 @@
+import math
+import random
+import time
+from enum import auto, Enum, IntFlag
+from typing import Callable, List, Optional, Tuple
+from pong.profiler import FrameProfiler
+
+
+BALL_SIZE: float = 50
+# Maximum number of collisions of ball that are resolved during one step
+MAX_COLLISIONS: int = 16
+INCREMENT_COEFFICIENT: float = 1.08
+# AI players with small errors may return ball forever when it comes to rackets far from the top border, so matches
+# between AI players end longer rally, the point goes to the player who hit the ball last
+MAX_RALLY: int = 20
+MAX_SCORE: int = 5
+PADDLE_SIZE: Tuple[float, float] = (25, 200)
+SERVE_ANGLES: List[int] = [*list(range(10, 81)), *list(range(-80, -9))]
+
+
+class Side(Enum):
+    LEFT = auto()
+    RIGHT = auto()
+
+
+class Event(IntFlag):
+    """
+    Class with events that can happen during one step of simulation.
+    """
+
+    NOTHING = 0
+    WALL_BOUNCE = auto()
+    LEFT_HIT = auto()
+    RIGHT_HIT = auto()
+    # Ball has crossed the left border, right player gets a point
+    LEFT_GOAL = auto()
+    # Ball has crossed the right border, left player gets a point
+    RIGHT_GOAL = auto()
+    GAME_OVER = auto()
+
+
+class FieldState:
+    """
+    Class with size of game field. Field starts at point (0, 0).
+    """
+
+    __slots__ = ("height", "width")
+
+    def __init__(self, width: float = 0, height: float = 0) -> None:
+        """
+        :param width: width of field;
+        :param height: height of field.
+        """
+
+        self.height: float = height
+        self.width: float = width
+
+
+class BallState:
+    """
+    Class with state of ball. Position is the position of bottom left corner as in kivy widgets.
+    """
+
+    __slots__ = ("init_velocity", "max_velocity", "size", "velocity_x", "velocity_y", "x", "y")
+
+    def __init__(self, size: float = BALL_SIZE) -> None:
+        """
+        :param size: diameter of ball.
+        """
+
+        self.init_velocity: float = 0
+        self.max_velocity: float = 0
+        self.size: float = size
+        self.velocity_x: float = 0
+        self.velocity_y: float = 0
+        self.x: float = 0
+        self.y: float = 0
+
+    @property
+    def center_x(self) -> float:
+        return self.x + self.size / 2
+
+    @center_x.setter
+    def center_x(self, value: float) -> None:
+        self.x = value - self.size / 2
+
+    @property
+    def center_y(self) -> float:
+        return self.y + self.size / 2
+
+    @center_y.setter
+    def center_y(self, value: float) -> None:
+        self.y = value - self.size / 2
+
+    @property
+    def right(self) -> float:
+        return self.x + self.size
+
+    @property
+    def top(self) -> float:
+        return self.y + self.size
+
+    @property
+    def velocity_module(self) -> float:
+        """
+        :return: ball velocity module.
+        """
+
+        return math.hypot(self.velocity_x, self.velocity_y)
+
+    def check_velocity_increasing(self, new_velocity: float) -> bool:
+        """
+        :param new_velocity: possible new ball velocity.
+        :return: True if ball velocity can be changed to given.
+        """
+
+        return new_velocity < self.max_velocity
+
+    def move(self, dt: float) -> None:
+        """
+        :param dt: time elapsed since the previous moment.
+        """
+
+        self.x += self.velocity_x * dt
+        self.y += self.velocity_y * dt
+
+
+class PaddleState:
+    """
+    Class with state of player's racket.
+    """
+
+    __slots__ = ("height", "side", "width", "x", "y")
+
+    def __init__(self, side: Side, size: Tuple[float, float] = PADDLE_SIZE) -> None:
+        """
+        :param side: side of player;
+        :param size: width and height of racket.
+        """
+
+        self.height: float = size[1]
+        self.side: Side = side
+        self.width: float = size[0]
+        self.x: float = 0
+        self.y: float = 0
+
+    @property
+    def center_y(self) -> float:
+        return self.y + self.height / 2
+
+    @center_y.setter
+    def center_y(self, value: float) -> None:
+        self.y = value - self.height / 2
+
+    @property
+    def right(self) -> float:
+        return self.x + self.width
+
+    @property
+    def top(self) -> float:
+        return self.y + self.height
+
+    def collide_ball(self, ball: BallState) -> bool:
+        """
+        :param ball: ball.
+        :return: True if racket and ball overlap (the same check as in Widget.collide_widget).
+        """
+
+        return not (self.right < ball.x or self.x > ball.right or self.top < ball.y or self.y > ball.top)
+
+    def hit_ball(self, ball: BallState, increment_coefficient: float = INCREMENT_COEFFICIENT) -> bool:
+        """
+        Method to hit the ball with a racket.
+        :param ball: ball;
+        :param increment_coefficient: coefficient by which ball velocity is increased after hit.
+        :return: True if ball was hit.
+        """
+
+        if not self.collide_ball(ball):
+            return False
+        self.reflect_ball(ball, increment_coefficient)
+        return True
+
+    def reflect_ball(self, ball: BallState, increment_coefficient: float = INCREMENT_COEFFICIENT) -> None:
+        """
+        Method changes velocity of ball touching the racket and places ball in front of racket.
+        :param ball: ball;
+        :param increment_coefficient: coefficient by which ball velocity is increased after hit.
+        """
+
+        new_velocity = increment_coefficient * ball.velocity_module
+        coefficient = increment_coefficient if ball.check_velocity_increasing(new_velocity) else 1
+        ball.velocity_x *= -coefficient
+        ball.velocity_y *= coefficient
+        if self.side == Side.LEFT:
+            ball.x = self.right
+        else:
+            ball.x = self.x - ball.size
+
+    def time_of_impact(self, ball: BallState, dt: float) -> Optional[float]:
+        """
+        Method finds moment when moving ball touches the racket for the first time. Racket is considered still,
+        only ball moving towards the racket can hit it.
+        :param ball: ball;
+        :param dt: duration of movement.
+        :return: time from 0 to dt when ball touches racket or None if there is no touch.
+        """
+
+        if (self.side == Side.LEFT and ball.velocity_x >= 0) or (self.side == Side.RIGHT and ball.velocity_x <= 0):
+            return None
+        # Ball is considered as a point (its bottom left corner) moving in racket expanded by size of ball
+        t_enter = 0
+        t_exit = dt
+        for position, velocity, low, high in ((ball.x, ball.velocity_x, self.x - ball.size, self.x + self.width),
+                                              (ball.y, ball.velocity_y, self.y - ball.size, self.y + self.height)):
+            if velocity == 0:
+                if position < low or position > high:
+                    return None
+                continue
+            t_1 = (low - position) / velocity
+            t_2 = (high - position) / velocity
+            if t_1 > t_2:
+                t_1, t_2 = t_2, t_1
+            t_enter = max(t_enter, t_1)
+            t_exit = min(t_exit, t_2)
+            if t_enter > t_exit:
+                return None
+        return t_enter
+
+    def move_to(self, new_y: float, field_height: float) -> None:
+        """
+        Method moves center of racket to given vertical position without leaving the field.
+        :param new_y: new vertical position for center of racket;
+        :param field_height: height of field.
+        """
+
+        half_height = self.height / 2
+        if half_height < new_y < field_height - half_height:
+            self.y = new_y - half_height
+        elif new_y <= half_height:
+            self.y = 0
+        else:
+            self.y = field_height - self.height
+
+
+class ScoreState:
+    """
+    Class with score of match.
+    """
+
+    __slots__ = ("left", "max_score", "right")
+
+    def __init__(self, max_score: int = MAX_SCORE) -> None:
+        """
+        :param max_score: score to win the match.
+        """
+
+        self.left: int = 0
+        self.max_score: int = max_score
+        self.right: int = 0
+
+    def is_game_over(self) -> bool:
+        return self.left >= self.max_score or self.right >= self.max_score
+
+    def reset(self) -> None:
+        self.left = 0
+        self.right = 0
+
+
+class PaddleDrive:
+    """
+    Class moves racket of user while key is held. Velocity grows with acceleration up to maximum and is integrated in
+    ticks of simulation, so movement does not depend on frame rate and key repeat rate of operating system.
+    """
+
+    ACCELERATION: float = 6000
+    INITIAL_VELOCITY: float = 400
+    MAX_VELOCITY: float = 1200
+    __slots__ = ("acceleration", "direction", "initial_velocity", "latency", "max_velocity", "pressed_at",
+                 "velocity")
+
+    def __init__(self, acceleration: float = ACCELERATION, initial_velocity: float = INITIAL_VELOCITY,
+                 max_velocity: float = MAX_VELOCITY) -> None:
+        """
+        :param acceleration: acceleration of racket while key is held;
+        :param initial_velocity: velocity of racket in the first tick after key is pressed;
+        :param max_velocity: maximum velocity of racket.
+        """
+
+        self.acceleration: float = acceleration
+        # Direction of movement: 1 is up, -1 is down, 0 if racket stands
+        self.direction: int = 0
+        self.initial_velocity: float = initial_velocity
+        # Time from key press to the first movement of racket in seconds, None if it was not measured yet
+        self.latency: Optional[float] = None
+        self.max_velocity: float = max_velocity
+        # Moment of key press by time.perf_counter, None if press was already handled
+        self.pressed_at: Optional[float] = None
+        self.velocity: float = 0
+
+    def move(self, dt: float, paddle: PaddleState, field: FieldState) -> None:
+        """
+        :param dt: time elapsed since the previous moment;
+        :param paddle: racket to move;
+        :param field: game field.
+        """
+
+        if self.pressed_at is not None:
+            self.latency = time.perf_counter() - self.pressed_at
+            self.pressed_at = None
+        self.velocity = min(self.velocity + self.acceleration * dt, self.max_velocity) if self.velocity else \
+            self.initial_velocity
+        paddle.move_to(paddle.center_y + self.direction * self.velocity * dt, field.height)
+
+    def set_direction(self, direction: int, timestamp: Optional[float] = None) -> None:
+        """
+        :param direction: new direction of movement: 1 is up, -1 is down, 0 to stop;
+        :param timestamp: moment of key event by time.perf_counter.
+        """
+
+        if direction == self.direction:
+            return
+        self.direction = direction
+        self.velocity = 0
+        self.pressed_at = timestamp if direction else None
+
+
+class AIController:
+    """
+    Class moves racket of computer player according to ball characteristics. Random error is chosen at the start of
+    round and again every time opponent hits the ball, so two AI players cannot repeat the same rally forever.
+    """
+
+    ERROR: float = 0.1
+    # Random error is switched off in the game, AI players make no mistakes
+    ERROR_SCALE: float = 0.0
+    MIN_VELOCITY: float = 1
+    VELOCITY: float = 4
+    __slots__ = ("error", "error_magnitude", "error_scale", "match_point_error", "min_velocity", "target_y",
+                 "time_left", "valid", "velocity")
+
+    def __init__(self, velocity: float = VELOCITY, min_velocity: float = MIN_VELOCITY,
+                 error_magnitude: float = ERROR, error_scale: float = ERROR_SCALE,
+                 match_point_error: bool = False) -> None:
+        """
+        :param velocity: initial velocity of racket;
+        :param min_velocity: minimum velocity of racket;
+        :param error_magnitude: maximum relative error of ball position estimation;
+        :param error_scale: multiplier of random error, 0 switches error off;
+        :param match_point_error: if True, error is made also when opponent needs one point to win. Two AI players
+        that play perfectly on match point never finish match.
+        """
+
+        self.error: float = 0
+        self.error_magnitude: float = error_magnitude
+        self.error_scale: float = error_scale
+        self.match_point_error: bool = match_point_error
+        self.min_velocity: float = min_velocity
+        # Predicted vertical position of ball center when ball reaches racket and time left until that moment
+        self.target_y: float = 0
+        self.time_left: float = 0
+        self.valid: bool = False
+        self.velocity: float = velocity
+
+    def calculate_ball_target_position(self, ball: BallState, paddle: PaddleState,
+                                       field: FieldState) -> Tuple[float, float]:
+        """
+        Method finds where ball comes to racket. Reflections from horizontal borders are found exactly by unfolding
+        ball path, so any number of reflections is taken into account. If ball moves away from racket, it is assumed
+        that opponent returns ball with the same velocity.
+        :param ball: ball;
+        :param paddle: racket of computer player;
+        :param field: game field.
+        :return: vertical position of ball center and time.
+        """
+
+        scale = 1 + self.error
+        half_size = ball.size / 2
+        velocity_x = scale * ball.velocity_x
+        if velocity_x == 0:
+            return ball.center_y, 0
+
+        # Line that ball center reaches when ball touches the racket and the same line on the opposite side
+        line = paddle.x - half_size if paddle.side == Side.RIGHT else paddle.x + paddle.width + half_size
+        opposite_line = field.width - line
+        center_x = scale * ball.center_x
+        if (line - center_x) * velocity_x >= 0:
+            distance = abs(line - center_x)
+        else:
+            distance = abs(opposite_line - center_x) + abs(line - opposite_line)
+        time = distance / abs(velocity_x)
+
+        length = field.height - ball.size
+        if length <= 0:
+            return ball.center_y, time
+        y = (scale * ball.center_y - half_size + scale * ball.velocity_y * time) % (2 * length)
+        if y > length:
+            y = 2 * length - y
+        return y + half_size, time
+
+    def change_error(self, opponent_score: int, max_score: int, rng: random.Random) -> None:
+        """
+        :param opponent_score: opponent's score;
+        :param max_score: maximum score;
+        :param rng: random number generator.
+        """
+
+        self.error = self.error_magnitude if self.match_point_error or max_score != opponent_score + 1 else 0
+        self.error *= self.error_scale * rng.random()
+
+    def change_position(self, dt: float, ball: BallState, paddle: PaddleState, field: FieldState) -> None:
+        """
+        Method changes position of racket according to ball characteristics. Position of ball at racket is predicted
+        only when prediction is invalidated, otherwise the saved prediction is used.
+        :param dt: time elapsed since the previous moment;
+        :param ball: ball;
+        :param paddle: racket of computer player;
+        :param field: game field.
+        """
+
+        if self.valid:
+            self.time_left -= dt
+        else:
+            self.target_y, self.time_left = self.calculate_ball_target_position(ball, paddle, field)
+            self.valid = True
+
+        center_y = paddle.center_y
+        if self.time_left > 0:
+            self.velocity = max(abs(self.target_y - center_y) / self.time_left, self.min_velocity)
+
+        if self.target_y > center_y + paddle.height / 2:
+            paddle.move_to(center_y + self.velocity * dt, field.height)
+        elif self.target_y < center_y - paddle.height / 2:
+            paddle.move_to(center_y - self.velocity * dt, field.height)
+
+    def invalidate(self) -> None:
+        """
+        Method forgets predicted position of ball. It should be called when velocity of ball changes not because of
+        reflection from horizontal borders.
+        """
+
+        self.valid = False
+
+
+class Simulation:
+    """
+    Class with rules of the game. It does not depend on kivy and can be stepped without window.
+    """
+
+    __slots__ = ("ball", "controllers", "drives", "events", "field", "increment_coefficient", "max_rally", "paddles",
+                 "profiler", "rally", "rng", "round_over", "score", "tick", "tick_listeners")
+
+    def __init__(self, field: FieldState, ball: Optional[BallState] = None, left: Optional[PaddleState] = None,
+                 right: Optional[PaddleState] = None, left_controller: Optional[AIController] = None,
+                 right_controller: Optional[AIController] = None, rng: Optional[random.Random] = None,
+                 increment_coefficient: float = INCREMENT_COEFFICIENT, max_score: int = MAX_SCORE,
+                 max_rally: Optional[int] = None) -> None:
+        """
+        :param field: game field;
+        :param ball: ball;
+        :param left: racket of left player;
+        :param right: racket of right player;
+        :param left_controller: AI controller for left racket, None if racket is controlled by user;
+        :param right_controller: AI controller for right racket, None if racket is controlled by user;
+        :param rng: random number generator;
+        :param increment_coefficient: coefficient by which ball velocity is increased after hit;
+        :param max_score: score to win the match;
+        :param max_rally: maximum number of hits in rally, the point of longer rally goes to the player who hit the
+        ball last. None if rally is not limited.
+        """
+
+        self.ball: BallState = ball or BallState()
+        self.controllers: Tuple[Optional[AIController], Optional[AIController]] = left_controller, right_controller
+        # Keyboard drives of rackets, they move only rackets that are not controlled by AI
+        self.drives: Tuple[PaddleDrive, PaddleDrive] = PaddleDrive(), PaddleDrive()
+        # Events of the last tick, so that tick listeners can see them
+        self.events: Event = Event.NOTHING
+        self.field: FieldState = field
+        self.increment_coefficient: float = increment_coefficient
+        self.max_rally: Optional[int] = max_rally
+        self.paddles: Tuple[PaddleState, PaddleState] = left or PaddleState(Side.LEFT), \
+            right or PaddleState(Side.RIGHT)
+        # Profiler to measure durations of phases of step, None if phases should not be measured
+        self.profiler: Optional[FrameProfiler] = None
+        # Number of ticks with hits of ball in current round
+        self.rally: int = 0
+        self.rng: random.Random = rng or random.Random()
+        self.round_over: bool = True
+        self.score: ScoreState = ScoreState(max_score)
+        # Number of ticks played since start of match
+        self.tick: int = 0
+        # Functions that are called after every tick, for example, to record replay
+        self.tick_listeners: List[Callable[[Simulation], None]] = []
+
+    def _move_ball(self, dt: float) -> Event:
+        """
+        Method moves ball with continuous collision detection. Ball is moved to the earliest collision with racket or
+        horizontal border of the field, collision is resolved and movement continues for the rest of time.
+        :param dt: time elapsed since the previous moment.
+        :return: events that happened during movement.
+        """
+
+        ball = self.ball
+        top = self.field.height - ball.size
+        events = Event.NOTHING
+        remaining = dt
+        for _ in range(MAX_COLLISIONS):
+            t_impact = remaining
+            obstacle = None
+            if ball.velocity_y < 0:
+                t_wall = max(-ball.y / ball.velocity_y, 0)
+            elif ball.velocity_y > 0:
+                t_wall = max((top - ball.y) / ball.velocity_y, 0)
+            else:
+                t_wall = None
+            if t_wall is not None and t_wall <= t_impact:
+                t_impact = t_wall
+                obstacle = Event.WALL_BOUNCE
+            for paddle, event in zip(self.paddles, (Event.LEFT_HIT, Event.RIGHT_HIT)):
+                t_paddle = paddle.time_of_impact(ball, t_impact)
+                if t_paddle is not None and (t_paddle < t_impact or obstacle is None):
+                    t_impact = t_paddle
+                    obstacle = event
+
+            ball.move(t_impact)
+            remaining -= t_impact
+            if obstacle is None:
+                break
+            events |= obstacle
+            if obstacle == Event.WALL_BOUNCE:
+                # Ball rebound from the horizontal borders of the field
+                ball.y = 0 if ball.velocity_y < 0 else top
+                ball.velocity_y *= -1
+            else:
+                self.paddles[0 if obstacle == Event.LEFT_HIT else 1].reflect_ball(ball, self.increment_coefficient)
+        return events
+
+    def _add_phase(self, phase: str, start: float) -> float:
+        """
+        :param phase: name of finished phase of step;
+        :param start: moment when phase started.
+        :return: moment when phase finished.
+        """
+
+        finish = self.profiler.clock()
+        self.profiler.add(phase, finish - start)
+        return finish
+
+    def _change_errors(self, events: Event) -> None:
+        """
+        Method chooses new random errors of AI players that have to return ball after hit of opponent.
+        :param events: events of movement of ball.
+        """
+
+        left_controller, right_controller = self.controllers
+        if left_controller and events & Event.RIGHT_HIT:
+            left_controller.change_error(self.score.right, self.score.max_score, self.rng)
+        if right_controller and events & Event.LEFT_HIT:
+            right_controller.change_error(self.score.left, self.score.max_score, self.rng)
+
+    def _invalidate_predictions(self) -> None:
+        for controller in self.controllers:
+            if controller:
+                controller.invalidate()
+
+    def generate_random_velocity(self) -> Tuple[float, float]:
+        """
+        :return: velocity vector with a randomly chosen direction.
+        """
+
+        angle = self.rng.choice(SERVE_ANGLES)
+        direction = 0 if self.rng.randint(0, 1) == 0 else 180
+        angle = math.radians(angle + direction)
+        return self.ball.init_velocity * math.cos(angle), self.ball.init_velocity * math.sin(angle)
+
+    def init_ball(self) -> None:
+        """
+        Method sets velocity limits of ball according to size of field.
+        """
+
+        self.ball.max_velocity = math.hypot(self.field.width, self.field.height)
+        self.ball.init_velocity = self.ball.max_velocity / 4
+
+    def start_match(self) -> None:
+        self.init_ball()
+        self.score.reset()
+        self.tick = 0
+        self.start_round()
+
+    def start_round(self) -> None:
+        ball = self.ball
+        field = self.field
+        ball.center_x = field.width / 2
+        ball.center_y = field.height / 2
+        ball.velocity_x, ball.velocity_y = self.generate_random_velocity()
+        left, right = self.paddles
+        left.x = 0
+        left.center_y = field.height / 2
+        right.x = field.width - right.width
+        right.center_y = field.height / 2
+        left_controller, right_controller = self.controllers
+        if left_controller:
+            left_controller.change_error(self.score.right, self.score.max_score, self.rng)
+        if right_controller:
+            right_controller.change_error(self.score.left, self.score.max_score, self.rng)
+        self._invalidate_predictions()
+        self.rally = 0
+        self.round_over = False
+
+    def step(self, dt: float) -> Event:
+        """
+        Method advances the game by given time.
+        :param dt: time elapsed since the previous moment.
+        :return: events that happened during step.
+        """
+
+        if self.round_over:
+            return Event.NOTHING
+
+        profiler = self.profiler
+        if profiler is not None:
+            start = profiler.clock()
+        ball = self.ball
+        field = self.field
+        for paddle, controller, drive in zip(self.paddles, self.controllers, self.drives):
+            if controller:
+                controller.change_position(dt, ball, paddle, field)
+            elif drive.direction:
+                drive.move(dt, paddle, field)
+        if profiler is not None:
+            start = self._add_phase("ai", start)
+
+        events = self._move_ball(dt)
+        if events & (Event.LEFT_HIT | Event.RIGHT_HIT):
+            self._change_errors(events)
+            self._invalidate_predictions()
+            self.rally += 1
+        if profiler is not None:
+            start = self._add_phase("ball", start)
+
+        if ball.x < 0:
+            self.score.right += 1
+            events |= Event.LEFT_GOAL
+        elif ball.x > field.width:
+            self.score.left += 1
+            events |= Event.RIGHT_GOAL
+        elif self.max_rally is not None and self.rally >= self.max_rally:
+            # Ball moves away from the player who hit it last
+            if ball.velocity_x > 0:
+                self.score.left += 1
+                events |= Event.RIGHT_GOAL
+            else:
+                self.score.right += 1
+                events |= Event.LEFT_GOAL
+        if events & (Event.LEFT_GOAL | Event.RIGHT_GOAL):
+            self.round_over = True
+            if self.score.is_game_over():
+                events |= Event.GAME_OVER
+        if profiler is not None:
+            self._add_phase("score", start)
+        self.events = events
+        self.tick += 1
+        for listener in self.tick_listeners:
+            listener(self)
+        return events
+
+
+def play_match(simulation: Simulation, dt: float, max_ticks: int = 10 ** 7) -> int:
+    """
+    Function plays the whole match without pauses between rounds.
+    :param simulation: simulation to play match in;
+    :param dt: duration of one tick;
+    :param max_ticks: maximum number of ticks to play.
+    :return: number of played ticks.
+    """
+
+    simulation.start_match()
+    ticks = 0
+    while ticks < max_ticks:
+        events = simulation.step(dt)
+        ticks += 1
+        if events & Event.GAME_OVER:
+            break
+        if simulation.round_over:
+            simulation.start_round()
+    return ticks
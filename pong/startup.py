@@ -0,0 +1,39 @@
+import json
+import logging
+import time
+from typing import List, Tuple
+
+
+# Moments are measured from import of this module, main script imports it before everything else
+_START: float = time.perf_counter()
+_phases: List[Tuple[str, float]] = []
+
+
+def get_phases() -> List[Tuple[str, float]]:
+    """
+    :return: names of finished phases of startup and moments of their finish in seconds.
+    """
+
+    return list(_phases)
+
+
+def mark(phase: str) -> None:
+    """
+    :param phase: name of phase of startup that has just finished.
+    """
+
+    _phases.append((phase, time.perf_counter() - _START))
+
+
+def report(path: str) -> None:
+    """
+    Method writes moments of startup phases to log and to JSON file.
+    :param path: path to file.
+    """
+
+    logging.info("Startup: %s", ", ".join(f"{phase} {1000 * moment:.0f} ms" for phase, moment in _phases))
+    try:
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({phase: 1000 * moment for phase, moment in _phases}, file, indent=4)
+    except OSError:
+        logging.exception("Failed to save startup times to '%s'", path)
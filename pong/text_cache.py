@@ -0,0 +1,107 @@
+import logging
+from typing import Dict, Iterable, Optional, Tuple
+from kivy.core.text import Label as CoreLabel
+from kivy.graphics import Color, Rectangle
+from kivy.graphics.texture import Texture
+from kivy.uix.widget import Widget
+
+
+class TextTextureCache:
+    """
+    Class rasterizes texts once and keeps their textures. Texts are rendered white and colored by Color instruction,
+    so changing color does not require new texture.
+    """
+
+    def __init__(self) -> None:
+        self._textures: Dict[Tuple[str, float], Texture] = {}
+
+    def get(self, text: str, font_size: float) -> Texture:
+        """
+        :param text: text;
+        :param font_size: size of font.
+        :return: texture with text.
+        """
+
+        key = text, font_size
+        texture = self._textures.get(key)
+        if texture is None:
+            label = CoreLabel(text=text, font_size=font_size)
+            label.refresh()
+            texture = self._textures[key] = label.texture
+        return texture
+
+    def preload(self, texts: Iterable[str], font_size: float) -> None:
+        """
+        :param texts: texts to rasterize;
+        :param font_size: size of font.
+        """
+
+        for text in texts:
+            self.get(text, font_size)
+        logging.debug("Text textures in cache: %d", len(self._textures))
+
+
+_text_cache: Optional[TextTextureCache] = None
+
+
+def get_text_cache() -> TextTextureCache:
+    """
+    :return: text texture cache of application.
+    """
+
+    global _text_cache
+    if _text_cache is None:
+        _text_cache = TextTextureCache()
+    return _text_cache
+
+
+class CachedLabel(Widget):
+    """
+    Class for label with text from small known set. Changing text swaps cached texture instead of rendering text, size
+    of widget follows size of texture and center of widget stays in place.
+    """
+
+    def __init__(self, font_size: float, text: str = "") -> None:
+        """
+        :param font_size: size of font;
+        :param text: initial text.
+        """
+
+        super().__init__()
+        self._text: str = ""
+        self.font_size: float = font_size
+        with self.canvas:
+            self._color: Color = Color(1, 1, 1, 1)
+            self._rectangle: Rectangle = Rectangle(pos=self.pos, size=(0, 0))
+        self.bind(pos=self._move_rectangle)
+        self.text = text
+
+    @property
+    def color(self) -> Tuple[float, float, float, float]:
+        return tuple(self._color.rgba)
+
+    @color.setter
+    def color(self, value: Tuple[float, float, float, float]) -> None:
+        self._color.rgba = value
+
+    @property
+    def text(self) -> str:
+        return self._text
+
+    @text.setter
+    def text(self, value: str) -> None:
+        if value == self._text:
+            return
+        self._text = value
+        center = tuple(self.center)
+        if value:
+            texture = get_text_cache().get(value, self.font_size)
+            self._rectangle.texture = texture
+            self.size = texture.size
+        else:
+            self.size = 0, 0
+        self._rectangle.size = self.size
+        self.center = center
+
+    def _move_rectangle(self, obj, pos) -> None:
+        self._rectangle.pos = pos
@@ -0,0 +1,281 @@
+import argparse
+import itertools
+import json
+import logging
+import os
+import random
+import time
+from concurrent.futures import as_completed, ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Set, Tuple
+from pong.simulation import AIController, Event, FieldState, INCREMENT_COEFFICIENT, MAX_RALLY, MAX_SCORE, Simulation
+
+
+HEIGHT: float = 800
+# Share of unfinished matches above which results of combination are considered meaningless
+MAX_TIMEOUT_SHARE: float = 0.05
+WIDTH: float = 1000
+# Parameters of AI player: velocity, minimum velocity, error magnitude and increment coefficient of ball velocity
+Parameters = Tuple[float, float, float, float]
+
+
+def get_key(parameters: Parameters) -> str:
+    """
+    :param parameters: parameters of AI player.
+    :return: name of combination of parameters in results file.
+    """
+
+    velocity, min_velocity, error, increment = parameters
+    return f"velocity={velocity:g} min_velocity={min_velocity:g} error={error:g} increment={increment:g}"
+
+
+def play_chunk(parameters: Parameters, chunk: int, first_seed: int, count: int, tick_rate: int, max_score: int,
+               max_ticks: int, max_rally: int = MAX_RALLY) -> Dict[str, Any]:
+    """
+    Function plays matches of AI player with given parameters (right racket) against reference AI player with default
+    parameters (left racket). Both players make random errors in every round, also when opponent is one point from
+    victory, otherwise two AI players could never finish match.
+    :param parameters: parameters of AI player;
+    :param chunk: number of chunk;
+    :param first_seed: seed of the first match, seeds of the following matches are consecutive;
+    :param count: number of matches;
+    :param tick_rate: number of ticks per second;
+    :param max_score: score to win the match;
+    :param max_ticks: maximum number of ticks of match, unfinished match is counted as timeout;
+    :param max_rally: maximum number of hits in rally.
+    :return: results of matches.
+    """
+
+    velocity, min_velocity, error, increment = parameters
+    dt = 1 / tick_rate
+    result = {"key": get_key(parameters), "chunk": chunk, "matches": count, "left_wins": 0, "right_wins": 0,
+              "timeouts": 0, "ticks": 0, "left_points": 0, "right_points": 0, "hits": 0, "long_rallies": 0}
+    start = time.perf_counter()
+    for seed in range(first_seed, first_seed + count):
+        simulation = Simulation(FieldState(WIDTH, HEIGHT),
+                                left_controller=AIController(error_scale=1, match_point_error=True),
+                                right_controller=AIController(velocity, min_velocity, error, error_scale=1,
+                                                              match_point_error=True),
+                                rng=random.Random(seed), increment_coefficient=increment, max_score=max_score,
+                                max_rally=max_rally)
+        simulation.start_match()
+        score = simulation.score
+        ticks = 0
+        hits = 0
+        while ticks < max_ticks:
+            events = simulation.step(dt)
+            ticks += 1
+            if events & (Event.LEFT_HIT | Event.RIGHT_HIT):
+                hits += 1
+                if simulation.round_over:
+                    result["long_rallies"] += 1
+            if events & Event.GAME_OVER:
+                break
+            if simulation.round_over:
+                simulation.start_round()
+        if not score.is_game_over():
+            result["timeouts"] += 1
+        elif score.left > score.right:
+            result["left_wins"] += 1
+        else:
+            result["right_wins"] += 1
+        result["ticks"] += ticks
+        result["hits"] += hits
+        result["left_points"] += score.left
+        result["right_points"] += score.right
+    result["elapsed"] = time.perf_counter() - start
+    return result
+
+
+class ResultsFile:
+    """
+    Class appends results of chunks to JSON lines file as soon as they are ready. The first line keeps settings of
+    sweep, so interrupted sweep is resumed only with the same settings and every chunk is played exactly once.
+    """
+
+    def __init__(self, path: str, settings: Dict[str, Any]) -> None:
+        """
+        :param path: path to results file;
+        :param settings: settings of sweep that define seeds and sizes of chunks.
+        """
+
+        self.done: Set[Tuple[str, int]] = set()
+        self.results: List[Dict[str, Any]] = []
+        valid_size = self._read(path, settings)
+        self._file = open(path, "a+", encoding="utf-8")
+        # Line that was cut by interruption is dropped
+        self._file.truncate(valid_size)
+        if valid_size == 0:
+            self._write({"settings": settings})
+
+    def _read(self, path: str, settings: Dict[str, Any]) -> int:
+        """
+        :param path: path to results file;
+        :param settings: settings of sweep.
+        :return: size of complete lines in file.
+        """
+
+        if not os.path.exists(path):
+            return 0
+        valid_size = 0
+        with open(path, "rb") as file:
+            for line in file:
+                try:
+                    record = json.loads(line.decode("utf-8"))
+                except ValueError:
+                    break
+                if not line.endswith(b"\n"):
+                    break
+                valid_size += len(line)
+                if "settings" in record:
+                    if record["settings"] != settings:
+                        raise ValueError(f"File '{path}' contains results of sweep with other settings: "
+                                         f"{record['settings']}")
+                    continue
+                self.done.add((record["key"], record["chunk"]))
+                self.results.append(record)
+        return valid_size
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+
+    def add(self, result: Dict[str, Any]) -> None:
+        """
+        :param result: results of chunk.
+        """
+
+        self.done.add((result["key"], result["chunk"]))
+        self.results.append(result)
+        self._write(result)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def run_sweep(grid: Iterable[Parameters], results: ResultsFile, matches: int, chunk_size: int, seed: int,
+              tick_rate: int, max_score: int, max_ticks: int, max_rally: int, processes: int) -> None:
+    """
+    Function plays chunks of matches that are not in results file yet. Chunks of all combinations are interleaved, so
+    partial results of all combinations appear early and processes are loaded evenly.
+    :param grid: combinations of parameters of AI player;
+    :param results: file with results;
+    :param matches: number of matches for every combination;
+    :param chunk_size: number of matches in chunk;
+    :param seed: seed of the first match, all combinations are played with the same seeds;
+    :param tick_rate: number of ticks per second;
+    :param max_score: score to win the match;
+    :param max_ticks: maximum number of ticks of match;
+    :param max_rally: maximum number of hits in rally;
+    :param processes: number of processes.
+    """
+
+    chunks = range((matches + chunk_size - 1) // chunk_size)
+    tasks = [(parameters, chunk) for chunk, parameters in itertools.product(chunks, grid)
+             if (get_key(parameters), chunk) not in results.done]
+    logging.info("%d chunks are done, %d chunks to play in %d processes", len(results.done), len(tasks), processes)
+    if not tasks:
+        return
+    start = time.perf_counter()
+    played = 0
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        futures = [executor.submit(play_chunk, parameters, chunk, seed + chunk * chunk_size,
+                                   min(chunk_size, matches - chunk * chunk_size), tick_rate, max_score, max_ticks,
+                                   max_rally)
+                   for parameters, chunk in tasks]
+        try:
+            for future in as_completed(futures):
+                result = future.result()
+                results.add(result)
+                played += result["matches"]
+                elapsed = time.perf_counter() - start
+                logging.info("%s, chunk %d: %d:%d wins, %d timeouts (%.0f matches per second)", result["key"],
+                             result["chunk"], result["left_wins"], result["right_wins"], result["timeouts"],
+                             played / elapsed)
+        except KeyboardInterrupt:
+            logging.info("Sweep is interrupted, run the same command to resume it")
+            for future in futures:
+                future.cancel()
+            raise
+
+
+def summarize(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    :param results: results of chunks.
+    :return: totals for every combination of parameters.
+    """
+
+    totals: Dict[str, Dict[str, Any]] = {}
+    for result in results:
+        total = totals.setdefault(result["key"], {"key": result["key"]})
+        for name, value in result.items():
+            if name not in ("key", "chunk"):
+                total[name] = total.get(name, 0) + value
+    return list(totals.values())
+
+
+def print_summary(totals: List[Dict[str, Any]], tick_rate: int) -> List[str]:
+    """
+    :param totals: totals for every combination of parameters;
+    :param tick_rate: number of ticks per second.
+    :return: names of combinations with too many unfinished matches.
+    """
+
+    print("Win rate of AI player with given parameters against reference AI player:")
+    for total in sorted(totals, key=lambda item: item["right_wins"] / item["matches"]):
+        matches = total["matches"]
+        decided = matches - total["timeouts"]
+        rate = total["right_wins"] / decided if decided else float("nan")
+        points = total["right_points"] / max(total["left_points"] + total["right_points"], 1)
+        print(f"{total['key']}: {matches} matches, win rate {100 * rate:5.1f}%, points {100 * points:5.1f}%, "
+              f"timeouts {total['timeouts']}, hits per match {total['hits'] / matches:.1f}, "
+              f"long rallies per match {total['long_rallies'] / matches:.2f}, "
+              f"match length {total['ticks'] / matches / tick_rate:.1f} s")
+    return [total["key"] for total in totals if total["timeouts"] > MAX_TIMEOUT_SHARE * total["matches"]]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Play AI-vs-AI matches for grid of parameters of AI player")
+    parser.add_argument("--velocity", type=float, nargs="+", default=[AIController.VELOCITY],
+                        help="initial velocities of racket")
+    parser.add_argument("--min-velocity", type=float, nargs="+", default=[1, 100, 300],
+                        help="minimum velocities of racket")
+    parser.add_argument("--error", type=float, nargs="+", default=[0.1, 0.5, 1],
+                        help="maximum relative errors of ball position estimation")
+    parser.add_argument("--increment", type=float, nargs="+", default=[INCREMENT_COEFFICIENT],
+                        help="coefficients by which ball velocity is increased after hit")
+    parser.add_argument("--matches", type=int, default=1000, help="number of matches for every combination")
+    parser.add_argument("--chunk", type=int, default=50, help="number of matches in one task of process")
+    parser.add_argument("--tick-rate", type=int, default=60, help="number of ticks per second")
+    parser.add_argument("--score", type=int, default=MAX_SCORE, help="score to win the match")
+    parser.add_argument("--max-ticks", type=int, default=60 * 600, help="maximum number of ticks of match")
+    parser.add_argument("--max-rally", type=int, default=MAX_RALLY, help="maximum number of hits in rally")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first match")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1, help="number of processes")
+    parser.add_argument("--output", default="tournament.jsonl",
+                        help="file with results, existing file is resumed")
+    args = parser.parse_args()
+    logging.basicConfig(format="[%(asctime)s %(levelname)s] %(message)s", level=logging.INFO)
+
+    grid = list(itertools.product(args.velocity, args.min_velocity, args.error, args.increment))
+    settings = {"matches": args.matches, "chunk": args.chunk, "seed": args.seed, "tick_rate": args.tick_rate,
+                "score": args.score, "max_ticks": args.max_ticks, "max_rally": args.max_rally}
+    try:
+        results = ResultsFile(args.output, settings)
+    except ValueError as exc:
+        parser.error(str(exc))
+    try:
+        run_sweep(grid, results, args.matches, args.chunk, args.seed, args.tick_rate, args.score,
+                  args.max_ticks, args.max_rally, args.processes)
+    except KeyboardInterrupt:
+        return
+    finally:
+        results.close()
+    keys = {get_key(parameters) for parameters in grid}
+    failed = print_summary([total for total in summarize(results.results) if total["key"] in keys], args.tick_rate)
+    if failed:
+        parser.exit(1, f"More than {100 * MAX_TIMEOUT_SHARE:g}% of matches are unfinished, win rates are not "
+                       f"reliable: {', '.join(failed)}\n")
+
+
+if __name__ == "__main__":
+    main()
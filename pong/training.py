@@ -0,0 +1,148 @@
+import argparse
+import logging
+import time
+from typing import Dict, List, Tuple
+import numpy as np
+from pong.batch import BatchSimulation
+from pong.policy import FEATURES, MLPPolicy, Policy
+
+
+HEIGHT: float = 800
+WIDTH: float = 1000
+UNLIMITED_SCORE: int = 10 ** 9
+
+
+def play_games(batch: BatchSimulation, ticks: int, dt: float) -> Dict[str, np.ndarray]:
+    """
+    Function plays matches of batch without end, new round starts at once after goal.
+    :param batch: batch simulation with policies or AI on both sides;
+    :param ticks: number of ticks to play;
+    :param dt: duration of one tick.
+    :return: numbers of hits and goals of left and right players in every match.
+    """
+
+    batch.start_matches()
+    hits = np.zeros((2, batch.n), dtype=np.int64)
+    goals = np.zeros((2, batch.n), dtype=np.int64)
+    for _ in range(ticks):
+        velocity_x = batch.velocity_x.copy()
+        score = batch.score.copy()
+        batch.step(dt)
+        scored = batch.score - score
+        goals += scored
+        goal = scored.any(axis=0)
+        # Only rackets change horizontal direction of ball
+        hits[0] += ~goal & (velocity_x < 0) & (batch.velocity_x > 0)
+        hits[1] += ~goal & (velocity_x > 0) & (batch.velocity_x < 0)
+    return {"hits": hits, "goals": goals}
+
+
+def evaluate(policy: Policy, matches: int, ticks: int, dt: float, seed: int) -> Tuple[float, float]:
+    """
+    Function plays policy (right racket) against hand-written AI (left racket).
+    :param policy: policy;
+    :param matches: number of matches;
+    :param ticks: number of ticks of every match;
+    :param dt: duration of one tick;
+    :param seed: seed of random number generator.
+    :return: numbers of hits and missed balls of policy per minute. Hand-written AI does not miss.
+    """
+
+    batch = BatchSimulation(matches, WIDTH, HEIGHT, seed=seed, max_score=UNLIMITED_SCORE)
+    batch.policies[1] = policy
+    result = play_games(batch, ticks, dt)
+    minutes = matches * ticks * dt / 60
+    return result["hits"][1].sum() / minutes, result["goals"][0].sum() / minutes
+
+
+class SelfPlayTrainer:
+    """
+    Class trains MLP policy by evolution strategy in self-play. In every generation population of perturbed copies
+    of current network plays against current network, all matches of generation are simulated by one batch. Current
+    network is moved in direction of perturbations that earned more points and hits.
+    """
+
+    GOAL_REWARD: float = 5
+    HIDDEN: int = 16
+
+    def __init__(self, hidden: int = HIDDEN, population: int = 32, matches: int = 8, sigma: float = 0.1,
+                 learning_rate: float = 0.05, seed: int = 0) -> None:
+        """
+        :param hidden: size of hidden layer;
+        :param population: number of perturbed networks, it should be even as perturbations are mirrored;
+        :param matches: number of matches of every perturbed network in generation;
+        :param sigma: standard deviation of perturbations;
+        :param learning_rate: step of parameters of network;
+        :param seed: seed of random number generators.
+        """
+
+        self._rng: np.random.Generator = np.random.default_rng(seed)
+        self.generation: int = 0
+        self.learning_rate: float = learning_rate
+        self.matches: int = matches
+        self.population: int = population
+        self.sigma: float = sigma
+        self.seed: int = seed
+        initial = MLPPolicy.create([FEATURES, hidden, 1], self._rng)
+        self.shapes: List[Tuple[int, int]] = initial.get_shapes()
+        self.parameters: np.ndarray = initial.to_vector()
+
+    @property
+    def policy(self) -> MLPPolicy:
+        return MLPPolicy.from_vector(self.parameters, self.shapes)
+
+    def step(self, ticks: int, dt: float) -> float:
+        """
+        Method plays one generation and updates parameters of network.
+        :param ticks: number of ticks of every match;
+        :param dt: duration of one tick.
+        :return: mean reward of population.
+        """
+
+        half = self._rng.standard_normal((self.population // 2, self.parameters.size))
+        noise = np.concatenate((half, -half))
+        candidates = MLPPolicy.from_vector(self.parameters + self.sigma * noise, self.shapes)
+        batch = BatchSimulation(len(noise) * self.matches, WIDTH, HEIGHT, seed=self.seed + self.generation,
+                                max_score=UNLIMITED_SCORE)
+        batch.policies = [self.policy, candidates]
+        result = play_games(batch, ticks, dt)
+        rewards = (result["hits"][1] + SelfPlayTrainer.GOAL_REWARD * (result["goals"][1] - result["goals"][0]))
+        rewards = rewards.reshape(len(noise), self.matches).mean(axis=1)
+        # Rewards are replaced with centered ranks, so step does not depend on scale of rewards
+        ranks = np.empty(len(rewards))
+        ranks[np.argsort(rewards)] = np.arange(len(rewards))
+        ranks = ranks / (len(rewards) - 1) - 0.5
+        self.parameters += self.learning_rate / (len(noise) * self.sigma) * ranks @ noise
+        self.generation += 1
+        return float(rewards.mean())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Train MLP policy of AI player in self-play")
+    parser.add_argument("--generations", type=int, default=200, help="number of generations")
+    parser.add_argument("--population", type=int, default=32, help="number of perturbed networks in generation")
+    parser.add_argument("--matches", type=int, default=8, help="number of matches of every perturbed network")
+    parser.add_argument("--ticks", type=int, default=1800, help="number of ticks of every match")
+    parser.add_argument("--hidden", type=int, default=SelfPlayTrainer.HIDDEN, help="size of hidden layer")
+    parser.add_argument("--sigma", type=float, default=0.1, help="standard deviation of perturbations")
+    parser.add_argument("--learning-rate", type=float, default=0.05, help="step of parameters of network")
+    parser.add_argument("--dt", type=float, default=1 / 60, help="duration of one tick in seconds")
+    parser.add_argument("--seed", type=int, default=0, help="seed for random number generators")
+    parser.add_argument("--output", default="media/policy.npz", help="path to file with weights of network")
+    args = parser.parse_args()
+    logging.basicConfig(format="[%(asctime)s %(levelname)s] %(message)s", level=logging.INFO)
+
+    trainer = SelfPlayTrainer(args.hidden, args.population, args.matches, args.sigma, args.learning_rate, args.seed)
+    start = time.perf_counter()
+    for generation in range(1, args.generations + 1):
+        reward = trainer.step(args.ticks, args.dt)
+        if generation % 10 == 0 or generation == args.generations:
+            hits, misses = evaluate(trainer.policy, 64, args.ticks, args.dt, args.seed)
+            logging.info("Generation %d: reward %.1f, against AI %.1f hits and %.2f misses per minute (%.0f s)",
+                         generation, reward, hits, misses, time.perf_counter() - start)
+            trainer.policy.save(args.output)
+    logging.info("Weights are saved to '%s'", args.output)
+
+
+if __name__ == "__main__":
+    main()
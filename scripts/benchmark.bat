@@ -0,0 +1,3 @@
+cd ..
+venv\Scripts\python -m benchmarks %*
+pause
\ No newline at end of file
@@ -0,0 +1,2 @@
+cd ..
+venv/bin/python -m benchmarks "$@"
\ No newline at end of file
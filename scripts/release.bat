@@ -9,10 +9,12 @@ if exist venv rd /S /Q venv
 venv\Scripts\python -m pip install --upgrade pip
 venv\Scripts\python -m pip install -r requirements.txt
 venv\Scripts\python -m pip install pyinstaller
+venv\Scripts\python -m pong.media --source media --output media.bundle
 venv\Scripts\python -m PyInstaller main.spec
 
 rename dist release
 if exist build rd /S /Q build
 if exist dist rd /S /Q dist
 if exist venv rd /S /Q venv
+if exist media.bundle del /Q media.bundle
 pause
\ No newline at end of file
@@ -8,8 +8,9 @@ python3 -m venv venv
 ./venv/bin/python3 -m pip install --upgrade pip
 ./venv/bin/python3 -m pip install -r requirements.txt
 ./venv/bin/python3 -m pip install pyinstaller
+./venv/bin/python3 -m pong.media --source media --output media.bundle
 ./venv/bin/pyinstaller main.py --clean --onefile --noconsole \
---add-data "./media/*:media" \
+--add-data "./media.bundle:." \
 --icon media/icon.ico \
 --splash media/icon.png \
 --name pong
@@ -18,4 +19,5 @@ mv dist release
 rm -rf build
 rm -rf dist
 rm -rf venv
+rm -rf media.bundle
 rm -rf pong.spec
\ No newline at end of file
@@ -0,0 +1,15 @@
+from pong.batch import BatchSimulation, check_against_scalar
+
+
+def test_batch_plays_the_same_matches_as_scalar_simulation() -> None:
+    assert check_against_scalar(n_matches=8) == 0
+
+
+def test_batch_finishes_ai_matches() -> None:
+    batch = BatchSimulation(32, 1000, 800, seed=0, max_rally=20)
+    batch.ai_error_magnitude[:] = 0.3
+    batch.ai_error_scale[:] = 1
+    batch.ai_match_point_error[:] = True
+    result = batch.run(1 / 60)
+    assert result.finished == batch.n
+    assert ((result.score_left == batch.max_score) ^ (result.score_right == batch.max_score)).all()
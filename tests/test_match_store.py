@@ -0,0 +1,72 @@
+import random
+from typing import List, Optional
+import pytest
+from pong.match_store import MatchRecord, MatchStore, ORDERS
+
+
+MATCHES: int = 300
+MODES: int = 3
+PAGE_SIZE: int = 7
+
+
+def create_records() -> List[MatchRecord]:
+    """
+    :return: random matches with identifiers they get in store.
+    """
+
+    rng = random.Random(0)
+    records = []
+    for id in range(1, MATCHES + 1):
+        left = rng.randint(0, 5)
+        # Few distinct values of sort keys, so that pages are split between matches with equal keys
+        records.append(MatchRecord(rng.randint(1, MODES), left, 5 if left < 5 else rng.randint(0, 4),
+                                   rng.uniform(30, 600), rng.randint(5, 9), rng.randint(5, 200), rng.randint(0, 10),
+                                   float(rng.randint(3, 13) * 100), id=id))
+    return records
+
+
+@pytest.fixture(scope="module")
+def store(tmp_path_factory) -> MatchStore:
+    path = str(tmp_path_factory.mktemp("store") / "matches.db")
+    store = MatchStore(path)
+    for record in create_records():
+        store.add(record)
+    store.close()
+    store = MatchStore(path)
+    yield store
+    store.close()
+
+
+def read_all_pages(store: MatchStore, order: str, mode: Optional[int]) -> List[int]:
+    ids = []
+    page = store.get_page(order, mode, limit=PAGE_SIZE)
+    while page:
+        assert len(page) <= PAGE_SIZE
+        ids.extend(record.id for record in page)
+        page = store.get_page(order, mode, after=page[-1], limit=PAGE_SIZE)
+    return ids
+
+
+@pytest.mark.parametrize("order", list(ORDERS))
+@pytest.mark.parametrize("mode", [None, *range(1, MODES + 1)])
+def test_pages_follow_one_another(store: MatchStore, order: str, mode: Optional[int]) -> None:
+    records = [record for record in create_records() if mode is None or record.mode == mode]
+    records.sort(key=lambda record: tuple(getattr(record, key) for key in ORDERS[order]), reverse=True)
+    assert read_all_pages(store, order, mode) == [record.id for record in records]
+
+
+def test_trigger_keeps_statistics_of_modes(store: MatchStore) -> None:
+    records = create_records()
+    statistics = store.get_statistics()
+    assert store.count() == MATCHES
+    assert sorted(statistics) == sorted({record.mode for record in records})
+    for mode, totals in statistics.items():
+        matches = [record for record in records if record.mode == mode]
+        assert totals["matches"] == len(matches)
+        assert totals["left_wins"] == sum(record.score_left > record.score_right for record in matches)
+        assert totals["right_wins"] == sum(record.score_right > record.score_left for record in matches)
+        assert totals["duration"] == pytest.approx(sum(record.duration for record in matches))
+        assert totals["rallies"] == sum(record.rallies for record in matches)
+        assert totals["hits"] == sum(record.hits for record in matches)
+        assert totals["longest_rally"] == max(record.longest_rally for record in matches)
+        assert totals["peak_speed"] == max(record.peak_speed for record in matches)
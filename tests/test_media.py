@@ -0,0 +1,64 @@
+import os
+import pytest
+
+os.environ.setdefault("KIVY_NO_ARGS", "1")
+os.environ.setdefault("KIVY_NO_CONSOLELOG", "1")
+pytest.importorskip("kivy")
+
+from pong.media import ALIGNMENT, build_bundle, MediaBundle  # noqa: E402
+
+
+FILES = {"hard_ball_hit.wav": bytes(range(256)) * 7, "empty.txt": b"", "имя.bin": b"\x01" * 33,
+         "policy.npz": bytes(index * 31 % 251 for index in range(1000))}
+
+
+def create_media_dir(path) -> str:
+    media_dir = path / "media"
+    media_dir.mkdir()
+    for name, data in FILES.items():
+        (media_dir / name).write_bytes(data)
+    # Folders are not packed
+    (media_dir / "nested").mkdir()
+    return str(media_dir)
+
+
+def test_bundle_keeps_content_of_files(tmp_path) -> None:
+    path = str(tmp_path / "media.bundle")
+    sizes = build_bundle(create_media_dir(tmp_path), path)
+    assert sizes == {name: len(data) for name, data in FILES.items()}
+    bundle = MediaBundle(path)
+    assert bundle.get_names() == sorted(FILES)
+    for name, data in FILES.items():
+        view = bundle.get(name)
+        assert view == data
+        view.release()
+    assert all(offset % ALIGNMENT == 0 for offset, _ in bundle._index.values())
+    extracted = bundle.extract("имя.bin", str(tmp_path / "cache"))
+    with open(extracted, "rb") as file:
+        assert file.read() == FILES["имя.bin"]
+    with pytest.raises(KeyError):
+        bundle.get("missing.wav")
+    bundle.close()
+
+
+def test_checksum_depends_on_content(tmp_path) -> None:
+    media_dir = create_media_dir(tmp_path)
+    path = str(tmp_path / "media.bundle")
+    build_bundle(media_dir, path)
+    bundle = MediaBundle(path)
+    checksum = bundle.checksum
+    bundle.close()
+    with open(os.path.join(media_dir, "empty.txt"), "wb") as file:
+        file.write(b"changed")
+    build_bundle(media_dir, path)
+    bundle = MediaBundle(path)
+    assert bundle.checksum != checksum
+    assert bundle.get("empty.txt") == b"changed"
+    bundle.close()
+
+
+def test_other_file_is_not_bundle(tmp_path) -> None:
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"\0" * 64)
+    with pytest.raises(ValueError):
+        MediaBundle(str(path))
@@ -0,0 +1,54 @@
+import random
+from typing import Set, Tuple
+import pytest
+from pong.multiball import BallPool, MultiBallSimulation, SpatialHash
+from pong.simulation import AIController, FieldState
+
+
+SIZE: float = 10
+
+
+def find_pairs_by_brute_force(pool: BallPool) -> Set[Tuple[int, int]]:
+    return {(first, second) for first in range(pool.count) for second in range(first + 1, pool.count)
+            if (pool.x[first] - pool.x[second]) ** 2 + (pool.y[first] - pool.y[second]) ** 2 < SIZE * SIZE}
+
+
+def normalize(pairs) -> Set[Tuple[int, int]]:
+    return {(min(pair), max(pair)) for pair in pairs}
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_spatial_hash_finds_the_same_pairs_as_brute_force(seed: int) -> None:
+    rng = random.Random(seed)
+    pool = BallPool(400, SIZE)
+    # Dense field, so that many balls overlap, with coordinates below zero and on borders of cells
+    for _ in range(pool.capacity):
+        x = rng.choice((rng.uniform(-20, 200), rng.randint(-2, 20) * SIZE))
+        y = rng.choice((rng.uniform(-20, 200), rng.randint(-2, 20) * SIZE))
+        pool.spawn(x, y, 0, 0)
+    pairs = SpatialHash(SIZE).get_pairs(pool)
+    assert len(pairs) == len(normalize(pairs))
+    assert normalize(pairs) == find_pairs_by_brute_force(pool)
+
+
+def test_spatial_hash_ignores_inactive_balls() -> None:
+    pool = BallPool(3, SIZE)
+    for _ in range(3):
+        pool.spawn(0, 0, 0, 0)
+    pool.clear()
+    pool.spawn(0, 0, 0, 0)
+    pool.spawn(SIZE / 2, 0, 0, 0)
+    assert SpatialHash(SIZE).get_pairs(pool) == [(0, 1)]
+
+
+def test_balls_stay_on_field() -> None:
+    field = FieldState(1000, 800)
+    simulation = MultiBallSimulation(field, 100, SIZE, left_controller=AIController(),
+                                     right_controller=AIController(), rng=random.Random(0), max_score=10 ** 9)
+    simulation.start_match()
+    pool = simulation.balls
+    for _ in range(600):
+        simulation.step(1 / 120)
+        assert pool.count == pool.capacity
+        assert all(0 <= pool.y[index] <= field.height - SIZE for index in range(pool.count))
+        assert all(-SIZE <= pool.x[index] <= field.width for index in range(pool.count))
@@ -0,0 +1,102 @@
+import random
+from typing import Callable, List, Tuple
+from pong.network import get_snapshot_values, NetworkClient, NetworkHost, Phase, SNAPSHOT_HEADER, SNAPSHOT_PACKET
+from pong.simulation import AIController, FieldState, Simulation
+
+
+HOST_ADDRESS: Tuple[str, int] = ("host", 7777)
+CLIENT_ADDRESS: Tuple[str, int] = ("client", 7778)
+TICK_RATE: int = 60
+TICKS: int = 600
+
+
+class LoopbackChannel:
+    """
+    Channel that passes datagrams to another channel in memory. Datagrams for which drop returns True are lost.
+    """
+
+    def __init__(self, address: Tuple[str, int], drop: Callable[[bytes], bool] = lambda data: False) -> None:
+        self.address: Tuple[str, int] = address
+        self.drop: Callable[[bytes], bool] = drop
+        self.inbox: List[Tuple[bytes, Tuple[str, int]]] = []
+        self.peer: "LoopbackChannel" = None
+        self.sent: List[bytes] = []
+
+    def receive(self) -> List[Tuple[bytes, Tuple[str, int]]]:
+        datagrams, self.inbox = self.inbox, []
+        return datagrams
+
+    def send(self, data: bytes, address: Tuple[str, int]) -> None:
+        self.sent.append(data)
+        if not self.drop(data):
+            self.peer.inbox.append((data, self.address))
+
+
+def connect(host_drop: Callable[[bytes], bool] = lambda data: False) -> Tuple[Simulation, NetworkHost, NetworkClient,
+                                                                              LoopbackChannel]:
+    """
+    :param host_drop: function that decides which datagrams of host are lost.
+    :return: simulation of match, host and client that have completed handshake and channel of host.
+    """
+
+    host_channel = LoopbackChannel(HOST_ADDRESS, host_drop)
+    client_channel = LoopbackChannel(CLIENT_ADDRESS)
+    host_channel.peer, client_channel.peer = client_channel, host_channel
+    field = FieldState(1000, 800)
+    simulation = Simulation(field, left_controller=AIController(), right_controller=AIController(),
+                            rng=random.Random(1))
+    simulation.start_match()
+    host = NetworkHost(host_channel, field, TICK_RATE)
+    client = NetworkClient(client_channel, HOST_ADDRESS)
+    client.poll()
+    host.poll()
+    client.poll()
+    assert client.connected and host.client_address == CLIENT_ADDRESS
+    return simulation, host, client, host_channel
+
+
+def get_latest_values(client: NetworkClient) -> Tuple:
+    return client._timeline[-1][1]
+
+
+def play(simulation: Simulation, host: NetworkHost, client: NetworkClient) -> None:
+    for _ in range(TICKS):
+        simulation.step(1 / TICK_RATE)
+        if simulation.round_over:
+            simulation.start_round()
+        host.send_snapshot(simulation, Phase.PLAYING, force=True)
+        client.poll()
+        host.poll()
+        assert get_latest_values(client) == get_snapshot_values(simulation, Phase.PLAYING)
+
+
+def test_delta_snapshots_restore_state() -> None:
+    simulation, host, client, host_channel = connect()
+    play(simulation, host, client)
+    # Snapshot equal to acknowledged baseline carries no fields
+    host.send_snapshot(simulation, Phase.PLAYING, force=True)
+    client.poll()
+    host.poll()
+    host.send_snapshot(simulation, Phase.PLAYING, force=True)
+    data = host_channel.sent[-1]
+    assert data[0] == SNAPSHOT_PACKET
+    assert len(data) == SNAPSHOT_HEADER.size
+    assert SNAPSHOT_HEADER.unpack_from(data)[-1] == 0
+
+
+def test_delta_snapshots_survive_loss() -> None:
+    rng = random.Random(2)
+    simulation, host, client, _ = connect(lambda data: data[0] == SNAPSHOT_PACKET and rng.random() < 0.3)
+    sequences = []
+    for _ in range(TICKS):
+        simulation.step(1 / TICK_RATE)
+        if simulation.round_over:
+            simulation.start_round()
+        host.send_snapshot(simulation, Phase.PLAYING, force=True)
+        client.poll()
+        host.poll()
+        # Every received snapshot is decoded against baseline that client has
+        if client._timeline and client._latest_snapshot not in sequences:
+            sequences.append(client._latest_snapshot)
+            assert get_latest_values(client) == get_snapshot_values(simulation, Phase.PLAYING)
+    assert 0.5 * TICKS < len(sequences) < TICKS
@@ -0,0 +1,69 @@
+import random
+from typing import Dict, Tuple
+from pong.replay import ReplayPlayer, ReplayRecorder
+from pong.simulation import AIController, FieldState, Simulation
+
+
+KEYFRAME_INTERVAL: int = 120
+MAX_TICKS: int = 60 * 600
+SEED: int = 7
+SNAPSHOT_INTERVAL: int = 97
+TICK_RATE: int = 60
+
+
+def get_state(simulation: Simulation) -> Tuple[float, ...]:
+    ball = simulation.ball
+    return (simulation.tick, ball.x, ball.y, ball.velocity_x, ball.velocity_y, simulation.paddles[0].y,
+            simulation.paddles[1].y, simulation.score.left, simulation.score.right)
+
+
+def record_match(path: str) -> Tuple[Simulation, Dict[int, Tuple[float, ...]]]:
+    """
+    :param path: path to replay file.
+    :return: simulation after match and its states at some ticks. Left racket is moved by scripted keyboard and touch
+    inputs, right racket is moved by AI.
+    """
+
+    simulation = Simulation(FieldState(1000, 800), right_controller=AIController(), rng=random.Random(SEED))
+    simulation.start_match()
+    recorder = ReplayRecorder(path, simulation, SEED, TICK_RATE, KEYFRAME_INTERVAL)
+    states = {simulation.tick: get_state(simulation)}
+    for tick in range(MAX_TICKS):
+        if simulation.round_over:
+            if simulation.score.is_game_over():
+                break
+            simulation.start_round()
+        if tick % 90 == 0:
+            simulation.drives[0].set_direction((tick // 90) % 3 - 1)
+            recorder.record_drive(0)
+        if tick % 250 == 125:
+            simulation.paddles[0].move_to((tick * 37) % simulation.field.height, simulation.field.height)
+            recorder.record_inputs()
+        simulation.step(1 / TICK_RATE)
+        if simulation.tick % SNAPSHOT_INTERVAL == 0:
+            states[simulation.tick] = get_state(simulation)
+    recorder.close()
+    return simulation, states
+
+
+def test_replay_repeats_match(tmp_path) -> None:
+    path = str(tmp_path / "match.replay")
+    simulation, _ = record_match(path)
+    player = ReplayPlayer(path)
+    assert player.seed == SEED
+    assert player.total_ticks == simulation.tick
+    ticks, _ = player.run()
+    assert ticks == simulation.tick
+    assert get_state(player.simulation) == get_state(simulation)
+
+
+def test_seek_restores_state_at_any_tick(tmp_path) -> None:
+    path = str(tmp_path / "match.replay")
+    _, states = record_match(path)
+    player = ReplayPlayer(path)
+    ticks = list(states)
+    # Seeking goes both forward and backward, also to ticks between keyframes
+    random.Random(SEED).shuffle(ticks)
+    for tick in ticks:
+        player.seek(tick)
+        assert get_state(player.simulation) == states[tick]
@@ -0,0 +1,20 @@
+from pong.simulation import AIController, INCREMENT_COEFFICIENT, MAX_SCORE
+from pong.tournament import MAX_TIMEOUT_SHARE, play_chunk
+
+
+MATCHES: int = 10
+TICK_RATE: int = 60
+
+
+def test_reference_players_finish_matches() -> None:
+    parameters = AIController.VELOCITY, AIController.MIN_VELOCITY, AIController.ERROR, INCREMENT_COEFFICIENT
+    result = play_chunk(parameters, 0, 0, MATCHES, TICK_RATE, MAX_SCORE, TICK_RATE * 600)
+    assert result["timeouts"] <= MAX_TIMEOUT_SHARE * MATCHES
+    assert result["left_wins"] + result["right_wins"] + result["timeouts"] == MATCHES
+
+
+def test_long_rally_gives_point() -> None:
+    parameters = AIController.VELOCITY, AIController.MIN_VELOCITY, AIController.ERROR, INCREMENT_COEFFICIENT
+    result = play_chunk(parameters, 0, 0, 1, TICK_RATE, MAX_SCORE, TICK_RATE * 600, max_rally=1)
+    assert result["long_rallies"] == result["left_points"] + result["right_points"]
+    assert result["timeouts"] == 0
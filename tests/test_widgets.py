@@ -0,0 +1,48 @@
+import os
+import pytest
+
+os.environ.setdefault("KIVY_NO_ARGS", "1")
+os.environ.setdefault("KIVY_NO_CONSOLELOG", "1")
+pytest.importorskip("kivy")
+
+from pong.ball import Ball  # noqa: E402
+from pong.player import Player  # noqa: E402
+from pong.simulation import Side  # noqa: E402
+
+
+FRAMES: int = 1000
+
+
+class SilentAudio:
+
+    def play(self, name: str) -> None:
+        pass
+
+
+def get_instructions(widget) -> list:
+    return list(widget.canvas.children)
+
+
+def test_ball_sync_allocates_no_instructions() -> None:
+    ball = Ball()
+    instructions = get_instructions(ball)
+    ball.state.max_velocity = 1000
+    for frame in range(FRAMES):
+        ball.state.x, ball.state.y = frame, 2 * frame
+        ball.state.velocity_x, ball.state.velocity_y = frame % 700, 300
+        ball.sync()
+        ball.sync((frame + 0.5, frame + 0.5), effects=frame % 2 == 0)
+    assert len(ball.canvas.children) == len(instructions)
+    assert all(new is old for new, old in zip(get_instructions(ball), instructions))
+
+
+def test_player_show_hit_allocates_no_instructions(monkeypatch) -> None:
+    monkeypatch.setattr("pong.player.get_audio_manager", SilentAudio)
+    player = Player((1, 1, 1, 1), Side.LEFT)
+    instructions = get_instructions(player)
+    for frame in range(FRAMES):
+        player.state.y = frame % 500
+        player.sync()
+        player.show_hit(frame % 7 == 0)
+    assert len(player.canvas.children) == len(instructions)
+    assert all(new is old for new, old in zip(get_instructions(player), instructions))